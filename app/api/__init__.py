@@ -1,9 +1,23 @@
-"""統合APIルーター"""
+"""統合APIルーター
+
+ASYNC_ROUTES=true の場合は非同期エンドポイント（async_router）を登録する。
+"""
 
 from fastapi import APIRouter
 
-from app.features.users.router import router as users_router
-from app.features.dishes.router import router as dishes_router
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, shard_router
+from app.features.users import async_router as users_async, router as users_sync
+from app.features.dishes import async_router as dishes_async, router as dishes_sync
+
+if settings.async_routes:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("ASYNC_ROUTES requires ASYNC_DATABASE_URL")
+    if shard_router.count > 1:
+        raise RuntimeError("ASYNC_ROUTES does not support DISH_SHARD_URLS")
+    users_router, dishes_router = users_async.router, dishes_async.router
+else:
+    users_router, dishes_router = users_sync.router, dishes_sync.router
 
 api_router = APIRouter()
 api_router.include_router(users_router, prefix="/users", tags=["Users"])
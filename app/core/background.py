@@ -0,0 +1,86 @@
+"""バックグラウンドの定期実行タスク
+
+uvicornワーカー内でデーモンスレッドとして動作する。
+起動・停止は app/main.py の lifespan から行う。
+
+バッチ処理のジョブは stoppable=True で登録し、受け取った should_continue を
+run_in_batches に渡す。停止要求後は実行中のバッチの完了を待って打ち切る。
+"""
+
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# stop() で実行中の処理の完了を待つ最大秒数
+STOP_TIMEOUT_SECONDS = 30.0
+
+
+class PeriodicTask:
+    """一定間隔で関数を実行するスレッド"""
+
+    def __init__(
+        self,
+        name: str,
+        interval_seconds: float,
+        func: Callable[..., None],
+        wake_event: Optional[threading.Event] = None,
+        stoppable: bool = False,
+    ):
+        """
+        Args:
+            name: スレッド名（ログ出力用）
+            interval_seconds: 実行間隔（秒、0より大きい値）
+            func: 実行する関数
+            wake_event: セットされると間隔を待たずに func を実行するイベント（任意）
+            stoppable: True の場合は func に should_continue を渡す（停止要求後は False を返す）
+        """
+        if interval_seconds <= 0:
+            raise ValueError(f"interval_seconds must be positive: {name}={interval_seconds}")
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.stoppable = stoppable
+        self._stop_event = threading.Event()
+        self._wake_event = wake_event or threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """スレッドを開始"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def should_continue(self) -> bool:
+        """停止が要求されていなければ True"""
+        return not self._stop_event.is_set()
+
+    def stop(self, timeout: Optional[float] = STOP_TIMEOUT_SECONDS) -> None:
+        """スレッドを停止（実行中の処理の完了を最大 timeout 秒待つ）"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._wake_event.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            # デーモンスレッドのため、プロセス終了時に打ち切られる
+            logger.warning(f"Periodic task did not stop within {timeout}s: {self.name}")
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            self._wake_event.wait(self.interval_seconds)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                if self.stoppable:
+                    self.func(should_continue=self.should_continue)
+                else:
+                    self.func()
+            except Exception as e:
+                # 失敗しても次回の実行は継続する
+                logger.warning(f"Periodic task failed: {self.name}, error: {e}")
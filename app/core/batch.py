@@ -0,0 +1,116 @@
+"""主キー単位の分割処理
+
+大量行の削除・移動を小さなバッチに分けて実行し、
+ロック時間とレプリケーション遅延を抑える。
+アプリ内の定期実行は全ワーカーで行われるため、ジョブは job_lock で同時実行を1つに制限する。
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchReport:
+    """分割処理の実行結果"""
+    label: str
+    rows: int = 0
+    batch_seconds: List[float] = field(default_factory=list)
+    # 停止要求（should_continue）により途中で打ち切った場合 True
+    interrupted: bool = False
+
+    @property
+    def batches(self) -> int:
+        return len(self.batch_seconds)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.batch_seconds, 0.0)
+
+    def as_dict(self) -> dict:
+        """ログ・レスポンス用の辞書"""
+        return {
+            "label": self.label,
+            "rows": self.rows,
+            "batches": self.batches,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "max_batch_ms": round(max(self.batch_seconds, default=0.0) * 1000, 3),
+            "interrupted": self.interrupted,
+        }
+
+
+def run_in_batches(
+    label: str,
+    fetch_ids: Callable[[int], Sequence],
+    process_ids: Callable[[Sequence], int],
+    batch_size: int,
+    sleep_seconds: float = 0.0,
+    max_batches: Optional[int] = None,
+    should_continue: Optional[Callable[[], bool]] = None,
+) -> BatchReport:
+    """
+    主キーのバッチを取得・処理できなくなるまで繰り返す
+
+    Args:
+        label: ログ出力用のラベル
+        fetch_ids: 次に処理する主キーを最大N件返す関数
+        process_ids: 主キーを受け取り処理（コミットまで）を行い、処理件数を返す関数
+        batch_size: 1バッチの件数
+        sleep_seconds: バッチ間の待機時間（秒）
+        max_batches: 最大バッチ数（Noneの場合は無制限）
+        should_continue: 各バッチの前に呼び、False を返した場合は打ち切る（アプリ終了時の停止要求等）
+
+    Returns:
+        BatchReport: 処理件数とバッチごとの所要時間
+    """
+    report = BatchReport(label=label)
+    while max_batches is None or report.batches < max_batches:
+        if should_continue is not None and not should_continue():
+            report.interrupted = True
+            logger.info(f"{label}: interrupted after batch={report.batches}")
+            break
+        start = time.perf_counter()
+        ids = fetch_ids(batch_size)
+        if not ids:
+            break
+        rows = process_ids(ids)
+        elapsed = time.perf_counter() - start
+
+        report.rows += rows
+        report.batch_seconds.append(elapsed)
+        logger.info(
+            f"{label}: batch={report.batches}, rows={rows}, elapsed_ms={elapsed * 1000:.1f}"
+        )
+
+        if len(ids) < batch_size:
+            break
+        if sleep_seconds > 0:
+            time.sleep(sleep_seconds)
+    return report
+
+
+@contextmanager
+def job_lock(engine: Engine, name: str) -> Iterator[bool]:
+    """
+    名前付きロックを取得し、同じジョブの同時実行（複数ワーカー・CLI）を防ぐ
+
+    MySQL の GET_LOCK(name, 0) を専用の接続で取得し（待たない）、ブロックの終了時に解放する。
+    取得できた場合は True、他で実行中の場合は False を返す。MySQL以外では常に True。
+    """
+    if engine.dialect.name != "mysql":
+        yield True
+        return
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": name}).scalar() == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
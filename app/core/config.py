@@ -26,15 +26,102 @@ class Settings(BaseSettings):
     # Database
     database_url: str
     async_database_url: str | None = None
+    # true の場合は非同期エンドポイント（ASYNC_DATABASE_URL の非同期セッション）を使用
+    async_routes: bool = False
+    # コンパイル済みSQLのキャッシュ件数（SQLAlchemyの query_cache_size）
+    db_statement_cache_size: int = 500
+    # コネクションプール（全エンジン共通）
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 3600
+    # 実行した全SQLをログに出力する（SQLAlchemy の echo、ローカルでのデバッグ用）
+    db_echo: bool = False
+    # スロークエリの記録（閾値ミリ秒・記録する割合 0.0〜1.0・/metrics に保持する件数）
+    slow_query_threshold_ms: float = 200.0
+    slow_query_sample_rate: float = 1.0
+    slow_query_log_size: int = 100
+    # true の場合はスロークエリの SELECT に EXPLAIN FORMAT=JSON を実行して記録に添える（MySQLのみ）
+    slow_query_explain: bool = False
+    # 古い接続の検出方式（"pre_ping": 取り出すたびにping, "on_error": 切断エラー時に無効化）
+    db_pool_stale_check: str = "pre_ping"
+    # 読み取り専用レプリカの接続URL（カンマ区切り、空の場合はプライマリのみ）
+    database_replica_urls: str = ""
+    # 書き込み後にそのユーザーの読み取りをプライマリへ固定する秒数
+    replica_sticky_seconds: float = 5.0
+    # 接続に失敗したレプリカを振り分け対象から外す秒数
+    replica_retry_seconds: float = 30.0
+    replica_sticky_slots: int = 65536
+    # 料理データの追加シャードの接続URL（カンマ区切り、シャード0はDATABASE_URL）
+    dish_shard_urls: str = ""
+    # ユーザーとシャードの割り当てのキャッシュ（ワーカーごと）
+    shard_map_cache_size: int = 10000
+    shard_map_cache_seconds: float = 5.0
 
     # JWT
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
+    # リフレッシュトークンの形式（"jwt" または "opaque"）
+    refresh_token_format: str = "jwt"
+
+    # リフレッシュトークンの定期削除（インターバル0で無効）
+    refresh_token_purge_interval_seconds: int = 0
+    refresh_token_purge_batch_size: int = 500
+    refresh_token_purge_sleep_seconds: float = 0.1
+    refresh_token_revoked_retention_days: int = 7
+
+    # 退会ユーザーのデータ削除ジョブ
+    account_purge_batch_size: int = 100
+    account_purge_sleep_seconds: float = 0.2
+    account_purge_min_age_days: int = 30
+
+    # 論理削除済み料理のアーカイブ（インターバル0で無効）
+    dish_archive_interval_seconds: int = 0
+    dish_archive_batch_size: int = 200
+    dish_archive_sleep_seconds: float = 0.1
+    dish_archive_min_age_days: int = 30
+    dish_archive_purge_s3: bool = False
+
+    # 最終ログイン日時の書き込みバッファ（インターバルは0より大きい値、0以下は起動時にエラー）
+    last_login_flush_interval_seconds: int = 10
+    last_login_buffer_max_size: int = 1000
+
+    # 検証済みアクセストークンのキャッシュ
+    token_cache_max_size: int = 10000
+
+    # 認証済みユーザーキャッシュ
+    user_cache_max_size: int = 10000
+    user_cache_ttl_seconds: int = 300
+    user_cache_version_check_seconds: int = 5
 
     # レート制限
     rate_limit_auth: str = "5/minute"
+    rate_limit_dishes: str = "120/minute"
+    rate_limit_slots: int = 65536
+
+    # アカウント単位のログイン失敗バックオフ
+    login_backoff_threshold: int = 5
+    login_backoff_base_seconds: float = 1.0
+    login_backoff_max_seconds: float = 900.0
+    login_backoff_window_seconds: float = 3600.0
+    login_backoff_slots: int = 65536
+
+    # ワーカー間共有ステート（shared: /dev/shm上のmmap, memory: プロセス内）
+    shared_state_backend: str = "shared"
+    shared_state_dir: str = "/dev/shm"
+
+    # パスワードハッシュ（専用プロセスプール）
+    password_hash_workers: int = 2
+    password_hash_queue_limit: int = 32
+
+    # 内部メトリクス（GET /metrics）の参照用トークン（空の場合は無効、404）
+    metrics_token: str = ""
+
+    # リクエストの処理時間の上限（ミリ秒、0で無効）
+    request_deadline_dish_read_ms: int = 3000
+    request_deadline_dish_write_ms: int = 10000
 
     # S3/AWS
     s3_bucket_name: str = ""
@@ -42,6 +129,10 @@ class Settings(BaseSettings):
     presigned_url_expires: int = 300
     max_image_size: int = 10485760  # 10MB
     cloudfront_domain: str = ""
+    # S3クライアントのタイムアウト・リトライ回数（1回の呼び出しの上限）
+    s3_connect_timeout_seconds: float = 2.0
+    s3_read_timeout_seconds: float = 5.0
+    s3_max_attempts: int = 3
 
 
 @lru_cache
@@ -1,8 +1,19 @@
-from sqlalchemy import create_engine
+import threading
+import uuid
+import zlib
+from functools import lru_cache
+from typing import List, NamedTuple
+
+from sqlalchemy import bindparam, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import default as engine_default
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core import metrics
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.db_pool import create_pooled_async_engine, create_pooled_engine
 
 
 # === Base クラス（全モデルの基底） ===
@@ -12,26 +23,33 @@ class Base(DeclarativeBase):
 
 
 # === 同期エンジン（Alembicマイグレーション用） ===
-engine = create_engine(
-    settings.database_url,
-    echo=True,
-    pool_pre_ping=True,
-)
+# プール設定・計測は app.core.db_pool で共通化
+engine = create_pooled_engine(settings.database_url, "primary")
 
 # 同期セッションファクトリ
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# === 読み取り専用レプリカ（DATABASE_REPLICA_URLS が設定されている場合のみ） ===
+# 振り分け・フェイルオーバーは app.core.replica で行う
+replica_engines = [
+    create_pooled_engine(url.strip(), f"replica{i}")
+    for i, url in enumerate(u for u in settings.database_replica_urls.split(",") if u.strip())
+]
+
+# === 料理データのシャード（DISH_SHARD_URLS が設定されている場合のみ） ===
+# シャード0はプライマリ（engine）。ユーザー単位の振り分けは ShardRouter で行う
+shard_engines = [engine] + [
+    create_pooled_engine(url.strip(), f"shard{i}")
+    for i, url in enumerate((u for u in settings.dish_shard_urls.split(",") if u.strip()), start=1)
+]
+
 # === 非同期エンジン（アプリケーション実行用） ===
 # 非同期エンジンは ASYNC_DATABASE_URL が設定されている場合のみ初期化
 async_engine = None
 AsyncSessionLocal = None
 
 if settings.async_database_url:
-    async_engine = create_async_engine(
-        settings.async_database_url,
-        echo=True,
-        pool_pre_ping=True,
-    )
+    async_engine = create_pooled_async_engine(settings.async_database_url, "async")
 
     AsyncSessionLocal = async_sessionmaker(
         async_engine,
@@ -40,6 +58,161 @@ if settings.async_database_url:
     )
 
 
+# === SQLコンパイルキャッシュの統計 ===
+class StatementCacheStats:
+    """SQLAlchemyのコンパイル済みステートメントキャッシュのヒット率（スレッドセーフ）"""
+
+    _LABELS = {
+        engine_default.CACHE_HIT: "hits",
+        engine_default.CACHE_MISS: "misses",
+        engine_default.CACHING_DISABLED: "disabled",
+        engine_default.NO_CACHE_KEY: "no_cache_key",
+        engine_default.NO_DIALECT_SUPPORT: "no_dialect_support",
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {label: 0 for label in self._LABELS.values()}
+
+    def record(self, cache_hit) -> None:
+        """実行コンテキストの cache_hit を記録"""
+        label = self._LABELS.get(cache_hit)
+        if label is None:
+            return
+        with self._lock:
+            self._counts[label] += 1
+
+    def stats(self) -> dict:
+        """件数とヒット率を返す"""
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "cache_size": settings.db_statement_cache_size,
+            **counts,
+            "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+statement_cache_stats = StatementCacheStats()
+metrics.register("statement_cache", statement_cache_stats.stats)
+
+
+def _record_statement_cache(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        statement_cache_stats.record(getattr(context, "cache_hit", None))
+
+
+event.listen(engine, "before_cursor_execute", _record_statement_cache)
+for _extra_engine in replica_engines + shard_engines[1:]:
+    event.listen(_extra_engine, "before_cursor_execute", _record_statement_cache)
+
+
+# === シャードルーター ===
+class ShardAssignment(NamedTuple):
+    """ユーザーの割り当て先シャード"""
+    shard_id: int
+    locked: bool
+
+
+@lru_cache(maxsize=None)
+def _user_shard_statement():
+    """割り当て取得用の組み立て済みステートメント（モデルの循環importを避けるため初回呼び出し時に生成）"""
+    from app.features.users.models import UserShard
+
+    return select(UserShard.shard_id, UserShard.locked).where(UserShard.user_id == bindparam("user_id"))
+
+
+@lru_cache(maxsize=None)
+def _user_shard_for_share_statement():
+    """共有ロック付きの割り当て取得（書き込みのコミット直前の再確認用）"""
+    return _user_shard_statement().with_for_update(read=True)
+
+
+class ShardRouter:
+    """user_id から料理データのシャード（エンジン）を決める
+
+    プライマリの user_shards テーブルに割り当てがあればそれを使い、
+    なければ user_id のCRC32をシャード数で割った余りを使う。
+    割り当てはワーカーごとに SHARD_MAP_CACHE_SECONDS の間キャッシュする。
+    """
+
+    def __init__(self, engines: List[Engine], cache: TTLCache):
+        self.engines = engines
+        self.cache = cache
+
+    @property
+    def count(self) -> int:
+        return len(self.engines)
+
+    def default_shard(self, user_id: str) -> int:
+        """ハッシュによる既定のシャード番号"""
+        try:
+            key = uuid.UUID(user_id).bytes
+        except (ValueError, AttributeError, TypeError):
+            key = str(user_id).encode("utf-8")
+        return zlib.crc32(key) % self.count
+
+    def lookup(self, user_id: str) -> ShardAssignment:
+        """ユーザーの割り当てを取得（シャードが1つの場合はDBを参照しない）"""
+        if self.count == 1:
+            return ShardAssignment(0, False)
+        assignment = self.cache.get(user_id)
+        if assignment is not None:
+            return assignment
+
+        with engine.connect() as conn:
+            row = conn.execute(_user_shard_statement(), {"user_id": user_id}).first()
+        assignment = self._assignment(user_id, row)
+        self.cache.set(user_id, assignment)
+        return assignment
+
+    def lookup_for_share(self, conn, user_id: str) -> ShardAssignment:
+        """プライマリの接続（またはセッション）で割り当てを共有ロック付きで取得（キャッシュを使わない）
+
+        ロックはその接続のトランザクションの終了まで保持され、
+        シャード移動の locked の更新はそれまで待たされる。
+        """
+        row = conn.execute(_user_shard_for_share_statement(), {"user_id": user_id}).first()
+        return self._assignment(user_id, row)
+
+    def _assignment(self, user_id: str, row) -> ShardAssignment:
+        if row is None:
+            return ShardAssignment(self.default_shard(user_id), False)
+        if row.shard_id >= self.count:
+            raise RuntimeError(f"User {user_id} is assigned to unknown shard {row.shard_id}")
+        return ShardAssignment(row.shard_id, bool(row.locked))
+
+    def shard_for(self, user_id: str) -> int:
+        """ユーザーのシャード番号"""
+        return self.lookup(user_id).shard_id
+
+    def session_for_shard(self, shard_id: int, **kwargs):
+        """指定シャードのセッションを生成"""
+        return SessionLocal(bind=self.engines[shard_id], **kwargs)
+
+    def session_for_user(self, user_id: str, **kwargs):
+        """ユーザーのシャードのセッションを生成"""
+        return self.session_for_shard(self.shard_for(user_id), **kwargs)
+
+    def invalidate(self, user_id: str) -> None:
+        """このワーカーのキャッシュから割り当てを削除"""
+        self.cache.invalidate(user_id)
+
+    def stats(self) -> dict:
+        return {"shards": self.count, "cache": self.cache.stats()}
+
+
+# シングルトンインスタンス
+shard_router = ShardRouter(
+    shard_engines,
+    TTLCache(max_size=settings.shard_map_cache_size, ttl_seconds=settings.shard_map_cache_seconds),
+)
+metrics.register("shard_router", shard_router.stats)
+if async_engine is not None:
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _record_statement_cache)
+
+
 # === 依存性注入（同期） ===
 def get_db():
     """同期セッションを提供（従来のエンドポイント用）"""
@@ -0,0 +1,182 @@
+"""DBコネクションプールの設定・計測
+
+全エンジン（プライマリ・レプリカ・シャード・非同期）を同じプール設定で生成し、
+プールごとに次の値を /metrics の db_pool で参照できるようにする。
+
+- checkout_wait: プールから接続を取り出すまでの待ち時間（新規接続の確立を含む）
+- in_use / in_use_peak: 使用中の接続数と最大値
+- overflow_connects: pool_size を超えて確立した接続数
+- timeouts: DB_POOL_TIMEOUT 秒待っても接続を取得できなかった回数
+- invalidated / disconnects: 無効化された接続数と、切断エラーの検出回数
+
+SQLのログ出力（echo）は DB_ECHO=true の場合のみ有効にし、
+通常はスロークエリの記録（app/core/slow_query.py）のみを登録する。
+
+古い接続の検出方式は DB_POOL_STALE_CHECK で切り替える。
+- pre_ping: 取り出すたびに ping する（取り出しごとに1往復増える）
+- on_error: ping せず、切断エラーを検出した時点でその接続とプール内の古い接続を無効化する
+  （DB_POOL_RECYCLE でサーバー側のタイムアウト前に接続を作り直す）
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core import deadline, metrics, slow_query
+from app.core.config import settings
+
+
+class PoolStats:
+    """1つのプールの統計（スレッドセーフ）"""
+
+    def __init__(self, label: str, engine: Engine):
+        self.label = label
+        self.engine = engine
+        self.checkout_wait = metrics.LatencyStats()
+        self._lock = threading.Lock()
+        self._counts = {
+            "connects": 0,
+            "overflow_connects": 0,
+            "timeouts": 0,
+            "invalidated": 0,
+            "disconnects": 0,
+        }
+        self._in_use_peak = 0
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def observe_checkout(self, wait_seconds: float) -> None:
+        self.checkout_wait.observe(wait_seconds)
+        in_use = self._call_pool("checkedout")
+        with self._lock:
+            if in_use is not None and in_use > self._in_use_peak:
+                self._in_use_peak = in_use
+
+    def snapshot(self) -> dict:
+        """プールの現在値と累計を返す"""
+        with self._lock:
+            counts = dict(self._counts)
+            peak = self._in_use_peak
+        return {
+            "pool_size": self._call_pool("size"),
+            "in_use": self._call_pool("checkedout"),
+            "in_use_peak": peak,
+            "idle": self._call_pool("checkedin"),
+            "overflow": max(0, self._call_pool("overflow") or 0),
+            **counts,
+            "checkout_wait": self.checkout_wait.snapshot(),
+        }
+
+    def _call_pool(self, name: str) -> Optional[int]:
+        # NullPool 等は件数のメソッドを持たない
+        method = getattr(self.engine.pool, name, None)
+        return method() if method is not None else None
+
+
+class _InstrumentedPoolMixin:
+    """接続の取り出し待ち時間とタイムアウトを記録するプール"""
+
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.count("timeouts")
+            raise
+        if self.stats is not None:
+            self.stats.observe_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() 等で作り直されたプールにも統計を引き継ぐ
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# === 統計のレジストリ ===
+_pool_stats: Dict[str, PoolStats] = {}
+metrics.register("db_pool", lambda: {label: stats.snapshot() for label, stats in _pool_stats.items()})
+
+
+def instrument(engine: Engine, label: str) -> PoolStats:
+    """エンジンのプールにイベントリスナーを登録し、統計を /metrics に公開"""
+    stats = PoolStats(label, engine)
+    if isinstance(engine.pool, _InstrumentedPoolMixin):
+        engine.pool.stats = stats
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        stats.count("connects")
+        overflow = stats._call_pool("overflow")
+        if overflow is not None and overflow > 0:
+            stats.count("overflow_connects")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception) -> None:
+        stats.count("invalidated")
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context) -> None:
+        if context.is_disconnect:
+            stats.count("disconnects")
+
+    _pool_stats[label] = stats
+    return stats
+
+
+def _pool_options(pre_ping: Optional[bool]) -> dict:
+    if pre_ping is None:
+        pre_ping = settings.db_pool_stale_check == "pre_ping"
+    return {
+        "pool_pre_ping": pre_ping,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "query_cache_size": settings.db_statement_cache_size,
+    }
+
+
+def create_pooled_engine(
+    url: str, label: str, echo: Optional[bool] = None, pre_ping: Optional[bool] = None
+) -> Engine:
+    """プール設定・計測・デッドライン・スロークエリ記録付きの同期エンジンを生成"""
+    if echo is None:
+        echo = settings.db_echo
+    engine = create_engine(url, echo=echo, poolclass=InstrumentedQueuePool, **_pool_options(pre_ping))
+    instrument(engine, label)
+    deadline.install(engine)
+    slow_query.install(engine, label)
+    return engine
+
+
+def create_pooled_async_engine(url: str, label: str, echo: Optional[bool] = None) -> AsyncEngine:
+    """プール設定・計測・デッドライン・スロークエリ記録付きの非同期エンジンを生成"""
+    if echo is None:
+        echo = settings.db_echo
+    engine = create_async_engine(
+        url, echo=echo, poolclass=InstrumentedAsyncAdaptedQueuePool, **_pool_options(None)
+    )
+    instrument(engine.sync_engine, label)
+    deadline.install(engine.sync_engine)
+    slow_query.install(engine.sync_engine, label)
+    return engine
@@ -0,0 +1,91 @@
+"""リクエスト単位の処理時間の上限（デッドライン）
+
+エンドポイントごとの予算（ミリ秒）からデッドラインを決めてコンテキスト変数に保持し、
+リクエスト内のDBクエリ・S3呼び出しの前に残り時間を確認する。
+
+- MySQL の SELECT には残り時間を /*+ MAX_EXECUTION_TIME(ms) */ ヒントとして付与し、
+  超過したクエリはサーバー側で中断させる（エラー3024）
+- 残り時間がない場合は、クエリ・S3呼び出しを発行せずに DeadlineExceededError を送出する
+- DeadlineExceededError は 504 DEADLINE_EXCEEDED として返す（app/main.py）
+
+デッドラインは非同期の依存関数で設定する（同期の依存関数で設定したコンテキスト変数は
+スレッドプールから戻った後のエンドポイントに引き継がれないため）。
+バックグラウンドジョブ・CLIではデッドラインは設定されず、確認は常に通過する。
+"""
+
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.exceptions import DeadlineExceededError
+
+# デッドライン（time.monotonic() 基準の時刻）
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# MySQL のエラーコード: maximum statement execution time exceeded
+MYSQL_MAX_EXECUTION_TIME_EXCEEDED = 3024
+
+_SELECT_PATTERN = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+
+def start(budget_seconds: float) -> None:
+    """現在のコンテキストにデッドラインを設定"""
+    _deadline.set(time.monotonic() + budget_seconds)
+
+
+def clear() -> None:
+    """デッドラインを解除"""
+    _deadline.set(None)
+
+
+def remaining() -> Optional[float]:
+    """残り時間（秒）。デッドラインが設定されていない場合は None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(operation: str) -> Optional[float]:
+    """残り時間を確認し、超過していれば DeadlineExceededError を送出"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError(operation)
+    return left
+
+
+def request_deadline(budget_ms: int):
+    """
+    エンドポイントのデッドラインを設定する依存関数を生成
+
+    Args:
+        budget_ms: 処理時間の予算（ミリ秒、0以下で無効）
+    """
+    async def dependency() -> None:
+        if budget_ms > 0:
+            start(budget_ms / 1000)
+
+    return dependency
+
+
+def install(engine: Engine) -> None:
+    """エンジンにデッドラインの確認・MAX_EXECUTION_TIME ヒントの付与を登録"""
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _apply_deadline(conn, cursor, statement, parameters, context, executemany):
+        left = check("db")
+        if left is not None and conn.dialect.name == "mysql" and _SELECT_PATTERN.match(statement):
+            hint = f"SELECT /*+ MAX_EXECUTION_TIME({max(1, int(left * 1000))}) */"
+            statement = _SELECT_PATTERN.sub(hint, statement, count=1)
+        return statement, parameters
+
+    @event.listens_for(engine, "handle_error")
+    def _translate_timeout(context) -> None:
+        orig = context.original_exception
+        args = getattr(orig, "args", None)
+        if args and args[0] == MYSQL_MAX_EXECUTION_TIME_EXCEEDED:
+            raise DeadlineExceededError("db") from orig
@@ -0,0 +1,27 @@
+"""機能横断の共通例外"""
+
+
+class PasswordHasherBusyError(Exception):
+    """パスワードハッシュ処理の待ち行列が上限に達している"""
+    pass
+
+
+class RateLimitExceededError(Exception):
+    """レート制限の上限超過"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(Exception):
+    """リクエストの処理時間の上限（デッドライン）超過"""
+
+    def __init__(self, operation: str):
+        super().__init__(operation)
+        self.operation = operation
+
+
+class ShardMigratingError(Exception):
+    """ユーザーの料理データがシャード移動中（書き込み停止中）"""
+    pass
@@ -0,0 +1,69 @@
+"""アプリケーション内メトリクス
+
+各コンポーネント（パスワードハッシュ用プロセスプール、キャッシュ等）が
+自身の統計値を登録し、/metrics エンドポイントから一括で参照できるようにする。
+"""
+
+import threading
+from collections import deque
+from typing import Callable, Dict
+
+
+class LatencyStats:
+    """レイテンシ統計（スレッドセーフ）
+
+    直近 window 件の観測値を保持し、件数・平均・最大・パーセンタイルを返す。
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._samples: deque = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """観測値（秒）を記録"""
+        with self._lock:
+            self._samples.append(seconds)
+            self._count += 1
+            self._total += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    def percentile(self, p: float) -> float:
+        """直近の観測値からパーセンタイル（秒）を算出"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, int(len(samples) * p))
+        return samples[index]
+
+    def snapshot(self) -> dict:
+        """統計値をミリ秒単位の辞書で返す"""
+        with self._lock:
+            count = self._count
+            total = self._total
+            max_ = self._max
+        return {
+            "count": count,
+            "avg_ms": round(total / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(max_ * 1000, 3),
+        }
+
+
+# === メトリクスレジストリ ===
+_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, provider: Callable[[], dict]) -> None:
+    """メトリクス提供関数を登録（同名は上書き）"""
+    _providers[name] = provider
+
+
+def collect() -> dict:
+    """登録済みの全メトリクスを収集"""
+    return {name: provider() for name, provider in _providers.items()}
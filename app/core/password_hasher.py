@@ -0,0 +1,124 @@
+"""パスワードハッシュ専用プロセスプール
+
+bcryptはCPUを占有するため、FastAPIの共有スレッドプールで実行すると
+ログイン集中時に他のエンドポイント（料理API等）が巻き込まれて停止する。
+専用のプロセスプールで実行し、待ち行列の上限を超えた分は即座に拒否する。
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.exceptions import PasswordHasherBusyError
+
+
+# === ワーカープロセスで実行する関数 ===
+# ワーカープロセスはこのモジュールをimportするため、DB接続等の重いモジュールに依存しないこと
+
+
+def _hash(plain_password: str) -> str:
+    """パスワードをbcryptでハッシュ化"""
+    hashed = bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt())
+    return hashed.decode("utf-8")
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    """パスワードを検証"""
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+class PasswordHasher:
+    """パスワードハッシュ用の有界プロセスプール"""
+
+    # 検証時間の計測値がない場合に使う既定値（秒）
+    DEFAULT_VERIFY_SECONDS = 0.25
+
+    def __init__(self, max_workers: int, queue_limit: int):
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+        self.hash_latency = metrics.LatencyStats()
+        self.verify_latency = metrics.LatencyStats()
+
+    async def hash(self, plain_password: str) -> str:
+        """パスワードをハッシュ化（プロセスプールで実行）"""
+        return await self._run(_hash, self.hash_latency, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """パスワードを検証（プロセスプールで実行）"""
+        return await self._run(_verify, self.verify_latency, plain_password, hashed_password)
+
+    async def _run(self, fn, latency: metrics.LatencyStats, *args):
+        """待ち行列の上限を確認してからプロセスプールに投入"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.queue_limit:
+                self._rejected += 1
+                raise PasswordHasherBusyError()
+            self._pending += 1
+
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            latency.observe(time.perf_counter() - start)
+            with self._lock:
+                self._pending -= 1
+
+    def typical_verify_seconds(self) -> float:
+        """検証にかかる典型的な時間（直近の中央値、未計測の場合は既定値）"""
+        if self.verify_latency.snapshot()["count"] == 0:
+            return self.DEFAULT_VERIFY_SECONDS
+        return self.verify_latency.percentile(0.50)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """プロセスプールを遅延生成"""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # uvicornのスレッドを引き継がないようspawnで起動
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def shutdown(self) -> None:
+        """プロセスプールを停止"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        """待ち行列の深さ・レイテンシを返す"""
+        with self._lock:
+            pending = self._pending
+            rejected = self._rejected
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": min(pending, self.max_workers),
+            "queue_depth": max(0, pending - self.max_workers),
+            "rejected": rejected,
+            "hash": self.hash_latency.snapshot(),
+            "verify": self.verify_latency.snapshot(),
+        }
+
+
+# シングルトンインスタンス
+password_hasher = PasswordHasher(
+    max_workers=settings.password_hash_workers,
+    queue_limit=settings.password_hash_queue_limit,
+)
+metrics.register("password_hasher", password_hasher.stats)
@@ -0,0 +1,75 @@
+"""コネクションプールの古い接続の検出方式のベンチマーク
+
+DB_POOL_STALE_CHECK の pre_ping（取り出すたびにping）と on_error（pingしない）で
+同じDBに対して「接続の取り出し → SELECT 1 → 返却」を複数スレッドから繰り返し、
+1回あたりの所要時間と取り出し待ち時間を比較する。
+
+CLIから実行する場合:
+    python -m app.core.pool_bench --iterations 2000 --threads 8
+"""
+
+import argparse
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.db_pool import create_pooled_engine
+
+
+def run(mode: str, iterations: int, threads: int) -> dict:
+    """指定した方式で計測し、結果を返す"""
+    engine = create_pooled_engine(
+        settings.database_url,
+        f"bench_{mode}",
+        echo=False,
+        pre_ping=(mode == "pre_ping"),
+    )
+    latency = metrics.LatencyStats(window=iterations * threads)
+    per_thread = iterations // threads
+
+    def worker() -> None:
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            latency.observe(time.perf_counter() - start)
+
+    # 初回接続の確立は計測から除外
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    pool_stats = engine.pool.stats.snapshot()
+    engine.dispose()
+    return {
+        "mode": mode,
+        "ops": per_thread * threads,
+        "ops_per_sec": round(per_thread * threads / elapsed, 1),
+        "latency": latency.snapshot(),
+        "checkout_wait": pool_stats["checkout_wait"],
+        "overflow_connects": pool_stats["overflow_connects"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="コネクションプールの pre_ping / on_error の比較")
+    parser.add_argument("--iterations", type=int, default=2000, help="全スレッド合計の実行回数")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    for mode in ("pre_ping", "on_error"):
+        print(run(mode, args.iterations, args.threads))
+
+
+if __name__ == "__main__":
+    main()
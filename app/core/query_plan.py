@@ -0,0 +1,107 @@
+"""実行計画（EXPLAIN FORMAT=JSON）の取得・検査
+
+リポジトリのクエリがインデックスを使わなくなった（フルスキャン・filesortに退行した）ことを
+検出するために使う。MySQL 8.0 の EXPLAIN FORMAT=JSON の出力を対象とする。
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+# フルスキャンとみなすアクセス方式（ALL: テーブル全体、index: インデックス全体）
+FULL_SCAN_ACCESS_TYPES = ("ALL", "index")
+
+
+@dataclass
+class PlanReport:
+    """1クエリ分の実行計画と検出した問題"""
+    name: str
+    sql: str
+    plan: dict
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "ok": self.ok,
+            "problems": self.problems,
+            "tables": [
+                {
+                    "table": table.get("table_name"),
+                    "access_type": table.get("access_type"),
+                    "key": table.get("key"),
+                    "rows_examined_per_scan": table.get("rows_examined_per_scan"),
+                }
+                for table in iter_tables(self.plan)
+            ],
+        }
+
+
+def render_sql(db: Session, statement) -> str:
+    """パラメータをリテラルとして埋め込んだSQLを生成"""
+    if isinstance(statement, Query):
+        statement = statement.statement
+    compiled = statement.compile(
+        dialect=db.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    return str(compiled)
+
+
+def explain(db: Session, statement) -> dict:
+    """EXPLAIN FORMAT=JSON の結果を辞書で返す"""
+    sql = render_sql(db, statement)
+    raw = db.execute(text(f"EXPLAIN FORMAT=JSON {sql}")).scalar()
+    return json.loads(raw)
+
+
+def _walk(node) -> Iterator[dict]:
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def iter_tables(plan: dict) -> Iterator[dict]:
+    """実行計画に含まれるテーブルアクセス（"table" 要素）を列挙"""
+    for node in _walk(plan):
+        table = node.get("table")
+        if isinstance(table, dict):
+            yield table
+
+
+def find_problems(plan: dict) -> List[str]:
+    """実行計画からフルスキャン・filesort・一時テーブルを検出"""
+    problems: List[str] = []
+    for node in _walk(plan):
+        if node.get("using_filesort") is True:
+            problems.append("using filesort")
+        if node.get("using_temporary_table") is True:
+            problems.append("using temporary table")
+    for table in iter_tables(plan):
+        if table.get("access_type") in FULL_SCAN_ACCESS_TYPES:
+            problems.append(
+                f"full scan on {table.get('table_name')} (access_type={table.get('access_type')})"
+            )
+    return problems
+
+
+def check_query(db: Session, name: str, statement) -> PlanReport:
+    """クエリの実行計画を取得して検査"""
+    plan = explain(db, statement)
+    return PlanReport(
+        name=name,
+        sql=render_sql(db, statement),
+        plan=plan,
+        problems=find_problems(plan),
+    )
@@ -0,0 +1,131 @@
+"""レート制限（トークンバケット方式）
+
+バケットの状態は app.core.shared_state のスロットテーブルに保持し、
+全uvicornワーカーで共有する（ワーカー数倍の上限にならない）。
+
+認証済みエンドポイントはユーザーID、未認証エンドポイントはIPアドレスをキーにする。
+FastAPIの依存性として使用する:
+    @router.post("/login", dependencies=[Depends(limit_by_ip("auth", settings.rate_limit_auth))])
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Depends, Request
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.exceptions import RateLimitExceededError
+from app.core.security import get_current_user, get_current_user_async
+from app.core.shared_state import SlotValue, create_slot_store
+from app.core.user_cache import CachedUser
+
+
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d+)?\s*(second|minute|hour|day)s?\s*$")
+
+
+@dataclass(frozen=True)
+class Rate:
+    """レート制限値（period_seconds 秒あたり limit 回）"""
+    limit: int
+    period_seconds: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """レート制限の文字列を解析（例: "5/minute", "100/10 seconds"）"""
+        match = _RATE_PATTERN.match(value)
+        if not match:
+            raise ValueError(f"Invalid rate limit format: {value}")
+        limit, multiplier, unit = match.groups()
+        return cls(int(limit), int(multiplier or 1) * _UNIT_SECONDS[unit])
+
+
+class RateLimiter:
+    """トークンバケット方式のレート制限"""
+
+    def __init__(self, store):
+        self.store = store
+        self._allowed = 0
+        self._rejected = 0
+
+    def hit(self, key: str, rate: Rate) -> Optional[float]:
+        """
+        1リクエスト分のトークンを消費
+
+        Returns:
+            None: 許可
+            float: 拒否（再試行までの秒数）
+        """
+        refill_per_second = rate.limit / rate.period_seconds
+        now = time.time()
+
+        def consume(current: Optional[SlotValue]):
+            tokens, updated_at = current if current is not None else (rate.limit, now)
+            tokens = min(rate.limit, tokens + max(0.0, now - updated_at) * refill_per_second)
+            if tokens >= 1:
+                return (tokens - 1, now), None
+            return (tokens, now), (1 - tokens) / refill_per_second
+
+        retry_after = self.store.update(key, consume)
+        if retry_after is None:
+            self._allowed += 1
+        else:
+            self._rejected += 1
+        return retry_after
+
+    def check(self, key: str, rate: Rate) -> None:
+        """トークンを消費し、上限超過の場合は例外を送出"""
+        retry_after = self.hit(key, rate)
+        if retry_after is not None:
+            raise RateLimitExceededError(retry_after)
+
+    def stats(self) -> dict:
+        """許可・拒否件数を返す"""
+        return {
+            "backend": type(self.store).__name__,
+            "allowed": self._allowed,
+            "rejected": self._rejected,
+        }
+
+
+def get_client_ip(request: Request) -> str:
+    """クライアントのIPアドレスを取得"""
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(scope: str, limit: str):
+    """IPアドレス単位のレート制限（未認証エンドポイント用の依存性）"""
+    rate = Rate.parse(limit)
+
+    def dependency(request: Request) -> None:
+        rate_limiter.check(f"{scope}:ip:{get_client_ip(request)}", rate)
+
+    return dependency
+
+
+def limit_by_user(scope: str, limit: str):
+    """ユーザー単位のレート制限（認証済みエンドポイント用の依存性）"""
+    rate = Rate.parse(limit)
+
+    def dependency(current_user: CachedUser = Depends(get_current_user)) -> None:
+        rate_limiter.check(f"{scope}:user:{current_user.id}", rate)
+
+    return dependency
+
+
+def limit_by_user_async(scope: str, limit: str):
+    """ユーザー単位のレート制限（非同期エンドポイント用の依存性）"""
+    rate = Rate.parse(limit)
+
+    async def dependency(current_user: CachedUser = Depends(get_current_user_async)) -> None:
+        rate_limiter.check(f"{scope}:user:{current_user.id}", rate)
+
+    return dependency
+
+
+# シングルトンインスタンス
+rate_limiter = RateLimiter(create_slot_store("rate_limit", settings.rate_limit_slots))
+metrics.register("rate_limiter", rate_limiter.stats)
@@ -0,0 +1,272 @@
+"""読み取り専用レプリカへの振り分け
+
+参照系のエンドポイント（料理一覧・詳細）は get_read_db でレプリカのセッションを受け取り、
+書き込み系のエンドポイントは get_write_db でプライマリのセッションを受け取る。
+
+- レプリカが複数ある場合はラウンドロビンで振り分ける
+- 書き込みをコミットしたユーザーは REPLICA_STICKY_SECONDS の間プライマリから読む
+  （レプリケーション遅延で自分の変更が見えなくなるのを防ぐ。全ワーカーで共有）
+- 接続に失敗したレプリカは REPLICA_RETRY_SECONDS の間振り分け対象から外し、
+  利用可能なレプリカがなければプライマリから読む
+- 料理データをシャーディングしている場合、シャード0（プライマリ）以外に割り当てられた
+  ユーザーはそのシャードから読み書きする（レプリカはシャード0のみ）。
+  カテゴリの検証は get_category_db のプライマリのセッションで行う
+- シャードを複数使う場合、get_write_db のセッションはコミット直前にプライマリの user_shards を
+  共有ロック付きで再確認し、シャード移動中（または割り当て変更後）の書き込みを拒否する（503）
+"""
+
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, replica_engines, shard_router
+from app.core.exceptions import ShardMigratingError
+from app.core.security import get_current_user
+from app.core.shared_state import SlotValue, create_slot_store
+from app.core.user_cache import CachedUser
+
+logger = logging.getLogger(__name__)
+
+# レプリカ用セッションファクトリ（接続先はセッション生成時に指定）
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# 書き込み後の固定対象ユーザーを記録するセッションの info キー
+STICKY_USER_KEY = "replica_sticky_user_id"
+
+# コミット直前に割り当てを再確認する（ユーザーID, 書き込み先のシャード番号）を記録するセッションの info キー
+SHARD_GUARD_KEY = "shard_guard"
+
+# シャード0以外に書き込む場合に、共有ロックをコミットまで保持するプライマリの接続の info キー
+_SHARD_GUARD_CONN_KEY = "shard_guard_conn"
+
+
+class ReplicaRouter:
+    """読み取りセッションの振り分け（スレッドセーフ）"""
+
+    def __init__(
+        self,
+        engines: List[Engine],
+        store,
+        sticky_seconds: float,
+        retry_seconds: float,
+    ):
+        self.engines = engines
+        self.store = store
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self._cycle = itertools.cycle(range(len(engines))) if engines else None
+        self._lock = threading.Lock()
+        self._down_until = [0.0] * len(engines)
+        self._counts = {
+            "replica": 0,
+            "primary_sticky": 0,
+            "primary_fallback": 0,
+            "replica_failures": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def mark_write(self, user_id: str) -> None:
+        """書き込みのコミットを記録し、固定期間の間そのユーザーの読み取りをプライマリへ向ける"""
+        until = time.time() + self.sticky_seconds
+        self.store.update(self._key(user_id), lambda current: ((until, 0.0), None))
+
+    def is_sticky(self, user_id: str) -> bool:
+        """固定期間中かどうか"""
+        now = time.time()
+
+        def read(current: Optional[SlotValue]):
+            if current is None:
+                return (0.0, 0.0), False
+            return current, now < current[0]
+
+        return self.store.update(self._key(user_id), read)
+
+    def open_session(self, user_id: Optional[str] = None) -> Session:
+        """読み取り用セッションを生成（レプリカに接続できなければプライマリ）"""
+        if not self.enabled:
+            return SessionLocal()
+        if user_id is not None and self.is_sticky(user_id):
+            self._count("primary_sticky")
+            return SessionLocal()
+
+        for index in self._candidates():
+            session = ReplicaSessionLocal(bind=self.engines[index])
+            try:
+                # ここで接続を確保し、接続できないレプリカはクエリ実行前に除外する
+                session.connection()
+            except DBAPIError as e:
+                session.close()
+                self._mark_down(index, e)
+                continue
+            self._count("replica")
+            return session
+
+        self._count("primary_fallback")
+        return SessionLocal()
+
+    def stats(self) -> dict:
+        """振り分け件数とレプリカの状態を返す"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._counts)
+            down = [until > now for until in self._down_until]
+        return {
+            "replicas": len(self.engines),
+            "replicas_down": sum(down),
+            **counts,
+        }
+
+    def _candidates(self) -> List[int]:
+        """ラウンドロビン順に、利用可能なレプリカのインデックスを返す"""
+        now = time.time()
+        with self._lock:
+            start = next(self._cycle)
+            order = [(start + i) % len(self.engines) for i in range(len(self.engines))]
+            return [index for index in order if self._down_until[index] <= now]
+
+    def _mark_down(self, index: int, error: Exception) -> None:
+        logger.warning(
+            f"Replica unavailable, excluded for {self.retry_seconds}s: "
+            f"{self.engines[index].url!r}, error: {error}"
+        )
+        with self._lock:
+            self._down_until[index] = time.time() + self.retry_seconds
+            self._counts["replica_failures"] += 1
+
+    def _count(self, label: str) -> None:
+        with self._lock:
+            self._counts[label] += 1
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"replica_sticky:{user_id}"
+
+
+# シングルトンインスタンス
+replica_router = ReplicaRouter(
+    engines=replica_engines,
+    store=create_slot_store("replica_sticky", settings.replica_sticky_slots),
+    sticky_seconds=settings.replica_sticky_seconds,
+    retry_seconds=settings.replica_retry_seconds,
+)
+metrics.register("replica", replica_router.stats)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_sticky_after_commit(session: Session) -> None:
+    """get_write_db のセッションでコミットしたユーザーを固定対象として記録"""
+    user_id = session.info.get(STICKY_USER_KEY)
+    if user_id is not None and replica_router.enabled:
+        replica_router.mark_write(user_id)
+
+
+def shard_migrating() -> HTTPException:
+    """シャード移動中（書き込み停止中）のエラー"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "error_code": "SHARD_MIGRATING",
+            "message": "データの移行中です。しばらくしてから再度お試しください",
+            "details": None,
+        },
+        headers={"Retry-After": "5"},
+    )
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _check_shard_before_commit(session: Session) -> None:
+    """get_write_db のセッションのコミット直前に、プライマリの割り当てを共有ロック付きで再確認
+
+    依存性の解決時の確認はワーカーのキャッシュを使うため、シャード移動の開始直前に確認を通過した
+    書き込みが移動元にコミットされ、照合後に失われる場合がある。ここで locked または割り当ての変更を
+    検出した場合は ShardMigratingError を送出してコミットを中止する。共有ロックはコミットまで保持するため、
+    reshard の locked の更新は実行中の書き込みの完了を待つ。
+    """
+    guard = session.info.get(SHARD_GUARD_KEY)
+    if guard is None:
+        return
+    user_id, shard_id = guard
+    if shard_id == 0:
+        # プライマリへの書き込みは同じトランザクションでロックする
+        current = shard_router.lookup_for_share(session, user_id)
+    else:
+        conn = session.info.get(_SHARD_GUARD_CONN_KEY)
+        if conn is None:
+            conn = session.info[_SHARD_GUARD_CONN_KEY] = engine.connect()
+        current = shard_router.lookup_for_share(conn, user_id)
+    if current.locked or current.shard_id != shard_id:
+        shard_router.invalidate(user_id)
+        raise ShardMigratingError()
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _release_shard_guard(session: Session, *args) -> None:
+    """再確認に使ったプライマリの接続を閉じ、共有ロックを解放"""
+    conn = session.info.pop(_SHARD_GUARD_CONN_KEY, None)
+    if conn is not None:
+        conn.close()
+
+
+# === 依存性注入 ===
+def get_read_db(current_user: CachedUser = Depends(get_current_user)):
+    """参照系エンドポイント用のセッションを提供（レプリカ優先）"""
+    shard_id = shard_router.shard_for(current_user.id)
+    if shard_id == 0:
+        db = replica_router.open_session(current_user.id)
+    else:
+        db = shard_router.session_for_shard(shard_id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_category_db(current_user: CachedUser = Depends(get_current_user)):
+    """カテゴリ（参照データ）の検証用に、プライマリのセッションを提供
+
+    カテゴリの正本はプライマリに置く。ユーザーのシャードがプライマリの場合は
+    書き込み用のセッションで参照できるため None を返す（セッションを開かない）。
+    """
+    if shard_router.shard_for(current_user.id) == 0:
+        yield None
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_write_db(current_user: CachedUser = Depends(get_current_user)):
+    """書き込み系エンドポイント用のプライマリ（ユーザーのシャード）のセッションを提供
+
+    コミット時にユーザーを記録し、直後の読み取りをプライマリへ固定する。
+    シャード移動中のユーザーは書き込みを受け付けない（503）。シャードを複数使う場合は
+    コミット直前にも割り当てを再確認する（_check_shard_before_commit）。
+    """
+    assignment = shard_router.lookup(current_user.id)
+    if assignment.locked:
+        raise shard_migrating()
+    info = {STICKY_USER_KEY: current_user.id}
+    if shard_router.count > 1:
+        info[SHARD_GUARD_KEY] = (current_user.id, assignment.shard_id)
+    db = shard_router.session_for_shard(assignment.shard_id, info=info)
+    try:
+        yield db
+    finally:
+        db.close()
+        _release_shard_guard(db)
@@ -1,22 +1,40 @@
 """JWT・パスワード処理モジュール"""
 
 import hashlib
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core import metrics
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
+from app.core.password_hasher import password_hasher
+from app.core.user_cache import CachedUser, user_cache
 
 
 # OAuth2スキーム
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
+# 検証済みアクセストークンのキャッシュ（トークンのSHA-256 → クレーム）
+# 同じアクセストークンが有効期限内に繰り返し送られるため、署名検証を省略する
+_token_cache = TTLCache(
+    max_size=settings.token_cache_max_size,
+    ttl_seconds=settings.access_token_expire_minutes * 60,
+)
+metrics.register("token_cache", _token_cache.stats)
+
 
 def hash_password(plain_password: str) -> str:
     """パスワードをbcryptでハッシュ化"""
@@ -33,6 +51,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+async def hash_password_async(plain_password: str) -> str:
+    """パスワードをbcryptでハッシュ化（専用プロセスプールで実行）"""
+    return await password_hasher.hash(plain_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """パスワードを検証（専用プロセスプールで実行）"""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
 def create_access_token(user_id: str) -> str:
     """アクセストークンを生成"""
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.access_token_expire_minutes)
@@ -45,38 +73,75 @@ def create_access_token(user_id: str) -> str:
 
 
 def create_refresh_token(user_id: str) -> str:
-    """リフレッシュトークンを生成"""
+    """リフレッシュトークンを生成（REFRESH_TOKEN_FORMAT に応じてJWTまたは不透明トークン）"""
+    if settings.refresh_token_format == "opaque":
+        return create_opaque_refresh_token()
+
     expire = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
     payload = {
         "sub": user_id,
         "exp": expire,
         "type": "refresh",
+        "jti": uuid.uuid4().hex,  # 同一秒内の発行でもトークン（ハッシュ）を一意にする
     }
     return jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
+def create_opaque_refresh_token() -> str:
+    """不透明なリフレッシュトークンを生成（32バイトの乱数、base64url・43文字）
+
+    署名・有効期限は持たず、DBのハッシュ照合のみで検証する。
+    """
+    return secrets.token_urlsafe(32)
+
+
+def is_jwt_token(token: str) -> bool:
+    """JWT形式のトークンかどうか（不透明トークンは "." を含まない）"""
+    return "." in token
+
+
 def decode_token(token: str) -> Optional[dict]:
-    """トークンをデコード・検証"""
+    """トークンをデコード・検証（アクセストークンは有効期限までキャッシュ）"""
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return payload
     except JWTError:
         return None
 
+    # リフレッシュトークンは1回しか使われないためキャッシュしない
+    if payload.get("type") == "access":
+        _token_cache.set(cache_key, payload, ttl_seconds=payload["exp"] - time.time())
+    return payload
 
-def hash_token(token: str) -> str:
-    """リフレッシュトークンをSHA-256でハッシュ化（DB保存用）"""
-    return hashlib.sha256(token.encode()).hexdigest()
 
+def hash_token(token: str) -> bytes:
+    """リフレッシュトークンをSHA-256でハッシュ化（DB保存用、32バイトのダイジェスト）"""
+    return hashlib.sha256(token.encode()).digest()
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-):
-    """認証済みユーザーを取得（依存性注入用）"""
+
+@lru_cache(maxsize=None)
+def _auth_version_statement():
+    """auth_version照合用の組み立て済みステートメント（モデルの循環importを避けるため初回呼び出し時に生成）"""
     from app.features.users.models import User
 
-    credentials_exception = HTTPException(
+    return select(User.auth_version).where(User.id == bindparam("user_id"))
+
+
+@lru_cache(maxsize=None)
+def _active_user_statement():
+    """ユーザー取得用の組み立て済みステートメント（論理削除除外）"""
+    from app.features.users.models import User
+
+    return select(User).where(User.id == bindparam("user_id"), User.deleted_at.is_(None)).limit(1)
+
+
+def _credentials_exception() -> HTTPException:
+    """トークンが無効な場合のエラー"""
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail={
             "error_code": "INVALID_TOKEN",
@@ -86,29 +151,31 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _user_id_from_access_token(token: str) -> str:
+    """アクセストークンを検証してユーザーIDを返す（無効な場合は401）"""
     payload = decode_token(token)
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     # アクセストークンかどうかチェック
     if payload.get("type") != "access":
-        raise credentials_exception
+        raise _credentials_exception()
 
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user_id
 
-    # ユーザー取得
-    user = db.query(User).filter(
-        User.id == user_id,
-        User.deleted_at.is_(None),
-    ).first()
 
-    if user is None:
-        raise credentials_exception
+def _ensure_active(user: CachedUser) -> CachedUser:
+    """論理削除・ステータスをチェック（無効なユーザーは401）"""
+    from app.features.users.models import UserStatus
+
+    if user.deleted_at is not None:
+        raise _credentials_exception()
 
     # ステータスチェック
-    from app.features.users.models import UserStatus
     if user.status != UserStatus.active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -121,3 +188,77 @@ def get_current_user(
         )
 
     return user
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> CachedUser:
+    """認証済みユーザーを取得（依存性注入用）
+
+    ユーザーはスナップショット（CachedUser）としてキャッシュし、
+    auth_versionの照合のみで再利用する。
+    DBへのクエリは組み立て済みのステートメントを再利用する。
+    """
+    user_id = _user_id_from_access_token(token)
+
+    # キャッシュから取得（照合間隔を過ぎていればauth_versionのみDBで確認）
+    user: Optional[CachedUser] = None
+    entry = user_cache.get(user_id)
+    if entry is not None:
+        if not user_cache.needs_version_check(entry):
+            user = entry.user
+        else:
+            current_version = db.execute(_auth_version_statement(), {"user_id": user_id}).scalar()
+            if current_version == entry.user.auth_version:
+                user_cache.mark_checked(entry)
+                user = entry.user
+            else:
+                user_cache.invalidate(user_id)
+
+    # キャッシュにない場合はDBから取得
+    if user is None:
+        db_user = db.execute(_active_user_statement(), {"user_id": user_id}).scalars().first()
+        if db_user is None:
+            raise _credentials_exception()
+        user = CachedUser.from_model(db_user)
+        user_cache.set(user)
+
+    return _ensure_active(user)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> CachedUser:
+    """認証済みユーザーを取得（非同期エンドポイントの依存性注入用）
+
+    get_current_user と同じキャッシュを使い、DBへのクエリは非同期セッションで発行する。
+    """
+    user_id = _user_id_from_access_token(token)
+
+    user: Optional[CachedUser] = None
+    entry = user_cache.get(user_id)
+    if entry is not None:
+        if not user_cache.needs_version_check(entry):
+            user = entry.user
+        else:
+            current_version = (
+                await db.execute(_auth_version_statement(), {"user_id": user_id})
+            ).scalar()
+            if current_version == entry.user.auth_version:
+                user_cache.mark_checked(entry)
+                user = entry.user
+            else:
+                user_cache.invalidate(user_id)
+
+    if user is None:
+        db_user = (
+            await db.execute(_active_user_statement(), {"user_id": user_id})
+        ).scalars().first()
+        if db_user is None:
+            raise _credentials_exception()
+        user = CachedUser.from_model(db_user)
+        user_cache.set(user)
+
+    return _ensure_active(user)
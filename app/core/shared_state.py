@@ -0,0 +1,127 @@
+"""ワーカー間で共有する固定長スロットテーブル
+
+uvicornを複数ワーカー（プロセス）で起動した場合でも、レート制限等の
+カウンタを全ワーカーで共有するため、/dev/shm 上のファイルをmmapして使う。
+
+各スロットは「キーの指紋 + 2つの値 + 最終更新時刻」を保持する。
+キーの指紋からバケット（4スロット）を決め、バケット単位でロックするため
+1回の更新はO(1)。バケットが埋まっている場合は最も古いスロットを上書きする。
+
+SHARED_STATE_BACKEND=memory の場合はプロセス内の辞書で代替する（開発・テスト用）。
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+SlotValue = Tuple[float, float]
+# 現在値（未登録の場合はNone）を受け取り、(新しい値, 戻り値) を返す関数
+SlotUpdater = Callable[[Optional[SlotValue]], Tuple[SlotValue, R]]
+
+
+def _fingerprint(key: str) -> int:
+    """キーの64bit指紋（0は空きスロットを表すため使わない）"""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+class MemorySlotStore:
+    """プロセス内のスロットテーブル（ワーカー間では共有されない）"""
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, SlotValue]" = OrderedDict()
+
+    def update(self, key: str, updater: SlotUpdater) -> R:
+        """スロットをアトミックに更新"""
+        with self._lock:
+            value, result = updater(self._data.get(key))
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.slots:
+                self._data.popitem(last=False)
+            return result
+
+
+class SharedMemorySlotStore:
+    """mmapで全ワーカーと共有するスロットテーブル"""
+
+    # 指紋(uint64) / 値1(double) / 値2(double) / 最終更新時刻(double)
+    _SLOT = struct.Struct("<Qddd")
+    _BUCKET_SLOTS = 4
+
+    def __init__(self, path: str, slots: int):
+        self.path = path
+        self.buckets = max(1, slots // self._BUCKET_SLOTS)
+        self._bucket_size = self._SLOT.size * self._BUCKET_SLOTS
+        size = self._bucket_size * self.buckets
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+        # fcntlのロックはプロセス単位のため、同一プロセス内のスレッドは別途排他する
+        self._lock = threading.Lock()
+
+    def update(self, key: str, updater: SlotUpdater) -> R:
+        """スロットをアトミックに更新（バケット単位のファイルロック）"""
+        fingerprint = _fingerprint(key)
+        offset = (fingerprint % self.buckets) * self._bucket_size
+
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._bucket_size, offset)
+            try:
+                target, current = self._find_slot(offset, fingerprint)
+                value, result = updater(current)
+                self._SLOT.pack_into(self._mm, target, fingerprint, value[0], value[1], time.time())
+                return result
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._bucket_size, offset)
+
+    def _find_slot(self, offset: int, fingerprint: int) -> Tuple[int, Optional[SlotValue]]:
+        """バケット内で一致・空き・最古のスロットを探す"""
+        oldest_position, oldest_touched = offset, float("inf")
+        empty_position = None
+        for i in range(self._BUCKET_SLOTS):
+            position = offset + i * self._SLOT.size
+            slot_fingerprint, a, b, touched = self._SLOT.unpack_from(self._mm, position)
+            if slot_fingerprint == fingerprint:
+                return position, (a, b)
+            if slot_fingerprint == 0:
+                if empty_position is None:
+                    empty_position = position
+            elif touched < oldest_touched:
+                oldest_position, oldest_touched = position, touched
+        if empty_position is not None:
+            return empty_position, None
+        return oldest_position, None
+
+
+def create_slot_store(name: str, slots: int):
+    """
+    設定に応じたスロットテーブルを生成
+
+    Args:
+        name: 用途名（共有ファイル名に使用）
+        slots: スロット数
+    """
+    if settings.shared_state_backend == "shared":
+        path = os.path.join(settings.shared_state_dir, f"life_platter_{name}")
+        try:
+            return SharedMemorySlotStore(path, slots)
+        except OSError as e:
+            logger.warning(f"Shared slot store unavailable, falling back to memory: {path}, error: {e}")
+    return MemorySlotStore(slots)
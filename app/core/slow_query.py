@@ -0,0 +1,204 @@
+"""スロークエリの記録
+
+全SQLをログ出力する echo=True の代わりに、カーソル実行の前後にイベントリスナーを登録して
+所要時間を計り、SLOW_QUERY_THRESHOLD_MS 以上掛かったクエリだけを記録する。
+
+- 閾値以上のクエリは SLOW_QUERY_SAMPLE_RATE の割合で抽出して記録する（件数は全件数える）
+- 各エントリには、正規化したSQL・パラメータの形（値は含めない）・所要時間・行数・
+  発行元のルート（"GET /api/dishes/{dish_id}" 等、リクエスト外は None）を含める
+- 記録したエントリはWARNINGでログに出力し、直近 SLOW_QUERY_LOG_SIZE 件を /metrics の slow_queries で参照できる
+- SLOW_QUERY_EXPLAIN=true の場合、記録する SELECT について同じ接続で
+  EXPLAIN FORMAT=JSON を実行し、テーブルごとのアクセス方式をエントリに添える（MySQLのみ）
+
+発行元のルートは RouteContextMiddleware（app/main.py で登録）がコンテキスト変数に保持する。
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.query_plan import iter_tables
+
+logger = logging.getLogger(__name__)
+
+# 処理中のリクエストの ASGI スコープ（ルーティング後に scope["path_params"] が設定される）
+_scope: ContextVar[Optional[dict]] = ContextVar("slow_query_scope", default=None)
+
+# ExecutionContext に保持する開始時刻の属性名
+_START_ATTR = "_slow_query_start"
+
+_SELECT_PATTERN = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_HINT_PATTERN = re.compile(r"/\*\+.*?\*/\s*")
+_STRING_PATTERN = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+# 展開された IN 句・複数行 VALUES のプレースホルダ列（件数によってSQLが変わらないようにまとめる）
+_PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST_PATTERN = re.compile(r"(\(\?(?:, \?)*\))(?:\s*,\s*\1)+")
+_PLACEHOLDER_PATTERN = re.compile(r"%\([^)]+\)s|%s|:\w+|\?")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """SQLからヒント・リテラル・プレースホルダの差を取り除き、同じ形のクエリを同じ文字列にする"""
+    statement = _HINT_PATTERN.sub("", statement)
+    statement = _STRING_PATTERN.sub("?", statement)
+    statement = _PLACEHOLDER_PATTERN.sub("?", statement)
+    statement = _NUMBER_PATTERN.sub("?", statement)
+    statement = _WHITESPACE_PATTERN.sub(" ", statement).strip()
+    statement = _VALUES_LIST_PATTERN.sub(r"\1, ...", statement)
+    return _PLACEHOLDER_LIST_PATTERN.sub("(?, ...)", statement)
+
+
+def parameters_shape(parameters: Any, executemany: bool) -> Any:
+    """パラメータの形（キー・型名・件数）を返す（値は個人情報を含みうるため記録しない）"""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameters_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+
+def current_route() -> Optional[str]:
+    """処理中のリクエストのルート（"メソッド パスのテンプレート"）。リクエスト外は None"""
+    scope = _scope.get()
+    if scope is None:
+        return None
+    # パスパラメータの値を {名前} に戻す（ID ごとに別のルートとして集計されないように）
+    names = {str(value): f"{{{name}}}" for name, value in (scope.get("path_params") or {}).items()}
+    path = "/".join(names.get(segment, segment) for segment in scope.get("path", "").split("/"))
+    return f"{scope.get('method')} {path}"
+
+
+class RouteContextMiddleware:
+    """リクエストの ASGI スコープをコンテキスト変数に保持する ASGI ミドルウェア
+
+    スコープは参照で保持するため、ルーティング後に設定される scope["path_params"] も記録時に参照できる。
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _scope.reset(token)
+
+
+class SlowQueryLog:
+    """スロークエリの件数と直近のエントリ（スレッドセーフ）"""
+
+    def __init__(self, size: int):
+        self._lock = threading.Lock()
+        self._entries: deque = deque(maxlen=size)
+        self._counts = {"slow": 0, "sampled": 0, "explain_errors": 0}
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def add(self, entry: dict) -> None:
+        with self._lock:
+            self._entries.append(entry)
+            self._counts["sampled"] += 1
+
+    def snapshot(self) -> dict:
+        """設定・累計・直近のエントリ（新しい順）を返す"""
+        with self._lock:
+            counts = dict(self._counts)
+            entries = list(self._entries)
+        return {
+            "threshold_ms": settings.slow_query_threshold_ms,
+            "sample_rate": settings.slow_query_sample_rate,
+            **counts,
+            "recent": entries[::-1],
+        }
+
+
+slow_query_log = SlowQueryLog(settings.slow_query_log_size)
+metrics.register("slow_queries", slow_query_log.snapshot)
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[List[dict]]:
+    """同じ接続で EXPLAIN FORMAT=JSON を実行し、テーブルごとのアクセス方式を返す
+
+    DBAPIのカーソルを直接使うため、イベントリスナー（デッドライン・本モジュール）は再度呼ばれない。
+    """
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN FORMAT=JSON {statement}", parameters)
+        plan = json.loads(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+    return [
+        {
+            "table": table.get("table_name"),
+            "access_type": table.get("access_type"),
+            "key": table.get("key"),
+            "rows_examined_per_scan": table.get("rows_examined_per_scan"),
+        }
+        for table in iter_tables(plan)
+    ]
+
+
+def install(engine: Engine, label: str) -> None:
+    """エンジンにスロークエリの計測・記録を登録"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            setattr(context, _START_ATTR, time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, _START_ATTR, None)
+        if start is None:
+            return
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms < settings.slow_query_threshold_ms:
+            return
+        slow_query_log.count("slow")
+        if random.random() >= settings.slow_query_sample_rate:
+            return
+
+        entry: Dict[str, Any] = {
+            "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "engine": label,
+            "route": current_route(),
+            "duration_ms": round(elapsed_ms, 3),
+            "rows": cursor.rowcount,
+            "statement": normalize(statement),
+            "parameters": parameters_shape(parameters, executemany),
+        }
+        if (
+            settings.slow_query_explain
+            and not executemany
+            and conn.dialect.name == "mysql"
+            and _SELECT_PATTERN.match(statement)
+        ):
+            try:
+                entry["explain"] = _explain(conn, statement, parameters)
+            except Exception:
+                slow_query_log.count("explain_errors")
+                logger.warning("EXPLAIN failed for slow query", exc_info=True)
+        slow_query_log.add(entry)
+        logger.warning("slow query: %s", json.dumps(entry, ensure_ascii=False, default=str))
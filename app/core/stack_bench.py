@@ -0,0 +1,154 @@
+"""同期スタックと非同期スタックのベンチマーク
+
+ASYNC_ROUTES=false（同期エンドポイント・スレッドプール・PyMySQL）と
+ASYNC_ROUTES=true（非同期エンドポイント・aiomysql）でそれぞれuvicornを起動し、
+同じDB・同じユーザーに対して料理一覧（GET /api/dishes）を高い同時実行数で繰り返し、
+1秒あたりのリクエスト数とレイテンシ（p50 / p99）を比較する。
+
+ASYNC_DATABASE_URL の設定と httpx が必要。
+ベンチマーク用のユーザーと料理を DATABASE_URL のDBに作成する。
+
+CLIから実行する場合:
+    python -m app.core.stack_bench --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+
+STACKS = {"sync": "false", "async": "true"}
+
+
+def start_server(stack: str, port: int, workers: int) -> subprocess.Popen:
+    """指定したスタックでuvicornを起動し、応答するまで待つ"""
+    env = dict(
+        os.environ,
+        ASYNC_ROUTES=STACKS[stack],
+        # ベンチマーク中はレート制限に掛からないようにする
+        RATE_LIMIT_DISHES="100000000/minute",
+        RATE_LIMIT_AUTH="100000/minute",
+    )
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn ({stack}) exited with code {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn ({stack}) did not start within 60s")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def prepare_user(base_url: str, dishes: int) -> str:
+    """ベンチマーク用のユーザーと料理を作成し、アクセストークンを返す"""
+    suffix = uuid.uuid4().hex[:12]
+    with httpx.Client(base_url=base_url, timeout=30.0) as client:
+        response = client.post("/api/users/register", json={
+            "username": f"bench-{suffix}",
+            "email": f"bench-{suffix}@example.com",
+            "password": f"bench-{suffix}",
+        })
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        for i in range(dishes):
+            client.post(
+                "/api/dishes",
+                json={"name": f"bench dish {i}", "cooked_at": f"2024-01-{i % 28 + 1:02d}"},
+                headers=headers,
+            ).raise_for_status()
+    return token
+
+
+async def run_load(base_url: str, token: str, path: str, total: int, concurrency: int) -> dict:
+    """concurrency 本の並行クライアントで合計 total 回リクエストし、結果を返す"""
+    latency = metrics.LatencyStats(window=total)
+    errors = 0
+    remaining = total
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60.0) as client:
+        # 接続の確立とキャッシュのウォームアップは計測から除外
+        await asyncio.gather(*[client.get(path) for _ in range(concurrency)], return_exceptions=True)
+
+        async def worker() -> None:
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latency.observe(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "requests_per_sec": round(total / elapsed, 1),
+        "latency": latency.snapshot(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="同期スタックと非同期スタックの比較")
+    parser.add_argument("--requests", type=int, default=5000, help="スタックごとの合計リクエスト数")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1, help="uvicornのワーカー数")
+    parser.add_argument("--dishes", type=int, default=20, help="ベンチマーク用ユーザーの料理数")
+    parser.add_argument("--path", default="/api/dishes?limit=20")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if not settings.async_database_url:
+        raise SystemExit("ASYNC_DATABASE_URL is required")
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    token = None
+    for stack in STACKS:
+        process = start_server(stack, args.port, args.workers)
+        try:
+            if token is None:
+                token = prepare_user(base_url, args.dishes)
+            result = asyncio.run(run_load(base_url, token, args.path, args.requests, args.concurrency))
+        finally:
+            stop_server(process)
+        print({"stack": stack, "concurrency": args.concurrency, **result})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""ステートメントキャッシュのマイクロベンチマーク
+
+ホットパスのクエリについて、毎回 Query を組み立てる従来の書き方と
+組み立て済みステートメント（リポジトリの現在の実装）を同じDBに対して繰り返し実行し、
+1回あたりの所要時間とコンパイルキャッシュのヒット数を比較する。
+
+CLIから実行する場合:
+    python -m app.core.statement_bench --iterations 2000
+"""
+
+import argparse
+import time
+import uuid
+from typing import Callable, Optional
+
+from sqlalchemy.orm import joinedload
+
+from app.core.database import SessionLocal, engine, statement_cache_stats
+from app.features.dishes.models import Dish
+from app.features.dishes.repository import DishRepository
+from app.features.users.models import User
+from app.features.users.repository import UserRepository
+
+
+def measure(name: str, func: Callable[[], object], iterations: int) -> dict:
+    """func を iterations 回実行し、1回あたりの時間とキャッシュ統計の増分を返す"""
+    func()  # 初回のコンパイルは計測から除外
+    before = statement_cache_stats.stats()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    after = statement_cache_stats.stats()
+    return {
+        "name": name,
+        "per_call_us": round(elapsed / iterations * 1_000_000, 1),
+        "cache_hits": after["hits"] - before["hits"],
+        "cache_misses": after["misses"] - before["misses"],
+    }
+
+
+def run(iterations: int, user_id: Optional[str]) -> list:
+    """従来の Query と組み立て済みステートメントの計測結果を返す"""
+    db = SessionLocal()
+    echo = engine.echo
+    engine.echo = False  # SQLログの出力を計測に含めない
+    try:
+        user_id = user_id or db.query(User.id).limit(1).scalar() or str(uuid.uuid4())
+        user_repo = UserRepository(db)
+        dish_repo = DishRepository(db)
+
+        def legacy_find_user():
+            return db.query(User).filter(User.id == user_id, User.deleted_at.is_(None)).first()
+
+        def legacy_list_dishes():
+            return (
+                db.query(Dish)
+                .options(joinedload(Dish.category))
+                .filter(Dish.user_id == user_id, Dish.deleted_at.is_(None))
+                .order_by(Dish.cooked_at.desc(), Dish.id.desc())
+                .limit(21)
+                .all()
+            )
+
+        results = [
+            measure("users.find_by_id (Query)", legacy_find_user, iterations),
+            measure("users.find_by_id (prebuilt)", lambda: user_repo.find_by_id(user_id), iterations),
+            measure("dishes.list (Query)", legacy_list_dishes, iterations),
+            measure(
+                "dishes.list (prebuilt)",
+                lambda: dish_repo.find_list_with_pagination(user_id),
+                iterations,
+            ),
+        ]
+        db.rollback()
+        return results
+    finally:
+        engine.echo = echo
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ステートメントキャッシュのマイクロベンチマーク")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--user-id", default=None, help="計測に使うユーザーID（省略時は先頭のユーザー）")
+    args = parser.parse_args()
+
+    for result in run(args.iterations, args.user_id):
+        print(result)
+    print(statement_cache_stats.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""共通カラム型・ID生成
+
+主キー・外部キーは BINARY(16) に UUID を格納する。
+アプリケーション側では従来どおりハイフン付きの文字列（36文字）として扱う。
+
+新規IDは時刻順の UUIDv7 で生成し、InnoDB のクラスタインデックスへの
+挿入位置を末尾に寄せる（ランダムな UUIDv4 によるページ分割を避ける）。
+"""
+
+import os
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy.dialects.mysql import BINARY
+from sqlalchemy.types import TypeDecorator
+
+
+def uuid7() -> uuid.UUID:
+    """UUIDv7（RFC 9562）を生成
+
+    先頭48bitがUnixエポックからのミリ秒、残りが乱数。
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                              # version
+    value |= ((rand >> 62) & 0xFFF) << 64           # rand_a（12bit）
+    value |= 0b10 << 62                             # variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF           # rand_b（62bit）
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """新しい主キー（UUIDv7の文字列表現）を生成"""
+    return str(uuid7())
+
+
+class BinaryUUID(TypeDecorator):
+    """UUIDを BINARY(16) に格納するカラム型（Python側は文字列）"""
+
+    impl = BINARY
+    cache_ok = True
+
+    def __init__(self):
+        super().__init__(length=16)
+
+    def process_bind_param(self, value, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value.bytes
+        if isinstance(value, bytes):
+            return value
+        try:
+            return uuid.UUID(value).bytes
+        except (ValueError, AttributeError, TypeError):
+            # 不正な形式のID（パスパラメータ等）はどの行にも一致しないようNULLとして扱う
+            return None
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return str(uuid.UUID(bytes=bytes(value)))
+
+    def literal_processor(self, dialect):
+        """SQLリテラルとして描画する（EXPLAIN等で literal_binds を使う場合）"""
+        def process(value) -> str:
+            raw = self.process_bind_param(value, dialect)
+            return "NULL" if raw is None else f"0x{raw.hex()}"
+        return process
@@ -0,0 +1,89 @@
+"""認証済みユーザーのキャッシュ
+
+get_current_user が毎リクエスト発行していた users テーブルのSELECTを省略する。
+キャッシュはワーカーごとに保持されるため、users.auth_version を
+一定間隔（USER_CACHE_VERSION_CHECK_SECONDS）で照合し、
+他ワーカーでの無効化（ログアウト・ステータス変更・削除）を反映する。
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """ユーザーのスナップショット（get_current_user の戻り値）"""
+    id: str
+    username: str
+    email: str
+    status: Any  # UserStatus
+    deleted_at: Optional[datetime]
+    auth_version: int
+
+    @classmethod
+    def from_model(cls, user) -> "CachedUser":
+        """Userモデルからスナップショットを生成"""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            status=user.status,
+            deleted_at=user.deleted_at,
+            auth_version=user.auth_version or 0,
+        )
+
+
+class _Entry:
+    """キャッシュエントリ（最終照合時刻を保持）"""
+    __slots__ = ("user", "checked_at")
+
+    def __init__(self, user: CachedUser, checked_at: float):
+        self.user = user
+        self.checked_at = checked_at
+
+
+class UserCache:
+    """認証済みユーザーキャッシュ"""
+
+    def __init__(self, max_size: int, ttl_seconds: float, version_check_seconds: float):
+        self.version_check_seconds = version_check_seconds
+        self._cache = TTLCache(max_size, ttl_seconds)
+
+    def get(self, user_id: str) -> Optional[_Entry]:
+        """エントリを取得"""
+        return self._cache.get(user_id)
+
+    def needs_version_check(self, entry: _Entry) -> bool:
+        """auth_versionの照合が必要かどうか"""
+        return time.monotonic() - entry.checked_at >= self.version_check_seconds
+
+    def mark_checked(self, entry: _Entry) -> None:
+        """auth_versionの照合済み時刻を更新"""
+        entry.checked_at = time.monotonic()
+
+    def set(self, user: CachedUser) -> None:
+        """スナップショットを登録"""
+        self._cache.set(user.id, _Entry(user, time.monotonic()))
+
+    def invalidate(self, user_id: str) -> None:
+        """スナップショットを削除"""
+        self._cache.invalidate(user_id)
+
+    def stats(self) -> dict:
+        """ヒット率等を返す"""
+        return self._cache.stats()
+
+
+# シングルトンインスタンス
+user_cache = UserCache(
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    version_check_seconds=settings.user_cache_version_check_seconds,
+)
+metrics.register("user_cache", user_cache.stats)
@@ -0,0 +1,137 @@
+"""論理削除済み料理のアーカイブジョブ
+
+論理削除（deleted_at）から一定日数が経過した dishes と、その dish_images を
+dishes_archive / dish_images_archive へ主キーの小さなバッチで移動する。
+各バッチは「コピー → 削除 → コミット」を1トランザクションで行うため、
+途中で中断しても行が失われたり二重に移動されたりしない。
+
+DISH_ARCHIVE_PURGE_S3=true の場合は、移動前にS3の画像（images/dishes/{dish_id}/ 配下）も削除する。
+料理データをシャーディングしている場合は全シャードを順に処理する。
+各シャードの処理は名前付きロック（dish_archive:<シャード番号>）を取得して行い、
+他のワーカー・CLIが同じシャードを処理中の場合はそのシャードを飛ばす。
+
+アプリ内で定期実行する場合は DISH_ARCHIVE_INTERVAL_SECONDS を設定する。
+CLIから実行する場合:
+    python -m app.features.dishes.archive --batch-size 200 --sleep 0.1 --min-age-days 30
+"""
+
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Sequence
+
+from app.core.batch import BatchReport, job_lock, run_in_batches
+from app.core.config import settings
+from app.core.database import shard_router
+from app.features.dishes.repository import DishArchiveRepository, DishRepository
+from app.features.dishes.s3_service import s3_service
+
+logger = logging.getLogger(__name__)
+
+
+def archive_deleted_dishes(
+    batch_size: int = settings.dish_archive_batch_size,
+    sleep_seconds: float = settings.dish_archive_sleep_seconds,
+    min_age_days: int = settings.dish_archive_min_age_days,
+    purge_s3: bool = settings.dish_archive_purge_s3,
+    should_continue: Optional[Callable[[], bool]] = None,
+) -> List[BatchReport]:
+    """
+    論理削除から min_age_days 日以上経過した料理をアーカイブテーブルへ移動
+
+    Args:
+        batch_size: 1バッチで移動する料理数
+        sleep_seconds: バッチ間の待機時間（秒）
+        min_age_days: 論理削除からの猶予日数
+        purge_s3: True の場合はS3の画像も削除
+        should_continue: False を返した場合はバッチの区切りで打ち切る（アプリ終了時）
+
+    Returns:
+        List[BatchReport]: シャードごとの移動結果
+    """
+    deleted_before = datetime.now(timezone.utc) - timedelta(days=min_age_days)
+    reports: List[BatchReport] = []
+
+    for shard_id in range(shard_router.count):
+        if should_continue is not None and not should_continue():
+            break
+        with job_lock(shard_router.engines[shard_id], f"dish_archive:{shard_id}") as acquired:
+            if not acquired:
+                logger.info(f"Dish archive skipped, already running: shard={shard_id}")
+                continue
+            reports.append(_archive_shard(
+                shard_id, deleted_before, batch_size, sleep_seconds, purge_s3, should_continue,
+            ))
+
+    for report in reports:
+        logger.info(f"Dish archive finished: {report.as_dict()}")
+    return reports
+
+
+def _archive_shard(
+    shard_id: int,
+    deleted_before: datetime,
+    batch_size: int,
+    sleep_seconds: float,
+    purge_s3: bool,
+    should_continue: Optional[Callable[[], bool]],
+) -> BatchReport:
+    """1シャード分のアーカイブ（job_lock の取得後に呼ぶ）"""
+    db = shard_router.session_for_shard(shard_id)
+    try:
+        dish_repo = DishRepository(db)
+        archive_repo = DishArchiveRepository(db)
+
+        def archive(dish_ids: Sequence[str]) -> int:
+            # S3を先に削除（DB移動前に失敗しても再実行で同じ料理が対象になる）
+            if purge_s3:
+                for dish_id in dish_ids:
+                    s3_service.delete_prefix(f"images/dishes/{dish_id}/")
+            try:
+                archived = dish_repo.archive_by_ids(dish_ids)
+                if purge_s3:
+                    archive_repo.mark_images_purged(dish_ids)
+                dish_repo.commit()
+            except Exception:
+                dish_repo.rollback()
+                raise
+            return archived
+
+        return run_in_batches(
+            label=f"dishes.archive[shard={shard_id}]",
+            fetch_ids=lambda limit: dish_repo.find_deleted_ids_before(deleted_before, limit),
+            process_ids=archive,
+            batch_size=batch_size,
+            sleep_seconds=sleep_seconds,
+            should_continue=should_continue,
+        )
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="論理削除済みの料理をアーカイブテーブルへ移動")
+    parser.add_argument("--batch-size", type=int, default=settings.dish_archive_batch_size)
+    parser.add_argument("--sleep", type=float, default=settings.dish_archive_sleep_seconds)
+    parser.add_argument("--min-age-days", type=int, default=settings.dish_archive_min_age_days)
+    parser.add_argument(
+        "--purge-s3",
+        action=argparse.BooleanOptionalAction,
+        default=settings.dish_archive_purge_s3,
+        help="S3の画像も削除する",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    reports = archive_deleted_dishes(
+        batch_size=args.batch_size,
+        sleep_seconds=args.sleep,
+        min_age_days=args.min_age_days,
+        purge_s3=args.purge_s3,
+    )
+    for report in reports:
+        print(report.as_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""料理エンドポイント（非同期、ASYNC_ROUTES=true の場合に使用）
+
+router.py と同じパス・レスポンスを、非同期セッション（aiomysql）で処理する。
+非同期スタックはシャード0（プライマリ）のみを使い、レプリカ・シャードへの振り分けは行わない。
+"""
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.deadline import request_deadline
+from app.core.rate_limit import limit_by_user_async
+from app.core.security import get_current_user_async
+from app.features.users.models import User
+from app.features.dishes.schemas import (
+    DishCreateRequest,
+    DishUpdateRequest,
+    DishResponse,
+    DishListResponse,
+    MessageResponse,
+    PresignedUrlRequest,
+    PresignedUrlResponse,
+)
+from app.features.dishes.errors import etag, http_errors, parse_if_match
+from app.features.dishes.service import AsyncDishService
+from app.features.dishes.s3_service import s3_service
+
+
+router = APIRouter(
+    dependencies=[Depends(limit_by_user_async("dishes", settings.rate_limit_dishes))],
+)
+
+# エンドポイントごとの処理時間の上限（DBクエリ・S3呼び出しに適用）
+read_deadline = Depends(request_deadline(settings.request_deadline_dish_read_ms))
+write_deadline = Depends(request_deadline(settings.request_deadline_dish_write_ms))
+
+
+@router.post(
+    "",
+    response_model=DishResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[write_deadline],
+)
+async def create_dish(
+    request: DishCreateRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """料理を登録"""
+    with http_errors():
+        service = AsyncDishService(db)
+        dish = await service.create_dish(current_user.id, request)
+        response.headers["ETag"] = etag(dish.version)
+        return dish
+
+
+@router.get("", response_model=DishListResponse, dependencies=[read_deadline])
+async def list_dishes(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None),
+    category_id: Optional[str] = Query(default=None),
+    from_date: Optional[date] = Query(default=None),
+    to_date: Optional[date] = Query(default=None),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """料理一覧を取得"""
+    with http_errors():
+        service = AsyncDishService(db)
+        return await service.list_dishes(
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+            category_id=category_id,
+            from_date=from_date,
+            to_date=to_date,
+        )
+
+
+@router.post(
+    "/images/presigned-url",
+    response_model=PresignedUrlResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_presigned_url(
+    request: PresignedUrlRequest,
+    current_user: User = Depends(get_current_user_async),
+):
+    """画像アップロード用のPre-signed URLを取得"""
+    result = s3_service.generate_presigned_url(
+        content_type=request.content_type,
+        file_size=request.file_size,
+    )
+    return PresignedUrlResponse(**result)
+
+
+@router.get("/{dish_id}", response_model=DishResponse, dependencies=[read_deadline])
+async def get_dish(
+    dish_id: str,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """料理詳細を取得"""
+    with http_errors("read"):
+        service = AsyncDishService(db)
+        dish = await service.get_dish(dish_id, current_user.id)
+        response.headers["ETag"] = etag(dish.version)
+        return dish
+
+
+@router.put("/{dish_id}", response_model=DishResponse, dependencies=[write_deadline])
+async def update_dish(
+    dish_id: str,
+    request: DishUpdateRequest,
+    response: Response,
+    if_match: Optional[str] = Header(default=None),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """料理を更新（If-Match で指定したバージョンと異なる場合は 412）"""
+    with http_errors("update"):
+        service = AsyncDishService(db)
+        dish = await service.update_dish(dish_id, current_user.id, request, parse_if_match(if_match))
+        response.headers["ETag"] = etag(dish.version)
+        return dish
+
+
+@router.delete("/{dish_id}", response_model=MessageResponse, dependencies=[write_deadline])
+async def delete_dish(
+    dish_id: str,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """料理を削除（論理削除）"""
+    with http_errors("delete"):
+        service = AsyncDishService(db)
+        return await service.delete_dish(dish_id, current_user.id)
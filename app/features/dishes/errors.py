@@ -0,0 +1,153 @@
+"""料理エンドポイントのエラーレスポンス
+
+同期（router.py）・非同期（async_router.py）のエンドポイントで共通の、
+ETag / If-Match の処理と、サービス層の例外から HTTPException への変換。
+エラーコード・メッセージを変更する場合は本モジュールのみを変更する。
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set, Tuple, Type
+
+from fastapi import HTTPException, status
+
+from app.core.exceptions import ShardMigratingError
+from app.core.replica import shard_migrating
+from app.features.dishes.exceptions import (
+    DishNotFoundError,
+    PermissionDeniedError,
+    ImageLimitExceededError,
+    InvalidDisplayOrderError,
+    InvalidCursorError,
+    CategoryNotFoundError,
+    ImageNotFoundError,
+    ImageNotOwnedError,
+    S3ObjectNotFoundError,
+    VersionConflictError,
+)
+
+
+# 例外 → (ステータスコード, エラーコード, メッセージ)
+ERROR_RESPONSES: Dict[Type[Exception], Tuple[int, str, str]] = {
+    DishNotFoundError: (
+        status.HTTP_404_NOT_FOUND,
+        "DISH_NOT_FOUND",
+        "指定された料理が存在しません",
+    ),
+    ImageLimitExceededError: (
+        status.HTTP_400_BAD_REQUEST,
+        "IMAGE_LIMIT_EXCEEDED",
+        "画像は最大3枚まで登録できます",
+    ),
+    InvalidDisplayOrderError: (
+        status.HTTP_400_BAD_REQUEST,
+        "INVALID_DISPLAY_ORDER",
+        "display_orderが不正です（重複または範囲外）",
+    ),
+    InvalidCursorError: (
+        status.HTTP_400_BAD_REQUEST,
+        "INVALID_CURSOR",
+        "カーソルが不正です",
+    ),
+    CategoryNotFoundError: (
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        "CATEGORY_NOT_FOUND",
+        "指定されたカテゴリが存在しません",
+    ),
+    S3ObjectNotFoundError: (
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        "S3_OBJECT_NOT_FOUND",
+        "指定された画像ファイルが存在しません",
+    ),
+    ImageNotFoundError: (
+        status.HTTP_404_NOT_FOUND,
+        "IMAGE_NOT_FOUND",
+        "削除対象の画像が存在しません",
+    ),
+    ImageNotOwnedError: (
+        status.HTTP_403_FORBIDDEN,
+        "IMAGE_NOT_OWNED",
+        "削除対象の画像がこの料理に属していません",
+    ),
+}
+
+# PERMISSION_DENIED のメッセージ（操作ごとに異なる）
+PERMISSION_DENIED_MESSAGES: Dict[str, str] = {
+    "read": "この料理にアクセスする権限がありません",
+    "update": "この料理を更新する権限がありません",
+    "delete": "この料理を削除する権限がありません",
+}
+
+
+def etag(version: int) -> str:
+    """料理のバージョンからETagを生成（強いETag）"""
+    return f'"{version}"'
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[Set[int]]:
+    """If-Match ヘッダーから一致を許すバージョンを取得（未指定・"*" の場合は None）
+
+    弱いETag（W/"..."）・形式が不正なETagは一致しないものとして扱う。
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = set()
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.add(int(tag[1:-1]))
+    return versions
+
+
+def version_conflict(e: VersionConflictError) -> HTTPException:
+    """412 VERSION_CONFLICT（最新の料理を details.current と ETag で返す）"""
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail={
+            "error_code": "VERSION_CONFLICT",
+            "message": "料理が他の操作で更新されています。最新の内容を確認してください",
+            "details": {"current": e.current.model_dump(mode="json")},
+        },
+        headers={"ETag": etag(e.current.version)},
+    )
+
+
+def to_http_exception(e: Exception, operation: str) -> Optional[HTTPException]:
+    """サービス層の例外を HTTPException に変換（対応しない例外は None）
+
+    operation は PERMISSION_DENIED_MESSAGES のキー（"read" / "update" / "delete"）。
+    """
+    if isinstance(e, VersionConflictError):
+        return version_conflict(e)
+    if isinstance(e, ShardMigratingError):
+        return shard_migrating()
+    if isinstance(e, PermissionDeniedError):
+        code, error_code, message = (
+            status.HTTP_403_FORBIDDEN,
+            "PERMISSION_DENIED",
+            PERMISSION_DENIED_MESSAGES[operation],
+        )
+    elif type(e) in ERROR_RESPONSES:
+        code, error_code, message = ERROR_RESPONSES[type(e)]
+    else:
+        return None
+    return HTTPException(
+        status_code=code,
+        detail={"error_code": error_code, "message": message, "details": None},
+    )
+
+
+@contextmanager
+def http_errors(operation: str = "read") -> Iterator[None]:
+    """ブロック内で送出されたサービス層の例外を HTTPException に変換して送出する
+
+    同期・非同期どちらのエンドポイントでも `with http_errors("update"):` の形で使う。
+    operation は PERMISSION_DENIED のメッセージの選択にのみ使う。
+    対応しない例外はそのまま送出する（500）。
+    """
+    try:
+        yield
+    except Exception as e:
+        http_exception = to_http_exception(e, operation)
+        if http_exception is None:
+            raise
+        raise http_exception
@@ -41,6 +41,17 @@ class ImageNotOwnedError(Exception):
     pass
 
 
+class VersionConflictError(Exception):
+    """料理が読み込み後に他のリクエストで更新された（If-Match の不一致を含む）
+
+    current には最新の料理（DishResponse）を設定する。
+    """
+
+    def __init__(self, current=None):
+        super().__init__()
+        self.current = current
+
+
 class S3ObjectNotFoundError(Exception):
     """S3オブジェクトが存在しない"""
     pass
@@ -0,0 +1,110 @@
+"""料理の画像サマリー（thumbnail_key / image_count）の整合性チェック・バックフィル
+
+dishes.thumbnail_key / dishes.image_count は dish_images の非正規化コピーで、
+DishService の登録・更新時に同じトランザクション内で更新される。
+このジョブは dishes を主キー順のバッチで走査し、dish_images から再集計した値と比較する。
+
+CLIから実行する場合:
+    python -m app.features.dishes.image_summary check
+    python -m app.features.dishes.image_summary backfill --batch-size 1000 --sleep 0.1
+"""
+
+import argparse
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.batch import BatchReport, run_in_batches
+from app.core.database import SessionLocal
+from app.features.dishes.repository import DishRepository, DishImageRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def sync_image_summaries(
+    fix: bool,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sleep_seconds: float = 0.0,
+) -> Tuple[BatchReport, List[dict]]:
+    """
+    非正規化カラムと dish_images の集計値を比較
+
+    Args:
+        fix: True の場合は不一致の行を更新（バックフィル）、False の場合は検出のみ
+        batch_size: 1バッチで走査する料理数
+        sleep_seconds: バッチ間の待機時間（秒）
+
+    Returns:
+        Tuple of (report, mismatches)
+        report.rows は不一致（fix=True の場合は更新）の件数
+    """
+    mismatches: List[dict] = []
+    db = SessionLocal()
+    try:
+        dish_repo = DishRepository(db)
+        image_repo = DishImageRepository(db)
+        last_id: Optional[str] = None
+        stored = {}
+
+        def fetch_ids(limit: int) -> List[str]:
+            nonlocal last_id
+            rows = dish_repo.find_image_summaries_after(last_id, limit)
+            stored.clear()
+            stored.update({dish_id: (thumbnail_key, image_count) for dish_id, thumbnail_key, image_count in rows})
+            if rows:
+                last_id = rows[-1][0]
+            return [row[0] for row in rows]
+
+        def compare(dish_ids: Sequence[str]) -> int:
+            actual = image_repo.summarize_by_dish_ids(dish_ids)
+            mismatched = 0
+            for dish_id in dish_ids:
+                if stored[dish_id] == actual[dish_id]:
+                    continue
+                mismatched += 1
+                mismatches.append({"dish_id": dish_id, "stored": stored[dish_id], "actual": actual[dish_id]})
+                if fix:
+                    dish_repo.update_image_summary(dish_id, *actual[dish_id])
+            if fix:
+                dish_repo.commit()
+            else:
+                dish_repo.rollback()
+            return mismatched
+
+        report = run_in_batches(
+            label="dishes.image_summary.backfill" if fix else "dishes.image_summary.check",
+            fetch_ids=fetch_ids,
+            process_ids=compare,
+            batch_size=batch_size,
+            sleep_seconds=sleep_seconds,
+        )
+    finally:
+        db.close()
+
+    logger.info(f"Image summary {'backfill' if fix else 'check'} finished: {report.as_dict()}")
+    return report, mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="料理の画像サマリー（thumbnail_key / image_count）の整合性チェック")
+    parser.add_argument("mode", choices=["check", "backfill"])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--sleep", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report, mismatches = sync_image_summaries(
+        fix=args.mode == "backfill",
+        batch_size=args.batch_size,
+        sleep_seconds=args.sleep,
+    )
+    for mismatch in mismatches:
+        print(mismatch)
+    print(report.as_dict())
+    if args.mode == "check" and mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,17 @@
-import uuid
-
 from sqlalchemy import Column, String, DateTime, Date, Integer, ForeignKey, Index
-from sqlalchemy.dialects.mysql import CHAR, TINYINT
+from sqlalchemy.dialects.mysql import TINYINT
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.types import BinaryUUID, new_id
 
 
 class DishCategory(Base):
     """料理カテゴリマスタテーブル"""
     __tablename__ = "dish_categories"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()), comment="主キー（UUID）")
+    id = Column(BinaryUUID(), primary_key=True, default=new_id, comment="主キー（UUIDv7）")
     name = Column(String(50), nullable=False, unique=True, comment="カテゴリ名")
     display_order = Column(Integer, nullable=False, default=0, comment="表示順序")
     created_at = Column(DateTime, server_default=func.now(), comment="作成日時")
@@ -27,19 +26,29 @@ class Dish(Base):
     """料理テーブル"""
     __tablename__ = "dishes"
     __table_args__ = (
-        Index("idx_dishes_user_cooked", "user_id", "cooked_at"),
-        Index("idx_dishes_user_deleted", "user_id", "deleted_at"),
+        # 一覧取得のキーセットシーク用（ORDER BY cooked_at DESC, id DESC をインデックス順で返す）
+        Index("idx_dishes_user_list", "user_id", "deleted_at", "cooked_at", "id"),
+        Index("idx_dishes_user_category_list", "user_id", "category_id", "deleted_at", "cooked_at", "id"),
+        # アーカイブ対象（論理削除から一定日数経過）の検索用
+        Index("idx_dishes_deleted_at", "deleted_at"),
     )
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()), comment="主キー（UUID）")
-    user_id = Column(CHAR(36), ForeignKey("users.id"), nullable=False, index=True, comment="ユーザーID")
-    category_id = Column(CHAR(36), ForeignKey("dish_categories.id"), nullable=True, index=True, comment="カテゴリID")
+    id = Column(BinaryUUID(), primary_key=True, default=new_id, comment="主キー（UUIDv7）")
+    user_id = Column(BinaryUUID(), ForeignKey("users.id"), nullable=False, comment="ユーザーID")
+    category_id = Column(BinaryUUID(), ForeignKey("dish_categories.id"), nullable=True, index=True, comment="カテゴリID")
     name = Column(String(200), nullable=False, comment="料理名")
     cooked_at = Column(Date, nullable=False, comment="作った日")
+    thumbnail_key = Column(String(200), nullable=True, comment="サムネイル画像のS3キー（display_order=1の画像、非正規化）")
+    image_count = Column(TINYINT, nullable=False, default=0, server_default="0", comment="画像枚数（非正規化）")
+    version = Column(Integer, nullable=False, default=1, server_default="1", comment="楽観的排他制御のバージョン（更新ごとに+1）")
     created_at = Column(DateTime, server_default=func.now(), comment="作成日時")
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment="更新日時")
     deleted_at = Column(DateTime, nullable=True, comment="削除日時（論理削除）")
 
+    # ORMの UPDATE は WHERE version = <読み込んだ値> で行い、version を +1 する
+    # （一致する行がなければ StaleDataError。リポジトリで VersionConflictError に変換する）
+    __mapper_args__ = {"version_id_col": version}
+
     # リレーション
     user = relationship("User", back_populates="dishes")
     category = relationship("DishCategory", back_populates="dishes")
@@ -50,11 +59,41 @@ class DishImage(Base):
     """料理画像テーブル"""
     __tablename__ = "dish_images"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()), comment="主キー（UUID）")
-    dish_id = Column(CHAR(36), ForeignKey("dishes.id", ondelete="CASCADE"), nullable=False, index=True, comment="料理ID")
+    id = Column(BinaryUUID(), primary_key=True, default=new_id, comment="主キー（UUIDv7）")
+    dish_id = Column(BinaryUUID(), ForeignKey("dishes.id", ondelete="CASCADE"), nullable=False, index=True, comment="料理ID")
     image_key = Column(String(200), nullable=False, comment="S3オブジェクトキー")
     display_order = Column(TINYINT, nullable=False, comment="表示順序（1-3）")
     created_at = Column(DateTime, server_default=func.now(), comment="作成日時")
 
     # リレーション
     dish = relationship("Dish", back_populates="images")
+
+
+class DishArchive(Base):
+    """アーカイブ済み料理テーブル（論理削除から一定日数経過した dishes の移動先）"""
+    __tablename__ = "dishes_archive"
+
+    id = Column(BinaryUUID(), primary_key=True, comment="主キー（dishes.id）")
+    user_id = Column(BinaryUUID(), nullable=False, index=True, comment="ユーザーID")
+    category_id = Column(BinaryUUID(), nullable=True, comment="カテゴリID")
+    name = Column(String(200), nullable=False, comment="料理名")
+    cooked_at = Column(Date, nullable=False, comment="作った日")
+    thumbnail_key = Column(String(200), nullable=True, comment="サムネイル画像のS3キー")
+    image_count = Column(TINYINT, nullable=False, default=0, server_default="0", comment="画像枚数")
+    created_at = Column(DateTime, nullable=True, comment="作成日時")
+    updated_at = Column(DateTime, nullable=True, comment="更新日時")
+    deleted_at = Column(DateTime, nullable=False, comment="削除日時（論理削除）")
+    archived_at = Column(DateTime, server_default=func.now(), comment="アーカイブ日時")
+    images_purged_at = Column(DateTime, nullable=True, comment="S3画像の削除日時")
+
+
+class DishImageArchive(Base):
+    """アーカイブ済み料理画像テーブル"""
+    __tablename__ = "dish_images_archive"
+
+    id = Column(BinaryUUID(), primary_key=True, comment="主キー（dish_images.id）")
+    dish_id = Column(BinaryUUID(), nullable=False, index=True, comment="料理ID")
+    image_key = Column(String(200), nullable=False, comment="S3オブジェクトキー")
+    display_order = Column(TINYINT, nullable=False, comment="表示順序（1-3）")
+    created_at = Column(DateTime, nullable=True, comment="作成日時")
+    archived_at = Column(DateTime, server_default=func.now(), comment="アーカイブ日時")
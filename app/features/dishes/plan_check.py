@@ -0,0 +1,155 @@
+"""料理リポジトリのクエリの実行計画チェック
+
+DishRepository の主要クエリについて EXPLAIN FORMAT=JSON を取得し、
+フルスキャン・filesort に退行していれば終了コード1で終了する。
+インデックス・クエリを変更した際に MySQL コンテナに対して実行する。
+
+データが少ないとオプティマイザはインデックスを使わないため、
+--seed で検査用のユーザー・料理を投入してから計画を取得する（終了時に削除）。
+
+CLIから実行する場合:
+    python -m app.features.dishes.plan_check --seed 5000
+"""
+
+import argparse
+import json
+import logging
+import random
+import uuid
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.query_plan import PlanReport, check_query
+from app.features.dishes.models import Dish, DishCategory
+from app.features.dishes.repository import _FIND_DISH_DETAIL, DishRepository
+from app.features.users.models import User, UserStatus
+
+logger = logging.getLogger(__name__)
+
+SEED_CATEGORIES = 5
+SEED_OTHER_USERS = 20
+
+
+def seed(db: Session, dishes_per_user: int) -> str:
+    """検査用のユーザー・カテゴリ・料理を投入し、検査対象のユーザーIDを返す"""
+    tag = uuid.uuid4().hex[:8]
+    categories = [
+        DishCategory(name=f"plan_check_{tag}_{i}", display_order=i) for i in range(SEED_CATEGORIES)
+    ]
+    users = [
+        User(
+            username=f"plan_check_{tag}_{i}",
+            email=f"plan_check_{tag}_{i}@example.com",
+            password_hash="!",
+            status=UserStatus.active,
+        )
+        for i in range(SEED_OTHER_USERS + 1)
+    ]
+    db.add_all(categories + users)
+    db.flush()
+
+    start = date.today() - timedelta(days=dishes_per_user)
+    dishes = [
+        {
+            "user_id": user.id,
+            "category_id": random.choice(categories).id if random.random() < 0.8 else None,
+            "name": f"plan_check_{i}",
+            "cooked_at": start + timedelta(days=random.randrange(dishes_per_user)),
+            "image_count": 0,
+        }
+        for user in users
+        for i in range(dishes_per_user)
+    ]
+    db.bulk_insert_mappings(Dish, dishes)
+    db.commit()
+    db.execute(text("ANALYZE TABLE dishes"))
+    return users[0].id
+
+
+def cleanup(db: Session) -> None:
+    """seed で投入した行を削除"""
+    db.rollback()
+    user_ids = [
+        row.id
+        for row in db.query(User.id).filter(User.username.like("plan\\_check\\_%", escape="\\"))
+    ]
+    if user_ids:
+        db.query(Dish).filter(Dish.user_id.in_(user_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+    db.query(DishCategory).filter(DishCategory.name.like("plan\\_check\\_%", escape="\\")).delete(
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def check_dish_queries(db: Session, user_id: str) -> List[PlanReport]:
+    """料理リポジトリの主要クエリの実行計画を検査"""
+    repo = DishRepository(db)
+    category_id = db.query(Dish.category_id).filter(
+        Dish.user_id == user_id, Dish.category_id.is_not(None)
+    ).limit(1).scalar()
+    last = db.query(Dish).filter(Dish.user_id == user_id).order_by(Dish.cooked_at.desc()).offset(20).first()
+    cursor = repo.encode_cursor(last.cooked_at, last.id) if last else None
+    dish_id = last.id if last else str(uuid.uuid4())
+    to_date = date.today()
+    from_date = to_date - timedelta(days=30)
+
+    def list_query(**kwargs):
+        stmt, params = repo.list_statement(user_id, **kwargs)
+        return stmt.params(params)
+
+    queries = {
+        "list": list_query(),
+        "list_cursor": list_query(cursor=cursor),
+        "list_date_range": list_query(from_date=from_date, to_date=to_date),
+        "list_category": list_query(category_id=category_id),
+        "list_category_cursor": list_query(category_id=category_id, cursor=cursor),
+        "find_detail": _FIND_DISH_DETAIL.params(dish_id=dish_id),
+        "find_by_id_for_user": db.query(Dish).filter(
+            Dish.id == dish_id, Dish.user_id == user_id, Dish.deleted_at.is_(None)
+        ),
+        "find_ids_by_user": db.query(Dish.id).filter(Dish.user_id == user_id).limit(100),
+    }
+    return [check_query(db, name, query) for name, query in queries.items()]
+
+
+def run(seed_dishes: Optional[int], user_id: Optional[str], verbose: bool) -> bool:
+    """実行計画を検査し、全クエリが問題なしの場合に True を返す"""
+    db = SessionLocal()
+    try:
+        if seed_dishes:
+            user_id = seed(db, seed_dishes)
+        if user_id is None:
+            raise SystemExit("--seed または --user-id を指定してください")
+
+        reports = check_dish_queries(db, user_id)
+        for report in reports:
+            print(json.dumps(report.as_dict(), ensure_ascii=False))
+            if verbose or not report.ok:
+                print(report.sql)
+                print(json.dumps(report.plan, indent=2))
+        return all(report.ok for report in reports)
+    finally:
+        if seed_dishes:
+            cleanup(db)
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="料理リポジトリのクエリの実行計画チェック")
+    parser.add_argument("--seed", type=int, default=None, help="検査用に投入するユーザーあたりの料理数")
+    parser.add_argument("--user-id", default=None, help="既存データで検査する場合のユーザーID")
+    parser.add_argument("--verbose", action="store_true", help="問題がなくても実行計画を出力")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not run(args.seed, args.user_id, args.verbose):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
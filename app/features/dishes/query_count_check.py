@@ -0,0 +1,234 @@
+"""料理の登録・更新で発行されるSQLの件数チェック
+
+DishService（ASYNC_DATABASE_URL が設定されていれば AsyncDishService も）の
+create_dish / update_dish を画像0〜3枚で実行し、発行されたSQL（カーソル実行）の件数を数える。
+画像1枚以上で件数が画像の枚数によって変わる場合、または上限を超えた場合は終了コード1で終了する。
+あわせて、書き込んだ値から組み立てたレスポンスが詳細取得（get_dish）の結果と一致することを確認する。
+
+S3はスタブモードに切り替えて実行する（実バケットには触れない）。
+検査用のユーザー・カテゴリ・料理を投入し、終了時に削除する。
+
+CLIから実行する場合:
+    python -m app.features.dishes.query_count_check
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core import database
+from app.features.dishes.models import Dish, DishCategory, DishImage
+from app.features.dishes.s3_service import s3_service
+from app.features.dishes.schemas import (
+    DishCreateRequest,
+    DishResponse,
+    DishUpdateRequest,
+    ImageAddInput,
+    ImageInput,
+)
+from app.features.dishes.service import MAX_IMAGES, AsyncDishService, DishService
+from app.features.users.models import User, UserStatus
+
+# 操作ごとのSQLの上限（料理の取得 + カテゴリの確認 + 画像の削除 + 画像の追加 + 料理の INSERT / UPDATE）
+STATEMENT_BUDGET = {
+    "create": 3,  # カテゴリの確認、料理の INSERT、画像の INSERT
+    "update": 5,  # 料理の取得、カテゴリの確認、画像の DELETE、画像の INSERT、料理の UPDATE
+}
+
+
+@contextmanager
+def record_statements(engine: Engine) -> Iterator[List[str]]:
+    """ブロック内で engine に発行されたSQLを記録"""
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split())[:80])
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+def seed(db: Session) -> Tuple[str, List[str]]:
+    """検査用のユーザー・カテゴリを投入し、(ユーザーID, カテゴリID一覧) を返す"""
+    tag = uuid.uuid4().hex[:8]
+    categories = [DishCategory(name=f"query_count_{tag}_{i}", display_order=i) for i in range(2)]
+    user = User(
+        username=f"query_count_{tag}",
+        email=f"query_count_{tag}@example.com",
+        password_hash="!",
+        status=UserStatus.active,
+    )
+    db.add_all(categories + [user])
+    db.commit()
+    return user.id, [category.id for category in categories]
+
+
+def cleanup(db: Session, user_id: str) -> None:
+    """seed と検査で投入した行を削除"""
+    db.rollback()
+    dish_ids = [row.id for row in db.query(Dish.id).filter(Dish.user_id == user_id)]
+    if dish_ids:
+        db.query(DishImage).filter(DishImage.dish_id.in_(dish_ids)).delete(synchronize_session=False)
+        db.query(Dish).filter(Dish.id.in_(dish_ids)).delete(synchronize_session=False)
+    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+    db.query(DishCategory).filter(DishCategory.name.like("query\\_count\\_%", escape="\\")).delete(
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def create_request(images: int, category_id: str) -> DishCreateRequest:
+    return DishCreateRequest(
+        name=f"query_count_{images}",
+        cooked_at=date.today(),
+        category_id=category_id,
+        images=[
+            ImageInput(image_key=f"images/dishes/temp/{uuid.uuid4()}.jpg", display_order=i + 1)
+            for i in range(images)
+        ],
+    )
+
+
+def update_request(created: DishResponse, category_id: str) -> DishUpdateRequest:
+    """全画像を入れ替え、カテゴリを変更する更新リクエスト"""
+    return DishUpdateRequest(
+        name=f"{created.name}_updated",
+        cooked_at=created.cooked_at,
+        category_id=category_id,
+        images_to_delete=[image.id for image in created.images] or None,
+        images_to_add=[
+            ImageAddInput(image_key=f"images/dishes/temp/{uuid.uuid4()}.jpg") for _ in created.images
+        ] or None,
+    )
+
+
+def _result(path: str, operation: str, images: int, statements: List[str], response: DishResponse,
+            stored: DishResponse) -> dict:
+    return {
+        "path": path,
+        "operation": operation,
+        "images": images,
+        "statements": len(statements),
+        "response_matches_db": response.model_dump() == stored.model_dump(),
+        "sql": statements,
+    }
+
+
+def run_sync(user_id: str, category_ids: List[str]) -> List[dict]:
+    """DishService の create / update のSQL件数を計測"""
+    results = []
+    for images in range(MAX_IMAGES + 1):
+        db = database.SessionLocal()
+        try:
+            service = DishService(db)
+            with record_statements(database.engine) as statements:
+                created = service.create_dish(user_id, create_request(images, category_ids[0]))
+            results.append(_result("sync", "create", images, statements, created,
+                                   service.get_dish(created.id, user_id)))
+            db.rollback()
+
+            with record_statements(database.engine) as statements:
+                updated = service.update_dish(created.id, user_id, update_request(created, category_ids[1]))
+            results.append(_result("sync", "update", images, statements, updated,
+                                   service.get_dish(created.id, user_id)))
+            db.rollback()
+        finally:
+            db.close()
+    return results
+
+
+async def run_async(user_id: str, category_ids: List[str]) -> List[dict]:
+    """AsyncDishService の create / update のSQL件数を計測"""
+    results = []
+    engine = database.async_engine.sync_engine
+    for images in range(MAX_IMAGES + 1):
+        async with database.AsyncSessionLocal() as db:
+            service = AsyncDishService(db)
+            with record_statements(engine) as statements:
+                created = await service.create_dish(user_id, create_request(images, category_ids[0]))
+            results.append(_result("async", "create", images, statements, created,
+                                   await service.get_dish(created.id, user_id)))
+            await db.rollback()
+
+            with record_statements(engine) as statements:
+                updated = await service.update_dish(created.id, user_id, update_request(created, category_ids[1]))
+            results.append(_result("async", "update", images, statements, updated,
+                                   await service.get_dish(created.id, user_id)))
+            await db.rollback()
+    return results
+
+
+def problems(results: List[dict]) -> List[str]:
+    """件数が画像の枚数によって変わる・上限を超える・レスポンスがDBと異なる操作を返す"""
+    found = []
+    for path in {result["path"] for result in results}:
+        for operation, budget in STATEMENT_BUDGET.items():
+            rows = [r for r in results if r["path"] == path and r["operation"] == operation]
+            counts = {r["statements"] for r in rows if r["images"] > 0}
+            if len(counts) > 1:
+                found.append(f"{path}.{operation}: statement count depends on image count {sorted(counts)}")
+            if any(r["statements"] > budget for r in rows):
+                found.append(f"{path}.{operation}: more than {budget} statements")
+            if not all(r["response_matches_db"] for r in rows):
+                found.append(f"{path}.{operation}: response differs from get_dish")
+    return found
+
+
+def run(verbose: bool) -> bool:
+    """検査を実行し、問題がない場合に True を返す"""
+    db = database.SessionLocal()
+    s3_client = s3_service.s3_client
+    s3_service.s3_client = None  # スタブモード
+    echo = database.engine.echo
+    database.engine.echo = False  # SQLログの出力を抑止（非同期エンジンも同様）
+    if database.async_engine is not None:
+        database.async_engine.echo = False
+    user_id: Optional[str] = None
+    try:
+        user_id, category_ids = seed(db)
+        results = run_sync(user_id, category_ids)
+        if database.AsyncSessionLocal is not None:
+            results += asyncio.run(run_async(user_id, category_ids))
+    finally:
+        if user_id is not None:
+            cleanup(db, user_id)
+        db.close()
+        s3_service.s3_client = s3_client
+        database.engine.echo = echo
+        if database.async_engine is not None:
+            database.async_engine.echo = echo
+
+    for result in results:
+        sql = result.pop("sql")
+        print(json.dumps(result))
+        if verbose:
+            for statement in sql:
+                print(f"    {statement}")
+    found = problems(results)
+    for problem in found:
+        print(problem)
+    return not found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="料理の登録・更新で発行されるSQLの件数チェック")
+    parser.add_argument("--verbose", action="store_true", help="発行されたSQLも出力")
+    args = parser.parse_args()
+
+    if not run(args.verbose):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""料理一覧の読み取り経路のベンチマーク
+
+limit=100 のページについて、ORMエンティティを経由する従来の経路
+（select(Dish) + joinedload(Dish.category) → Pydanticで検証しながら組み立て）と、
+現在の経路（Core の select() → DishListRow → model_construct）を比較する。
+どちらもレスポンスのJSON化までを1回として計測する。
+
+- latency: 1回あたりの所要時間（p50 / p99）
+- alloc_peak_kib: 1回の実行中に確保されたメモリのピーク（tracemalloc）
+- alloc_blocks: 1回の実行後に残っている割り当てブロック数の増分（ORMのアイデンティティマップ等）
+
+検査用のユーザー・カテゴリ・料理を投入して計測し、終了時に削除する。
+
+CLIから実行する場合:
+    python -m app.features.dishes.read_bench --iterations 500 --dishes 300
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core import metrics
+from app.core.database import SessionLocal, engine
+from app.features.dishes.models import Dish, DishCategory
+from app.features.dishes.schemas import CategoryResponse, DishListItemResponse, DishListResponse
+from app.features.dishes.s3_service import s3_service
+from app.features.dishes.service import DishService
+from app.features.users.models import User, UserStatus
+
+PAGE_SIZE = 100
+
+
+def seed(db: Session, dishes: int) -> str:
+    """検査用のユーザー・カテゴリ・料理を投入し、ユーザーIDを返す"""
+    tag = uuid.uuid4().hex[:8]
+    categories = [DishCategory(name=f"read_bench_{tag}_{i}", display_order=i) for i in range(5)]
+    user = User(
+        username=f"read_bench_{tag}",
+        email=f"read_bench_{tag}@example.com",
+        password_hash="!",
+        status=UserStatus.active,
+    )
+    db.add_all(categories + [user])
+    db.flush()
+    start = date.today() - timedelta(days=dishes)
+    db.bulk_insert_mappings(Dish, [
+        {
+            "user_id": user.id,
+            "category_id": random.choice(categories).id if random.random() < 0.8 else None,
+            "name": f"read_bench_{i}",
+            "cooked_at": start + timedelta(days=i),
+            "thumbnail_key": f"images/dishes/read_bench/{i}/1.jpg",
+            "image_count": 1,
+        }
+        for i in range(dishes)
+    ])
+    db.commit()
+    return user.id
+
+
+def cleanup(db: Session, user_id: str) -> None:
+    """seed で投入した行を削除"""
+    db.rollback()
+    db.query(Dish).filter(Dish.user_id == user_id).delete(synchronize_session=False)
+    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+    db.query(DishCategory).filter(DishCategory.name.like("read\\_bench\\_%", escape="\\")).delete(
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def orm_page(db: Session, user_id: str) -> bytes:
+    """従来の経路: ORMエンティティを読み込み、Pydanticで検証しながら組み立てる"""
+    dishes = db.execute(
+        select(Dish)
+        .options(joinedload(Dish.category))
+        .where(Dish.user_id == user_id, Dish.deleted_at.is_(None))
+        .order_by(Dish.cooked_at.desc(), Dish.id.desc())
+        .limit(PAGE_SIZE + 1)
+    ).scalars().all()
+    items = [
+        DishListItemResponse(
+            id=dish.id,
+            name=dish.name,
+            cooked_at=dish.cooked_at,
+            category=CategoryResponse(id=dish.category.id, name=dish.category.name) if dish.category else None,
+            thumbnail_url=s3_service.generate_image_url(dish.thumbnail_key) if dish.thumbnail_key else None,
+            image_count=dish.image_count,
+            created_at=dish.created_at,
+        )
+        for dish in dishes[:PAGE_SIZE]
+    ]
+    return DishListResponse(items=items, next_cursor=None, has_next=len(dishes) > PAGE_SIZE).model_dump_json().encode()
+
+
+def row_page(db: Session, user_id: str) -> bytes:
+    """現在の経路: DishService.list_dishes（Core の select() → 行DTO）"""
+    return DishService(db).list_dishes(user_id, limit=PAGE_SIZE).model_dump_json().encode()
+
+
+def measure(name: str, db: Session, func: Callable[[Session, str], bytes], user_id: str, iterations: int) -> dict:
+    """func を iterations 回実行し、レイテンシとメモリ割り当てを返す"""
+    # 1回のリクエストと同じく、セッションは毎回作り直す（アイデンティティマップを持ち越さない）
+    def call() -> bytes:
+        db.expunge_all()
+        result = func(db, user_id)
+        db.rollback()
+        return result
+
+    size = len(call())  # 初回のコンパイルは計測から除外
+    latency = metrics.LatencyStats(window=iterations)
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        latency.observe(time.perf_counter() - start)
+
+    samples = min(iterations, 50)
+    peak_total = 0
+    blocks_total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            db.expunge_all()
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            func(db, user_id)
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            db.rollback()
+            peak_total += peak - base
+            blocks_total += sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "name": name,
+        "page_size": PAGE_SIZE,
+        "response_bytes": size,
+        "latency": latency.snapshot(),
+        "alloc_peak_kib": round(peak_total / samples / 1024, 1),
+        "alloc_blocks": blocks_total // samples,
+    }
+
+
+def run(iterations: int, dishes: int) -> list:
+    """従来の経路と現在の経路の計測結果を返す"""
+    db = SessionLocal()
+    echo = engine.echo
+    engine.echo = False  # SQLログの出力を計測に含めない
+    user_id = seed(db, max(dishes, PAGE_SIZE + 1))
+    try:
+        return [
+            measure("dishes.list (ORM entities)", db, orm_page, user_id, iterations),
+            measure("dishes.list (Core rows)", db, row_page, user_id, iterations),
+        ]
+    finally:
+        cleanup(db, user_id)
+        engine.echo = echo
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="料理一覧（limit=100）の読み取り経路のベンチマーク")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--dishes", type=int, default=300, help="検査用ユーザーに投入する料理数")
+    args = parser.parse_args()
+
+    for result in run(args.iterations, args.dishes):
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,193 @@
 import base64
 import json
 from datetime import date, datetime, timezone
-from typing import Optional, List, Tuple
+from functools import lru_cache
+from typing import Any, Dict, Iterable, NamedTuple, Optional, List, Sequence, Set, Tuple
 
-from sqlalchemy import func, select, and_, or_
+from sqlalchemy import Date, Integer, Select, and_, bindparam, delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.types import new_id
+from app.features.dishes.models import Dish, DishArchive, DishCategory, DishImage, DishImageArchive
+from app.features.dishes.exceptions import InvalidCursorError, VersionConflictError
+
+
+def summarize_images(images: Iterable[Tuple[str, int]]) -> Tuple[Optional[str], int]:
+    """(image_key, display_order) の一覧から (thumbnail_key, image_count) を算出
+
+    サムネイルは display_order=1 の画像（存在しない場合はNone）。
+    """
+    thumbnail_key = None
+    image_count = 0
+    for image_key, display_order in images:
+        image_count += 1
+        if display_order == 1:
+            thumbnail_key = image_key
+    return thumbnail_key, image_count
+
+
+# === 組み立て済みステートメント ===
+# ホットパスのクエリはモジュール読み込み時に一度だけ組み立て、値はバインドパラメータで渡す。
+# リクエストごとのクエリ組み立てとキャッシュキー生成を省略し、コンパイル済みSQLを再利用する。
+_FIND_DISH_BY_ID = (
+    select(Dish)
+    .options(joinedload(Dish.category), joinedload(Dish.images))
+    .where(Dish.id == bindparam("dish_id"), Dish.deleted_at.is_(None))
+)
+_FIND_DISH_BY_ID_FOR_USER = _FIND_DISH_BY_ID.where(Dish.user_id == bindparam("user_id"))
+
+
+# === 参照系の行DTO ===
+# 一覧・詳細はORMエンティティを生成せず、必要なカラムだけを Core の select() で取得して
+# NamedTuple に詰める（アイデンティティマップへの登録・変更追跡・リレーションの読み込みを行わない）。
+_dishes = Dish.__table__
+_categories = DishCategory.__table__
+_images = DishImage.__table__
+
+
+class DishListRow(NamedTuple):
+    """料理一覧の1行"""
+    id: str
+    name: str
+    cooked_at: date
+    category_id: Optional[str]
+    category_name: Optional[str]
+    thumbnail_key: Optional[str]
+    image_count: int
+    created_at: datetime
+
+
+class DishImageRow(NamedTuple):
+    """料理詳細の画像1件"""
+    id: str
+    image_key: str
+    display_order: int
+
+
+class DishDetail(NamedTuple):
+    """料理詳細（画像は display_order 順）"""
+    id: str
+    user_id: str
+    name: str
+    cooked_at: date
+    category_id: Optional[str]
+    category_name: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    version: int
+    images: Tuple[DishImageRow, ...]
+
+
+# 料理・カテゴリ・画像を1回のLEFT JOINで取得（画像は最大3件のため行の重複は小さい）
+_FIND_DISH_DETAIL = (
+    select(
+        _dishes.c.id,
+        _dishes.c.user_id,
+        _dishes.c.name,
+        _dishes.c.cooked_at,
+        _dishes.c.category_id,
+        _categories.c.name.label("category_name"),
+        _dishes.c.created_at,
+        _dishes.c.updated_at,
+        _dishes.c.version,
+        _images.c.id.label("image_id"),
+        _images.c.image_key,
+        _images.c.display_order,
+    )
+    .select_from(
+        _dishes
+        .outerjoin(_categories, _categories.c.id == _dishes.c.category_id)
+        .outerjoin(_images, _images.c.dish_id == _dishes.c.id)
+    )
+    .where(_dishes.c.id == bindparam("dish_id"), _dishes.c.deleted_at.is_(None))
+    .order_by(_images.c.display_order)
+)
+
+
+# === 書き込み系 ===
+# 登録・更新は画像の枚数によらず一定数のSQLで行う。
+# - 画像行は1回の INSERT（executemany、PyMySQL / aiomysql では複数行の VALUES にまとめられる）で追加する
+# - 主キー・作成日時・更新日時はアプリ側で採番して書き込み、INSERT / UPDATE 後の再取得を不要にする
+_INSERT_IMAGES = insert(_images)
+_FIND_IMAGE_IDS = select(_images.c.id).where(_images.c.id.in_(bindparam("image_ids", expanding=True)))
+
+
+def _db_now() -> datetime:
+    """created_at / updated_at に書き込む現在時刻（UTC、DATETIME の精度に合わせて秒単位）"""
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+def _image_rows(dish_id: str, images: Sequence[Tuple[str, int]]) -> Tuple[List[DishImageRow], List[Dict[str, Any]]]:
+    """(image_key, display_order) の一覧から、画像の行DTOと INSERT のパラメータを生成"""
+    rows = [DishImageRow(new_id(), image_key, display_order) for image_key, display_order in images]
+    params = [
+        {"id": row.id, "dish_id": dish_id, "image_key": row.image_key, "display_order": row.display_order}
+        for row in rows
+    ]
+    return rows, params
+
+
+def _to_detail(rows: Sequence[Any]) -> Optional[DishDetail]:
+    """_FIND_DISH_DETAIL の結果行を DishDetail にまとめる"""
+    if not rows:
+        return None
+    first = rows[0]
+    return DishDetail(
+        *first[:9],
+        images=tuple(
+            DishImageRow(row.image_id, row.image_key, row.display_order)
+            for row in rows
+            if row.image_id is not None
+        ),
+    )
+
+
+@lru_cache(maxsize=None)
+def _list_statement(has_category: bool, has_from: bool, has_to: bool, has_cursor: bool) -> Select:
+    """料理一覧のステートメントをフィルタの組み合わせごとに1回だけ組み立てる"""
+    stmt = (
+        select(
+            _dishes.c.id,
+            _dishes.c.name,
+            _dishes.c.cooked_at,
+            _dishes.c.category_id,
+            _categories.c.name.label("category_name"),
+            _dishes.c.thumbnail_key,
+            _dishes.c.image_count,
+            _dishes.c.created_at,
+        )
+        .select_from(_dishes.outerjoin(_categories, _categories.c.id == _dishes.c.category_id))
+        .where(_dishes.c.user_id == bindparam("user_id"), _dishes.c.deleted_at.is_(None))
+    )
+
+    # カテゴリフィルタ
+    if has_category:
+        stmt = stmt.where(_dishes.c.category_id == bindparam("category_id"))
+
+    # 日付範囲フィルタ
+    if has_from:
+        stmt = stmt.where(_dishes.c.cooked_at >= bindparam("from_date", type_=Date))
+    if has_to:
+        stmt = stmt.where(_dishes.c.cooked_at <= bindparam("to_date", type_=Date))
+
+    # カーソル条件（cooked_at <= ? を併記してインデックスの範囲条件にする）
+    if has_cursor:
+        cursor_cooked_at = bindparam("cursor_cooked_at", type_=Date)
+        stmt = stmt.where(
+            _dishes.c.cooked_at <= cursor_cooked_at,
+            or_(
+                _dishes.c.cooked_at < cursor_cooked_at,
+                and_(_dishes.c.cooked_at == cursor_cooked_at, _dishes.c.id < bindparam("cursor_id")),
+            ),
+        )
 
-from app.features.dishes.models import Dish, DishImage, DishCategory
-from app.features.dishes.exceptions import InvalidCursorError
+    # ソートと取得件数
+    return stmt.order_by(_dishes.c.cooked_at.desc(), _dishes.c.id.desc()).limit(
+        bindparam("fetch_size", type_=Integer)
+    )
 
 
 class DishRepository:
@@ -24,13 +204,27 @@ class DishRepository:
         name: str,
         cooked_at: date,
         category_id: Optional[str] = None,
+        images: Sequence[Tuple[str, int]] = (),
+        dish_id: Optional[str] = None,
     ) -> Dish:
-        """料理を作成"""
+        """料理を作成（画像の非正規化カラムも同じ INSERT で設定する）
+
+        Args:
+            images: 登録する画像の (image_key, display_order) の一覧
+            dish_id: 主キー（画像の正式パスを INSERT 前に決める場合に指定、省略時は採番）
+        """
+        now = _db_now()
+        thumbnail_key, image_count = summarize_images(images)
         dish = Dish(
+            id=dish_id or new_id(),
             user_id=user_id,
             name=name,
             cooked_at=cooked_at,
             category_id=category_id,
+            thumbnail_key=thumbnail_key,
+            image_count=image_count,
+            created_at=now,
+            updated_at=now,
         )
         self.db.add(dish)
         self.db.flush()
@@ -38,34 +232,17 @@ class DishRepository:
 
     def find_by_id(self, dish_id: str) -> Optional[Dish]:
         """IDで料理を取得（論理削除除外、リレーション含む）"""
-        return (
-            self.db.query(Dish)
-            .options(
-                joinedload(Dish.category),
-                joinedload(Dish.images),
-            )
-            .filter(
-                Dish.id == dish_id,
-                Dish.deleted_at.is_(None),
-            )
-            .first()
-        )
+        return self.db.execute(_FIND_DISH_BY_ID, {"dish_id": dish_id}).unique().scalars().first()
+
+    def find_detail(self, dish_id: str) -> Optional[DishDetail]:
+        """IDで料理詳細を取得（論理削除除外、ORMエンティティを経由しない）"""
+        return _to_detail(self.db.execute(_FIND_DISH_DETAIL, {"dish_id": dish_id}).all())
 
     def find_by_id_for_user(self, dish_id: str, user_id: str) -> Optional[Dish]:
         """IDとユーザーIDで料理を取得"""
-        return (
-            self.db.query(Dish)
-            .options(
-                joinedload(Dish.category),
-                joinedload(Dish.images),
-            )
-            .filter(
-                Dish.id == dish_id,
-                Dish.user_id == user_id,
-                Dish.deleted_at.is_(None),
-            )
-            .first()
-        )
+        return self.db.execute(
+            _FIND_DISH_BY_ID_FOR_USER, {"dish_id": dish_id, "user_id": user_id}
+        ).unique().scalars().first()
 
     def find_list_with_pagination(
         self,
@@ -75,80 +252,61 @@ class DishRepository:
         category_id: Optional[str] = None,
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
-    ) -> Tuple[List[Tuple[Dish, Optional[str], int]], bool]:
+    ) -> Tuple[List[DishListRow], bool]:
         """
         ページネーション付きで料理一覧を取得
 
+        サムネイル・画像枚数は dishes の非正規化カラム（thumbnail_key / image_count）から読み、
+        dish_images は参照しない。ORMエンティティは生成せず DishListRow で返す。
+
         Returns:
             Tuple of (items, has_next)
-            items: List of (Dish, thumbnail_key, image_count)
         """
-        # サブクエリ: display_order=1 の image_key を取得
-        thumbnail_subquery = (
-            select(DishImage.image_key)
-            .where(
-                and_(
-                    DishImage.dish_id == Dish.id,
-                    DishImage.display_order == 1,
-                )
-            )
-            .correlate(Dish)
-            .scalar_subquery()
+        stmt, params = self.list_statement(
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            category_id=category_id,
+            from_date=from_date,
+            to_date=to_date,
         )
+        results = [DishListRow._make(row) for row in self.db.execute(stmt, params)]
 
-        # サブクエリ: 画像の件数を取得
-        count_subquery = (
-            select(func.count(DishImage.id))
-            .where(DishImage.dish_id == Dish.id)
-            .correlate(Dish)
-            .scalar_subquery()
-        )
+        # 次ページ判定
+        has_next = len(results) > limit
+        if has_next:
+            results = results[:limit]
 
-        # ベースクエリ
-        query = (
-            self.db.query(
-                Dish,
-                thumbnail_subquery.label("thumbnail_key"),
-                count_subquery.label("image_count"),
-            )
-            .options(joinedload(Dish.category))
-            .filter(Dish.user_id == user_id)
-            .filter(Dish.deleted_at.is_(None))
-        )
+        return results, has_next
 
-        # カテゴリフィルタ
-        if category_id:
-            query = query.filter(Dish.category_id == category_id)
+    @classmethod
+    def list_statement(
+        cls,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        category_id: Optional[str] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """
+        料理一覧のステートメントとパラメータを返す（次ページ判定のため limit+1 件を取得）
 
-        # 日付範囲フィルタ
+        インデックス idx_dishes_user_list / idx_dishes_user_category_list の
+        (user_id, [category_id,] deleted_at, cooked_at, id) を降順に辿るキーセットシークになる。
+        """
+        params: Dict[str, Any] = {"user_id": user_id, "fetch_size": limit + 1}
+        if category_id:
+            params["category_id"] = category_id
         if from_date:
-            query = query.filter(Dish.cooked_at >= from_date)
+            params["from_date"] = from_date
         if to_date:
-            query = query.filter(Dish.cooked_at <= to_date)
-
-        # カーソル条件
+            params["to_date"] = to_date
         if cursor:
-            cursor_cooked_at, cursor_id = self._decode_cursor(cursor)
-            query = query.filter(
-                or_(
-                    Dish.cooked_at < cursor_cooked_at,
-                    and_(
-                        Dish.cooked_at == cursor_cooked_at,
-                        Dish.id < cursor_id,
-                    ),
-                )
-            )
+            params["cursor_cooked_at"], params["cursor_id"] = cls._decode_cursor(cursor)
 
-        # ソートと取得
-        query = query.order_by(Dish.cooked_at.desc(), Dish.id.desc())
-        results = query.limit(limit + 1).all()
-
-        # 次ページ判定
-        has_next = len(results) > limit
-        if has_next:
-            results = results[:limit]
-
-        return results, has_next
+        stmt = _list_statement(bool(category_id), bool(from_date), bool(to_date), bool(cursor))
+        return stmt, params
 
     def update(
         self,
@@ -157,17 +315,102 @@ class DishRepository:
         cooked_at: date,
         category_id: Optional[str] = None,
     ) -> Dish:
-        """料理を更新"""
+        """料理を更新（set_image_summary で設定した非正規化カラムも同じ UPDATE で書き込む）
+
+        UPDATE は読み込んだ時点の version を条件に行い、他のリクエストが先に更新していれば
+        VersionConflictError を送出する（行ロックは UPDATE からコミットまでの間だけ保持される）。
+        """
         dish.name = name
         dish.cooked_at = cooked_at
         dish.category_id = category_id
-        self.db.flush()
+        # 値が変わらない場合も明示的に書き込む（onupdate の func.now() による UPDATE 後の再取得を避ける）
+        dish.updated_at = _db_now()
+        flag_modified(dish, "updated_at")
+        try:
+            self.db.flush()
+        except StaleDataError:
+            raise VersionConflictError()
         return dish
 
     def soft_delete(self, dish: Dish) -> None:
-        """料理を論理削除"""
+        """料理を論理削除（update と同じく version を条件に行う）"""
         dish.deleted_at = datetime.now(timezone.utc)
+        try:
+            self.db.flush()
+        except StaleDataError:
+            raise VersionConflictError()
+
+    def set_image_summary(self, dish: Dish, images: Iterable[Tuple[str, int]]) -> None:
+        """画像の非正規化カラム（thumbnail_key / image_count）を (image_key, display_order) の一覧から設定
+
+        DBへは次の flush（update）で書き込む。
+        """
+        dish.thumbnail_key, dish.image_count = summarize_images(images)
+
+    def find_image_summaries_after(
+        self, last_id: Optional[str], limit: int
+    ) -> List[Tuple[str, Optional[str], int]]:
+        """主キー順に (id, thumbnail_key, image_count) を取得（論理削除済みを含む）"""
+        query = self.db.query(Dish.id, Dish.thumbnail_key, Dish.image_count)
+        if last_id is not None:
+            query = query.filter(Dish.id > last_id)
+        return [tuple(row) for row in query.order_by(Dish.id).limit(limit).all()]
+
+    def update_image_summary(self, dish_id: str, thumbnail_key: Optional[str], image_count: int) -> None:
+        """画像の非正規化カラムを更新（コミットは呼び出し側）"""
+        self.db.query(Dish).filter(Dish.id == dish_id).update(
+            {"thumbnail_key": thumbnail_key, "image_count": image_count},
+            synchronize_session=False,
+        )
+
+    def find_ids_by_user(self, user_id: str, limit: int) -> List[str]:
+        """ユーザーの料理IDを取得（論理削除済みを含む）"""
+        rows = (
+            self.db.query(Dish.id)
+            .filter(Dish.user_id == user_id)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    def delete_by_ids(self, dish_ids: Sequence[str]) -> int:
+        """複数の料理を物理削除"""
+        deleted = self.db.query(Dish).filter(Dish.id.in_(dish_ids)).delete(
+            synchronize_session=False
+        )
         self.db.flush()
+        return deleted
+
+    def find_deleted_ids_before(self, deleted_before: datetime, limit: int) -> List[str]:
+        """論理削除日時が deleted_before より前の料理IDを取得（削除日時の古い順）"""
+        rows = (
+            self.db.query(Dish.id)
+            .filter(Dish.deleted_at < deleted_before)
+            .order_by(Dish.deleted_at)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    def archive_by_ids(self, dish_ids: Sequence[str]) -> int:
+        """論理削除済みの料理と画像をアーカイブテーブルへ移動（コミットは呼び出し側）"""
+        image_columns = ["id", "dish_id", "image_key", "display_order", "created_at"]
+        dish_columns = [
+            "id", "user_id", "category_id", "name", "cooked_at", "thumbnail_key",
+            "image_count", "created_at", "updated_at", "deleted_at",
+        ]
+        self.db.execute(insert(DishImageArchive).from_select(
+            image_columns,
+            select(*[DishImage.__table__.c[name] for name in image_columns])
+            .where(DishImage.dish_id.in_(dish_ids)),
+        ))
+        self.db.execute(insert(DishArchive).from_select(
+            dish_columns,
+            select(*[Dish.__table__.c[name] for name in dish_columns])
+            .where(Dish.id.in_(dish_ids)),
+        ))
+        self.db.execute(delete(DishImage).where(DishImage.dish_id.in_(dish_ids)))
+        return self.db.execute(delete(Dish).where(Dish.id.in_(dish_ids))).rowcount
 
     def commit(self) -> None:
         """トランザクションをコミット"""
@@ -177,10 +420,6 @@ class DishRepository:
         """トランザクションをロールバック"""
         self.db.rollback()
 
-    def refresh(self, obj) -> None:
-        """オブジェクトをリフレッシュ"""
-        self.db.refresh(obj)
-
     @staticmethod
     def encode_cursor(cooked_at: date, dish_id: str) -> str:
         """カーソルをBase64エンコード"""
@@ -205,50 +444,78 @@ class DishImageRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, dish_id: str, image_key: str, display_order: int) -> DishImage:
-        """画像レコードを作成"""
-        image = DishImage(
-            dish_id=dish_id,
-            image_key=image_key,
-            display_order=display_order,
+    def create_many(self, dish_id: str, images: Sequence[Tuple[str, int]]) -> List[DishImageRow]:
+        """(image_key, display_order) の一覧から画像レコードを1回の INSERT で作成"""
+        rows, params = _image_rows(dish_id, images)
+        if params:
+            self.db.execute(_INSERT_IMAGES, params)
+        return rows
+
+    def find_existing_ids(self, image_ids: Sequence[str]) -> Set[str]:
+        """指定したIDのうち存在する画像IDを1回の IN 検索で取得"""
+        return set(self.db.execute(_FIND_IMAGE_IDS, {"image_ids": list(image_ids)}).scalars())
+
+    def delete_by_ids(self, image_ids: List[str]) -> None:
+        """複数の画像レコードを物理削除"""
+        self.db.query(DishImage).filter(DishImage.id.in_(image_ids)).delete(
+            synchronize_session=False
         )
-        self.db.add(image)
         self.db.flush()
-        return image
-
-    def find_by_id(self, image_id: str) -> Optional[DishImage]:
-        """IDで画像を取得"""
-        return self.db.query(DishImage).filter(DishImage.id == image_id).first()
 
-    def find_by_dish_id(self, dish_id: str) -> List[DishImage]:
-        """料理IDで画像一覧を取得"""
-        return (
-            self.db.query(DishImage)
-            .filter(DishImage.dish_id == dish_id)
-            .order_by(DishImage.display_order)
+    def summarize_by_dish_ids(self, dish_ids: Sequence[str]) -> Dict[str, Tuple[Optional[str], int]]:
+        """料理IDごとに dish_images から (thumbnail_key, image_count) を集計"""
+        rows = (
+            self.db.query(DishImage.dish_id, DishImage.image_key, DishImage.display_order)
+            .filter(DishImage.dish_id.in_(dish_ids))
             .all()
         )
-
-    def get_max_display_order(self, dish_id: str) -> int:
-        """料理の最大display_orderを取得"""
-        result = (
-            self.db.query(func.max(DishImage.display_order))
-            .filter(DishImage.dish_id == dish_id)
-            .scalar()
+        images_by_dish: Dict[str, List[Tuple[str, int]]] = {dish_id: [] for dish_id in dish_ids}
+        for dish_id, image_key, display_order in rows:
+            images_by_dish[dish_id].append((image_key, display_order))
+        return {dish_id: summarize_images(images) for dish_id, images in images_by_dish.items()}
+
+    def delete_by_dish_ids(self, dish_ids: Sequence[str]) -> int:
+        """料理IDを指定して画像レコードを物理削除"""
+        deleted = self.db.query(DishImage).filter(DishImage.dish_id.in_(dish_ids)).delete(
+            synchronize_session=False
         )
-        return result or 0
-
-    def delete(self, image: DishImage) -> None:
-        """画像レコードを物理削除"""
-        self.db.delete(image)
         self.db.flush()
+        return deleted
 
-    def delete_by_ids(self, image_ids: List[str]) -> None:
-        """複数の画像レコードを物理削除"""
-        self.db.query(DishImage).filter(DishImage.id.in_(image_ids)).delete(
-            synchronize_session=False
+
+class DishArchiveRepository:
+    """アーカイブ済み料理リポジトリ"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def find_ids_by_user(self, user_id: str, limit: int) -> List[str]:
+        """ユーザーのアーカイブ済み料理IDを取得"""
+        rows = self.db.execute(
+            select(DishArchive.id).where(DishArchive.user_id == user_id).limit(limit)
+        ).all()
+        return [row.id for row in rows]
+
+    def mark_images_purged(self, dish_ids: Sequence[str]) -> None:
+        """S3画像の削除日時を記録（コミットは呼び出し側）"""
+        self.db.execute(
+            update(DishArchive)
+            .where(DishArchive.id.in_(dish_ids))
+            .values(images_purged_at=datetime.now(timezone.utc))
         )
-        self.db.flush()
+
+    def delete_by_ids(self, dish_ids: Sequence[str]) -> int:
+        """アーカイブ済みの料理と画像を物理削除（コミットは呼び出し側）"""
+        self.db.execute(delete(DishImageArchive).where(DishImageArchive.dish_id.in_(dish_ids)))
+        return self.db.execute(delete(DishArchive).where(DishArchive.id.in_(dish_ids))).rowcount
+
+    def commit(self) -> None:
+        """トランザクションをコミット"""
+        self.db.commit()
+
+    def rollback(self) -> None:
+        """トランザクションをロールバック"""
+        self.db.rollback()
 
 
 class DishCategoryRepository:
@@ -267,3 +534,180 @@ class DishCategoryRepository:
             )
             .first()
         )
+
+    def replicate(self, category: DishCategory) -> None:
+        """他のDB（プライマリ）で取得したカテゴリをこのDB（シャード）に反映（なければ追加、差分があれば更新）"""
+        self.db.merge(DishCategory(**{
+            column.key: getattr(category, column.key) for column in DishCategory.__table__.columns
+        }))
+        self.db.flush()
+
+
+# === 非同期リポジトリ（ASYNC_ROUTES=true の場合のエンドポイント用） ===
+# リクエスト処理で使うメソッドのみを持つ。バッチジョブは同期リポジトリを使う。
+# 非同期セッションでは遅延ロードができないため、リレーションは joinedload で読み込む。
+_FIND_CATEGORY_BY_ID = select(DishCategory).where(
+    DishCategory.id == bindparam("category_id"),
+    DishCategory.deleted_at.is_(None),
+)
+
+
+class AsyncDishRepository:
+    """料理リポジトリ（非同期）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(
+        self,
+        user_id: str,
+        name: str,
+        cooked_at: date,
+        category_id: Optional[str] = None,
+        images: Sequence[Tuple[str, int]] = (),
+        dish_id: Optional[str] = None,
+    ) -> Dish:
+        """料理を作成（画像の非正規化カラムも同じ INSERT で設定する）
+
+        Args:
+            images: 登録する画像の (image_key, display_order) の一覧
+            dish_id: 主キー（画像の正式パスを INSERT 前に決める場合に指定、省略時は採番）
+        """
+        now = _db_now()
+        thumbnail_key, image_count = summarize_images(images)
+        dish = Dish(
+            id=dish_id or new_id(),
+            user_id=user_id,
+            name=name,
+            cooked_at=cooked_at,
+            category_id=category_id,
+            thumbnail_key=thumbnail_key,
+            image_count=image_count,
+            created_at=now,
+            updated_at=now,
+        )
+        self.db.add(dish)
+        await self.db.flush()
+        return dish
+
+    async def find_by_id(self, dish_id: str) -> Optional[Dish]:
+        """IDで料理を取得（論理削除除外、リレーション含む）"""
+        return (await self.db.execute(_FIND_DISH_BY_ID, {"dish_id": dish_id})).unique().scalars().first()
+
+    async def find_detail(self, dish_id: str) -> Optional[DishDetail]:
+        """IDで料理詳細を取得（論理削除除外、ORMエンティティを経由しない）"""
+        return _to_detail((await self.db.execute(_FIND_DISH_DETAIL, {"dish_id": dish_id})).all())
+
+    async def find_list_with_pagination(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        category_id: Optional[str] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> Tuple[List[DishListRow], bool]:
+        """
+        ページネーション付きで料理一覧を取得（DishRepository.find_list_with_pagination と同じクエリ）
+
+        Returns:
+            Tuple of (items, has_next)
+        """
+        stmt, params = DishRepository.list_statement(
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            category_id=category_id,
+            from_date=from_date,
+            to_date=to_date,
+        )
+        results = [DishListRow._make(row) for row in await self.db.execute(stmt, params)]
+
+        # 次ページ判定
+        has_next = len(results) > limit
+        if has_next:
+            results = results[:limit]
+
+        return results, has_next
+
+    async def update(
+        self,
+        dish: Dish,
+        name: str,
+        cooked_at: date,
+        category_id: Optional[str] = None,
+    ) -> Dish:
+        """料理を更新（set_image_summary で設定した非正規化カラムも同じ UPDATE で書き込む）
+
+        UPDATE は読み込んだ時点の version を条件に行い、他のリクエストが先に更新していれば
+        VersionConflictError を送出する（行ロックは UPDATE からコミットまでの間だけ保持される）。
+        """
+        dish.name = name
+        dish.cooked_at = cooked_at
+        dish.category_id = category_id
+        # 値が変わらない場合も明示的に書き込む（onupdate の func.now() による UPDATE 後の再取得を避ける）
+        dish.updated_at = _db_now()
+        flag_modified(dish, "updated_at")
+        try:
+            await self.db.flush()
+        except StaleDataError:
+            raise VersionConflictError()
+        return dish
+
+    async def soft_delete(self, dish: Dish) -> None:
+        """料理を論理削除（update と同じく version を条件に行う）"""
+        dish.deleted_at = datetime.now(timezone.utc)
+        try:
+            await self.db.flush()
+        except StaleDataError:
+            raise VersionConflictError()
+
+    def set_image_summary(self, dish: Dish, images: Iterable[Tuple[str, int]]) -> None:
+        """画像の非正規化カラムを設定（DBへは次の flush で書き込む）"""
+        dish.thumbnail_key, dish.image_count = summarize_images(images)
+
+    async def commit(self) -> None:
+        """トランザクションをコミット"""
+        await self.db.commit()
+
+    async def rollback(self) -> None:
+        """トランザクションをロールバック"""
+        await self.db.rollback()
+
+
+class AsyncDishImageRepository:
+    """料理画像リポジトリ（非同期）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_many(self, dish_id: str, images: Sequence[Tuple[str, int]]) -> List[DishImageRow]:
+        """(image_key, display_order) の一覧から画像レコードを1回の INSERT で作成"""
+        rows, params = _image_rows(dish_id, images)
+        if params:
+            await self.db.execute(_INSERT_IMAGES, params)
+        return rows
+
+    async def find_existing_ids(self, image_ids: Sequence[str]) -> Set[str]:
+        """指定したIDのうち存在する画像IDを1回の IN 検索で取得"""
+        return set((await self.db.execute(_FIND_IMAGE_IDS, {"image_ids": list(image_ids)})).scalars())
+
+    async def delete_by_ids(self, image_ids: List[str]) -> None:
+        """複数の画像レコードを物理削除"""
+        await self.db.execute(
+            delete(DishImage)
+            .where(DishImage.id.in_(image_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.flush()
+
+
+class AsyncDishCategoryRepository:
+    """料理カテゴリリポジトリ（非同期）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_by_id(self, category_id: str) -> Optional[DishCategory]:
+        """IDでカテゴリを取得（論理削除除外）"""
+        return (await self.db.execute(_FIND_CATEGORY_BY_ID, {"category_id": category_id})).scalars().first()
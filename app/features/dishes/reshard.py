@@ -0,0 +1,374 @@
+"""料理データのシャード移動（リシャーディング）
+
+ユーザー1人分の dishes / dish_images を別のシャードへオンラインで移動する。
+
+1. コピー: 移動先の残骸を削除し、料理を主キー順のバッチでコピー（書き込みは継続）
+2. 書き込み停止: user_shards.locked を立て、全ワーカーのキャッシュが切り替わり、
+   実行中の書き込みが終わるまで（キャッシュTTL + 書き込みのデッドライン）待機
+   （停止中の書き込みAPIは 503 SHARD_MIGRATING。停止前に確認を通過した書き込みも、
+   コミット直前の user_shards の再確認（共有ロック）で拒否される）
+3. 照合: 移動元と移動先を比較し、コピー後に変更された料理を再コピー・削除された料理を削除
+4. 切り替え: 割り当てを移動先に変更し、キャッシュが切り替わるまで待ってから書き込みを再開
+5. 削除: 移動元の行をバッチで削除
+
+途中で失敗した場合は割り当てを移動元のまま書き込みを再開する（再実行で最初からやり直せる）。
+dish_categories は参照データのため、移動先にない場合のみコピーする。
+カテゴリの正本はプライマリに置き、`sync-categories` で全シャードに反映する
+（料理の登録・更新時にも、使われたカテゴリをユーザーのシャードに反映する）。
+
+シャードを追加する前に、既存ユーザーの割り当てを `pin` で固定しておくこと
+（割り当てがないユーザーはシャード数に依存するハッシュで振り分けられるため）。
+
+CLIから実行する場合:
+    python -m app.features.dishes.reshard pin
+    python -m app.features.dishes.reshard sync-categories
+    python -m app.features.dishes.reshard move --user-id <user_id> --to 1
+"""
+
+import argparse
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.batch import BatchReport, run_in_batches
+from app.core.config import settings
+from app.core.database import SessionLocal, shard_router
+from app.features.dishes.models import Dish, DishCategory, DishImage
+from app.features.users.models import User, UserShard
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+_DISHES = Dish.__table__
+_IMAGES = DishImage.__table__
+_CATEGORIES = DishCategory.__table__
+
+
+@dataclass
+class ReshardResult:
+    """ユーザー1人分の移動結果"""
+    user_id: str
+    source: int
+    target: int
+    repaired: int = 0
+    reports: List[BatchReport] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "source": self.source,
+            "target": self.target,
+            "repaired": self.repaired,
+            "steps": [report.as_dict() for report in self.reports],
+        }
+
+
+def set_assignment(user_id: str, shard_id: int, locked: bool) -> None:
+    """user_shards の割り当てを登録・更新（プライマリ）"""
+    db = SessionLocal()
+    try:
+        db.merge(UserShard(user_id=user_id, shard_id=shard_id, locked=locked))
+        db.commit()
+    finally:
+        db.close()
+    shard_router.invalidate(user_id)
+
+
+def _dish_ids_after(db: Session, user_id: str, after_id: Optional[str], limit: int) -> List[str]:
+    """ユーザーの料理IDを主キー順に取得"""
+    stmt = select(_DISHES.c.id).where(_DISHES.c.user_id == user_id)
+    if after_id is not None:
+        stmt = stmt.where(_DISHES.c.id > after_id)
+    return list(db.execute(stmt.order_by(_DISHES.c.id).limit(limit)).scalars())
+
+
+def _iterate(db: Session, user_id: str):
+    """run_in_batches 用の fetch_ids（主キーのキーセットで走査）"""
+    last_id: Optional[str] = None
+
+    def fetch_ids(limit: int) -> List[str]:
+        nonlocal last_id
+        ids = _dish_ids_after(db, user_id, last_id, limit)
+        if ids:
+            last_id = ids[-1]
+        return ids
+
+    return fetch_ids
+
+
+def _load(db: Session, dish_ids: Sequence[str]):
+    """料理と画像の行を辞書で取得（画像は料理IDごとにまとめる）"""
+    dishes = {
+        row["id"]: dict(row)
+        for row in db.execute(select(_DISHES).where(_DISHES.c.id.in_(dish_ids))).mappings()
+    }
+    images: Dict[str, List[dict]] = defaultdict(list)
+    stmt = select(_IMAGES).where(_IMAGES.c.dish_id.in_(dish_ids)).order_by(_IMAGES.c.id)
+    for row in db.execute(stmt).mappings():
+        images[row["dish_id"]].append(dict(row))
+    return dishes, images
+
+
+def _ensure_categories(source: Session, target: Session, category_ids: Set[str]) -> None:
+    """移動先にないカテゴリ（参照データ）をコピー"""
+    if not category_ids:
+        return
+    existing = set(target.execute(
+        select(_CATEGORIES.c.id).where(_CATEGORIES.c.id.in_(category_ids))
+    ).scalars())
+    missing = category_ids - existing
+    if missing:
+        rows = source.execute(select(_CATEGORIES).where(_CATEGORIES.c.id.in_(missing))).mappings()
+        target.execute(insert(_CATEGORIES), [dict(row) for row in rows])
+
+
+def _delete_dishes(db: Session, dish_ids: Sequence[str]) -> int:
+    db.execute(delete(_IMAGES).where(_IMAGES.c.dish_id.in_(dish_ids)))
+    return db.execute(delete(_DISHES).where(_DISHES.c.id.in_(dish_ids))).rowcount
+
+
+def copy_dishes(source: Session, target: Session, dish_ids: Sequence[str]) -> int:
+    """料理と画像を移動先へコピー（移動先の同じIDの行は置き換える）"""
+    dishes, images = _load(source, dish_ids)
+    try:
+        _ensure_categories(source, target, {d["category_id"] for d in dishes.values() if d["category_id"]})
+        _delete_dishes(target, dish_ids)
+        if dishes:
+            target.execute(insert(_DISHES), list(dishes.values()))
+        image_rows = [row for rows in images.values() for row in rows]
+        if image_rows:
+            target.execute(insert(_IMAGES), image_rows)
+        target.commit()
+    except Exception:
+        target.rollback()
+        raise
+    source.rollback()  # 読み取りのスナップショットを解放
+    return len(dishes)
+
+
+def default_freeze_seconds() -> float:
+    """書き込み停止・切り替え後の既定の待機時間
+
+    各ワーカーのキャッシュが切り替わるまでの時間に、確認を通過済みの書き込み（S3コピーを含む）が
+    終わるまでの上限を加える。
+    """
+    return settings.shard_map_cache_seconds + settings.request_deadline_dish_write_ms / 1000 + 1
+
+
+def move_user(
+    user_id: str,
+    target_shard: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sleep_seconds: float = 0.0,
+    freeze_seconds: Optional[float] = None,
+) -> ReshardResult:
+    """
+    ユーザーの料理データを target_shard へ移動
+
+    Args:
+        user_id: 対象ユーザーID
+        target_shard: 移動先のシャード番号
+        batch_size: 1バッチの料理数
+        sleep_seconds: バッチ間の待機時間（秒）
+        freeze_seconds: 割り当て変更後の待機時間（省略時はキャッシュTTL + 書き込みのデッドライン + 1秒）
+    """
+    if not 0 <= target_shard < shard_router.count:
+        raise ValueError(f"Unknown shard: {target_shard} (shards={shard_router.count})")
+    if freeze_seconds is None:
+        freeze_seconds = default_freeze_seconds()
+
+    shard_router.invalidate(user_id)
+    assignment = shard_router.lookup(user_id)
+    result = ReshardResult(user_id=user_id, source=assignment.shard_id, target=target_shard)
+    if assignment.locked:
+        raise RuntimeError(f"User {user_id} is already being moved")
+    if assignment.shard_id == target_shard:
+        return result
+
+    source = shard_router.session_for_shard(assignment.shard_id)
+    target = shard_router.session_for_shard(target_shard)
+    try:
+        # 1. コピー（書き込みは継続）
+        result.reports.append(run_in_batches(
+            label=f"reshard.copy[{user_id}]",
+            fetch_ids=_iterate(source, user_id),
+            process_ids=lambda ids: copy_dishes(source, target, ids),
+            batch_size=batch_size,
+            sleep_seconds=sleep_seconds,
+        ))
+
+        # 2. 書き込み停止
+        set_assignment(user_id, assignment.shard_id, locked=True)
+        time.sleep(freeze_seconds)
+        try:
+            # 3. 照合
+            result.repaired = _reconcile(source, target, user_id, batch_size)
+            # 4. 切り替え（キャッシュが切り替わるまで書き込み停止を維持）
+            set_assignment(user_id, target_shard, locked=True)
+        except Exception:
+            set_assignment(user_id, assignment.shard_id, locked=False)
+            raise
+        time.sleep(freeze_seconds)
+        set_assignment(user_id, target_shard, locked=False)
+
+        # 5. 移動元の削除
+        def delete_source(ids: Sequence[str]) -> int:
+            try:
+                deleted = _delete_dishes(source, ids)
+                source.commit()
+            except Exception:
+                source.rollback()
+                raise
+            return deleted
+
+        result.reports.append(run_in_batches(
+            label=f"reshard.delete_source[{user_id}]",
+            fetch_ids=lambda limit: _dish_ids_after(source, user_id, None, limit),
+            process_ids=delete_source,
+            batch_size=batch_size,
+            sleep_seconds=sleep_seconds,
+        ))
+    finally:
+        source.close()
+        target.close()
+
+    logger.info(f"Reshard finished: {result.as_dict()}")
+    return result
+
+
+def _reconcile(source: Session, target: Session, user_id: str, batch_size: int) -> int:
+    """書き込み停止中に移動元と移動先を比較し、差分を修復した料理数を返す"""
+    repaired = 0
+
+    fetch_source = _iterate(source, user_id)
+    while True:
+        ids = fetch_source(batch_size)
+        if not ids:
+            break
+        source_rows = _load(source, ids)
+        target_rows = _load(target, ids)
+        changed = [
+            dish_id for dish_id in ids
+            if source_rows[0].get(dish_id) != target_rows[0].get(dish_id)
+            or source_rows[1].get(dish_id) != target_rows[1].get(dish_id)
+        ]
+        if changed:
+            repaired += copy_dishes(source, target, changed)
+        if len(ids) < batch_size:
+            break
+
+    # 移動元で削除された料理を移動先からも削除
+    fetch_target = _iterate(target, user_id)
+    while True:
+        ids = fetch_target(batch_size)
+        if not ids:
+            break
+        existing = set(source.execute(select(_DISHES.c.id).where(_DISHES.c.id.in_(ids))).scalars())
+        removed = [dish_id for dish_id in ids if dish_id not in existing]
+        if removed:
+            repaired += _delete_dishes(target, removed)
+            target.commit()
+        if len(ids) < batch_size:
+            break
+    return repaired
+
+
+def pin_assignments(batch_size: int = DEFAULT_BATCH_SIZE) -> BatchReport:
+    """割り当てのない全ユーザーについて、現在のハッシュによる割り当てを user_shards に登録"""
+    db = SessionLocal()
+    try:
+        last_id: Optional[str] = None
+
+        def fetch_ids(limit: int) -> List[str]:
+            nonlocal last_id
+            stmt = (
+                select(User.id)
+                .outerjoin(UserShard, UserShard.user_id == User.id)
+                .where(UserShard.user_id.is_(None))
+            )
+            if last_id is not None:
+                stmt = stmt.where(User.id > last_id)
+            ids = list(db.execute(stmt.order_by(User.id).limit(limit)).scalars())
+            if ids:
+                last_id = ids[-1]
+            return ids
+
+        def pin(user_ids: Sequence[str]) -> int:
+            db.execute(insert(UserShard.__table__), [
+                {"user_id": user_id, "shard_id": shard_router.default_shard(user_id), "locked": False}
+                for user_id in user_ids
+            ])
+            db.commit()
+            return len(user_ids)
+
+        return run_in_batches("reshard.pin", fetch_ids, pin, batch_size)
+    finally:
+        db.close()
+
+
+def sync_categories() -> Dict[int, int]:
+    """プライマリの dish_categories を全シャードに反映し、シャードごとの件数を返す
+
+    シャードにない行は追加し、名前・表示順・論理削除の差分は更新する。
+    """
+    source = SessionLocal()
+    try:
+        rows = [dict(row) for row in source.execute(select(_CATEGORIES)).mappings()]
+    finally:
+        source.close()
+
+    synced: Dict[int, int] = {}
+    for shard_id in range(1, shard_router.count):
+        target = shard_router.session_for_shard(shard_id)
+        try:
+            for row in rows:
+                target.merge(DishCategory(**row))
+            target.commit()
+        finally:
+            target.close()
+        synced[shard_id] = len(rows)
+        logger.info(f"Synced {len(rows)} categories to shard {shard_id}")
+    return synced
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="料理データのシャード移動")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pin_parser = subparsers.add_parser("pin", help="既存ユーザーの割り当てを固定")
+    pin_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    subparsers.add_parser("sync-categories", help="プライマリのカテゴリを全シャードに反映")
+
+    move_parser = subparsers.add_parser("move", help="ユーザーの料理データを別のシャードへ移動")
+    move_parser.add_argument("--user-id", required=True)
+    move_parser.add_argument("--to", type=int, required=True, help="移動先のシャード番号")
+    move_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    move_parser.add_argument("--sleep", type=float, default=0.0)
+    move_parser.add_argument("--freeze-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "pin":
+        print(pin_assignments(args.batch_size).as_dict())
+    elif args.command == "sync-categories":
+        print(sync_categories())
+    else:
+        result = move_user(
+            args.user_id,
+            args.to,
+            batch_size=args.batch_size,
+            sleep_seconds=args.sleep,
+            freeze_seconds=args.freeze_seconds,
+        )
+        print(result.as_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,13 @@
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.deadline import request_deadline
+from app.core.rate_limit import limit_by_user
+from app.core.replica import get_category_db, get_read_db, get_write_db
 from app.core.security import get_current_user
 from app.features.users.models import User
 from app.features.dishes.schemas import (
@@ -20,71 +23,40 @@ from app.features.dishes.schemas import (
 )
 from app.features.dishes.service import DishService
 from app.features.dishes.s3_service import s3_service
-from app.features.dishes.exceptions import (
-    DishNotFoundError,
-    PermissionDeniedError,
-    ImageLimitExceededError,
-    InvalidDisplayOrderError,
-    InvalidCursorError,
-    CategoryNotFoundError,
-    ImageNotFoundError,
-    ImageNotOwnedError,
-    S3ObjectNotFoundError,
-)
+from app.features.dishes.errors import etag, http_errors, parse_if_match
+
 
+router = APIRouter(
+    dependencies=[Depends(limit_by_user("dishes", settings.rate_limit_dishes))],
+)
 
-router = APIRouter()
+# エンドポイントごとの処理時間の上限（DBクエリ・S3呼び出しに適用）
+read_deadline = Depends(request_deadline(settings.request_deadline_dish_read_ms))
+write_deadline = Depends(request_deadline(settings.request_deadline_dish_write_ms))
 
 
-@router.post("", response_model=DishResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=DishResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[write_deadline],
+)
 def create_dish(
     request: DishCreateRequest,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
+    category_db: Optional[Session] = Depends(get_category_db),
 ):
     """料理を登録"""
-    try:
-        service = DishService(db)
-        return service.create_dish(current_user.id, request)
-    except ImageLimitExceededError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error_code": "IMAGE_LIMIT_EXCEEDED",
-                "message": "画像は最大3枚まで登録できます",
-                "details": None,
-            },
-        )
-    except InvalidDisplayOrderError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error_code": "INVALID_DISPLAY_ORDER",
-                "message": "display_orderが不正です（重複または範囲外）",
-                "details": None,
-            },
-        )
-    except CategoryNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={
-                "error_code": "CATEGORY_NOT_FOUND",
-                "message": "指定されたカテゴリが存在しません",
-                "details": None,
-            },
-        )
-    except S3ObjectNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={
-                "error_code": "S3_OBJECT_NOT_FOUND",
-                "message": "指定された画像ファイルが存在しません",
-                "details": None,
-            },
-        )
+    with http_errors():
+        service = DishService(db, category_db)
+        dish = service.create_dish(current_user.id, request)
+        response.headers["ETag"] = etag(dish.version)
+        return dish
 
 
-@router.get("", response_model=DishListResponse)
+@router.get("", response_model=DishListResponse, dependencies=[read_deadline])
 def list_dishes(
     limit: int = Query(default=20, ge=1, le=100),
     cursor: Optional[str] = Query(default=None),
@@ -92,10 +64,10 @@ def list_dishes(
     from_date: Optional[date] = Query(default=None),
     to_date: Optional[date] = Query(default=None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """料理一覧を取得"""
-    try:
+    with http_errors():
         service = DishService(db)
         return service.list_dishes(
             user_id=current_user.id,
@@ -105,15 +77,6 @@ def list_dishes(
             from_date=from_date,
             to_date=to_date,
         )
-    except InvalidCursorError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error_code": "INVALID_CURSOR",
-                "message": "カーソルが不正です",
-                "details": None,
-            },
-        )
 
 
 @router.post(
@@ -133,137 +96,46 @@ def get_presigned_url(
     return PresignedUrlResponse(**result)
 
 
-@router.get("/{dish_id}", response_model=DishResponse)
+@router.get("/{dish_id}", response_model=DishResponse, dependencies=[read_deadline])
 def get_dish(
     dish_id: str,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """料理詳細を取得"""
-    try:
+    with http_errors("read"):
         service = DishService(db)
-        return service.get_dish(dish_id, current_user.id)
-    except DishNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error_code": "DISH_NOT_FOUND",
-                "message": "指定された料理が存在しません",
-                "details": None,
-            },
-        )
-    except PermissionDeniedError:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error_code": "PERMISSION_DENIED",
-                "message": "この料理にアクセスする権限がありません",
-                "details": None,
-            },
-        )
+        dish = service.get_dish(dish_id, current_user.id)
+        response.headers["ETag"] = etag(dish.version)
+        return dish
 
 
-@router.put("/{dish_id}", response_model=DishResponse)
+@router.put("/{dish_id}", response_model=DishResponse, dependencies=[write_deadline])
 def update_dish(
     dish_id: str,
     request: DishUpdateRequest,
+    response: Response,
+    if_match: Optional[str] = Header(default=None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
+    category_db: Optional[Session] = Depends(get_category_db),
 ):
-    """料理を更新"""
-    try:
-        service = DishService(db)
-        return service.update_dish(dish_id, current_user.id, request)
-    except DishNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error_code": "DISH_NOT_FOUND",
-                "message": "指定された料理が存在しません",
-                "details": None,
-            },
-        )
-    except PermissionDeniedError:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error_code": "PERMISSION_DENIED",
-                "message": "この料理を更新する権限がありません",
-                "details": None,
-            },
-        )
-    except ImageLimitExceededError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error_code": "IMAGE_LIMIT_EXCEEDED",
-                "message": "画像は最大3枚まで登録できます",
-                "details": None,
-            },
-        )
-    except ImageNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error_code": "IMAGE_NOT_FOUND",
-                "message": "削除対象の画像が存在しません",
-                "details": None,
-            },
-        )
-    except ImageNotOwnedError:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error_code": "IMAGE_NOT_OWNED",
-                "message": "削除対象の画像がこの料理に属していません",
-                "details": None,
-            },
-        )
-    except CategoryNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={
-                "error_code": "CATEGORY_NOT_FOUND",
-                "message": "指定されたカテゴリが存在しません",
-                "details": None,
-            },
-        )
-    except S3ObjectNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={
-                "error_code": "S3_OBJECT_NOT_FOUND",
-                "message": "指定された画像ファイルが存在しません",
-                "details": None,
-            },
-        )
+    """料理を更新（If-Match で指定したバージョンと異なる場合は 412）"""
+    with http_errors("update"):
+        service = DishService(db, category_db)
+        dish = service.update_dish(dish_id, current_user.id, request, parse_if_match(if_match))
+        response.headers["ETag"] = etag(dish.version)
+        return dish
 
 
-@router.delete("/{dish_id}", response_model=MessageResponse)
+@router.delete("/{dish_id}", response_model=MessageResponse, dependencies=[write_deadline])
 def delete_dish(
     dish_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
 ):
     """料理を削除（論理削除）"""
-    try:
+    with http_errors("delete"):
         service = DishService(db)
         return service.delete_dish(dish_id, current_user.id)
-    except DishNotFoundError:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error_code": "DISH_NOT_FOUND",
-                "message": "指定された料理が存在しません",
-                "details": None,
-            },
-        )
-    except PermissionDeniedError:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error_code": "PERMISSION_DENIED",
-                "message": "この料理を削除する権限がありません",
-                "details": None,
-            },
-        )
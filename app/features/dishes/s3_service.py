@@ -1,16 +1,24 @@
 """S3操作サービス
 
 NOTE: S3_BUCKET_NAMEが未設定の場合はスタブモードで動作します。
+NOTE: リクエスト内の呼び出しはデッドラインの残り時間を確認してから発行し、
+      残り時間が S3_*_TIMEOUT_SECONDS × S3_MAX_ATTEMPTS より短い場合は、
+      残り時間に収まるタイムアウト・試行回数のクライアントで呼び出します。
 """
 
 import logging
+import threading
 import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
 
 import boto3
 from botocore.config import Config
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, ConnectTimeoutError, ReadTimeoutError
 
+from app.core import deadline
 from app.core.config import settings
+from app.core.exceptions import DeadlineExceededError
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,41 @@ CONTENT_TYPE_TO_EXTENSION = {
     "image/webp": "webp",
 }
 
+# デッドラインに合わせたクライアントの予算の刻み（秒）
+# 残り時間をこの刻みで切り下げ、同じ予算のクライアントを使い回す（0.125〜16秒）
+BUDGET_STEPS = tuple(0.125 * 2 ** i for i in range(8))
+
+
+def split_budget(budget_seconds: float) -> Tuple[float, float, int]:
+    """
+    呼び出し全体の予算（秒）を、接続・読み取りタイムアウトと試行回数に分ける
+
+    S3_*_TIMEOUT_SECONDS の比率を保ったまま、(接続 + 読み取り) × 試行回数 が予算に収まるようにする
+    （リトライ間の待機時間は含まない）。
+
+    Returns:
+        (connect_timeout, read_timeout, max_attempts)
+    """
+    connect = settings.s3_connect_timeout_seconds
+    read = settings.s3_read_timeout_seconds
+    attempts = max(1, min(settings.s3_max_attempts, int(budget_seconds // (connect + read))))
+    per_attempt = budget_seconds / attempts
+    connect_timeout = min(connect, per_attempt * connect / (connect + read))
+    return connect_timeout, min(read, per_attempt - connect_timeout), attempts
+
+
+def _create_client(connect_timeout: float, read_timeout: float, max_attempts: int):
+    return boto3.client(
+        "s3",
+        region_name=settings.aws_region,
+        config=Config(
+            signature_version="s3v4",
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={"total_max_attempts": max_attempts, "mode": "standard"},
+        ),
+    )
+
 
 class S3Service:
     """S3操作サービス"""
@@ -32,13 +75,55 @@ class S3Service:
         self.cloudfront_domain = settings.cloudfront_domain
 
         if self.bucket_name:
-            self.s3_client = boto3.client(
-                "s3",
-                region_name=self.region,
-                config=Config(signature_version="s3v4"),
+            self.s3_client = _create_client(
+                settings.s3_connect_timeout_seconds,
+                settings.s3_read_timeout_seconds,
+                settings.s3_max_attempts,
             )
         else:
             self.s3_client = None  # スタブモード
+        # デッドラインの残り時間に合わせたクライアント（予算の刻みごと）
+        self._bounded_clients: Dict[float, object] = {}
+        self._lock = threading.Lock()
+
+    def _client_for(self, operation: str, strict: bool = True) -> Tuple[object, bool]:
+        """
+        呼び出しに使うクライアントを返す
+
+        デッドラインの残り時間が既定のタイムアウト × 試行回数より短い場合は、
+        残り時間（BUDGET_STEPS で切り下げ）に収まるクライアントを返す。
+
+        Args:
+            operation: 操作名（DeadlineExceededError に含める）
+            strict: False の場合は残り時間がなくても送出せず、最小の予算のクライアントを返す（後片付け用）
+
+        Returns:
+            (クライアント, 残り時間に合わせたクライアントかどうか)
+        """
+        left = deadline.check(operation) if strict else deadline.remaining()
+        full_budget = (
+            settings.s3_connect_timeout_seconds + settings.s3_read_timeout_seconds
+        ) * settings.s3_max_attempts
+        if left is None or left >= full_budget:
+            return self.s3_client, False
+        budget = max((step for step in BUDGET_STEPS if step <= left), default=BUDGET_STEPS[0])
+        with self._lock:
+            client = self._bounded_clients.get(budget)
+            if client is None:
+                client = _create_client(*split_budget(budget))
+                self._bounded_clients[budget] = client
+        return client, True
+
+    @contextmanager
+    def _call(self, operation: str) -> Iterator[object]:
+        """デッドラインに収まるクライアントを渡し、残り時間で打ち切られた場合は DeadlineExceededError を送出"""
+        client, bounded = self._client_for(operation)
+        try:
+            yield client
+        except (ConnectTimeoutError, ReadTimeoutError) as e:
+            if bounded:
+                raise DeadlineExceededError(operation) from e
+            raise
 
     def generate_presigned_url(self, content_type: str, file_size: int) -> dict:
         """Pre-signed URLを生成
@@ -91,7 +176,8 @@ class S3Service:
             # スタブモード: 常にTrueを返す
             return True
         try:
-            self.s3_client.head_object(Bucket=self.bucket_name, Key=image_key)
+            with self._call("s3.head_object") as client:
+                client.head_object(Bucket=self.bucket_name, Key=image_key)
             return True
         except ClientError as e:
             if e.response["Error"]["Code"] == "404":
@@ -113,13 +199,14 @@ class S3Service:
             # スタブモード: 常にTrueを返す
             return True
         copy_source = {"Bucket": self.bucket_name, "Key": temp_key}
-        self.s3_client.copy_object(
-            CopySource=copy_source,
-            Bucket=self.bucket_name,
-            Key=permanent_key,
-            MetadataDirective="COPY",
-            ServerSideEncryption="AES256",
-        )
+        with self._call("s3.copy_object") as client:
+            client.copy_object(
+                CopySource=copy_source,
+                Bucket=self.bucket_name,
+                Key=permanent_key,
+                MetadataDirective="COPY",
+                ServerSideEncryption="AES256",
+            )
         return True
 
     def delete_object(self, image_key: str) -> bool:
@@ -136,12 +223,45 @@ class S3Service:
             # スタブモード: 常にTrueを返す
             return True
         try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=image_key)
+            # 後片付けのため、デッドラインを超過していても最小の予算で1回だけ試みる
+            client, _ = self._client_for("s3.delete_object", strict=False)
+            client.delete_object(Bucket=self.bucket_name, Key=image_key)
             return True
         except Exception as e:
             logger.warning(f"Failed to delete S3 object: {image_key}, error: {e}")
             return False
 
+    def delete_prefix(self, prefix: str) -> int:
+        """
+        プレフィックス配下のS3オブジェクトを一括削除
+
+        Args:
+            prefix: 削除対象のプレフィックス（例: images/dishes/{dish_id}/）
+
+        Returns:
+            int: 削除したオブジェクト数
+        """
+        if self.s3_client is None:
+            # スタブモード: 削除対象なし
+            return 0
+        deleted = 0
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        # list_objects_v2 は1ページ最大1000件で、delete_objects の上限と一致する
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            objects = [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+            if not objects:
+                continue
+            with self._call("s3.delete_objects") as client:
+                response = client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": objects, "Quiet": True},
+                )
+            errors = response.get("Errors", [])
+            if errors:
+                raise RuntimeError(f"Failed to delete S3 objects under {prefix}: {errors[:3]}")
+            deleted += len(objects)
+        return deleted
+
     def generate_image_url(self, image_key: str) -> str:
         """
         画像のCloudFront URLを生成
@@ -163,15 +283,18 @@ class S3Service:
         """
         正式パスのキーを生成
 
+        同じ料理への同時更新が同じキーへコピーして互いの画像を上書きしないよう、
+        コピーごとに一意な接尾辞を付ける。
+
         Args:
             dish_id: 料理ID
             display_order: 表示順序
             extension: ファイル拡張子
 
         Returns:
-            str: 正式パスのキー（例: images/dishes/{dish_id}/1.jpg）
+            str: 正式パスのキー（例: images/dishes/{dish_id}/1_3f9a0c2b7d1e.jpg）
         """
-        return f"images/dishes/{dish_id}/{display_order}.{extension}"
+        return f"images/dishes/{dish_id}/{display_order}_{uuid.uuid4().hex[:12]}.{extension}"
 
 
 # シングルトンインスタンス
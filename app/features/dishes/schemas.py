@@ -76,6 +76,7 @@ class DishResponse(BaseModel):
     images: List[ImageResponse]
     created_at: datetime
     updated_at: datetime
+    version: int  # 楽観的排他制御のバージョン（ETag は "{version}"、更新時に If-Match で指定する）
 
     model_config = {"from_attributes": True}
 
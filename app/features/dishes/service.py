@@ -1,12 +1,21 @@
 """料理ビジネスロジック"""
 
 from datetime import date
-from typing import Optional, List
+from typing import Collection, List, NamedTuple, Optional, Sequence, Set, Tuple
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.features.dishes.models import Dish, DishImage
+from app.core.types import new_id
+from app.features.dishes.models import Dish, DishCategory
 from app.features.dishes.repository import (
+    AsyncDishCategoryRepository,
+    AsyncDishImageRepository,
+    AsyncDishRepository,
+    DishDetail,
+    DishImageRow,
+    DishListRow,
     DishRepository,
     DishImageRepository,
     DishCategoryRepository,
@@ -30,44 +39,60 @@ from app.features.dishes.exceptions import (
     ImageNotFoundError,
     ImageNotOwnedError,
     S3ObjectNotFoundError,
+    VersionConflictError,
 )
 from app.features.dishes.s3_service import s3_service
 
 
+# 1料理あたりの画像枚数の上限
+MAX_IMAGES = 3
+
+
 class DishService:
     """料理サービス"""
 
-    MAX_IMAGES = 3
-
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, category_db: Optional[Session] = None):
+        """
+        Args:
+            db: 料理データ（ユーザーのシャード）のセッション
+            category_db: カテゴリ（参照データ）を検証するプライマリのセッション。
+                db がプライマリ以外のシャードの場合に指定する
+        """
         self.db = db
         self.dish_repo = DishRepository(db)
         self.image_repo = DishImageRepository(db)
-        self.category_repo = DishCategoryRepository(db)
+        self.category_repo = DishCategoryRepository(category_db or db)
+        self.shard_category_repo = DishCategoryRepository(db) if category_db is not None else None
+
+    def _find_category(self, category_id: str) -> DishCategory:
+        """カテゴリを取得（存在しない場合は CategoryNotFoundError）
+
+        料理のシャードがプライマリ以外の場合は、一覧・詳細でシャード内のカテゴリと結合できるよう、
+        プライマリのカテゴリをシャードにも反映する。
+        """
+        category = self.category_repo.find_by_id(category_id)
+        if not category:
+            raise CategoryNotFoundError()
+        if self.shard_category_repo is not None:
+            self.shard_category_repo.replicate(category)
+        return category
 
     def create_dish(self, user_id: str, request: DishCreateRequest) -> DishResponse:
         """
         料理を登録
         1. バリデーション（画像数、display_order、カテゴリ）
         2. S3操作（画像存在確認、正式パスへコピー）
-        3. DB保存
+        3. DB保存（料理・画像それぞれ1回の INSERT）
         4. 後処理（一時ファイル削除）
+
+        レスポンスは書き込んだ値から組み立てる（コミット後に再取得しない）。
         """
         # バリデーション
-        if request.images and len(request.images) > self.MAX_IMAGES:
-            raise ImageLimitExceededError()
-
-        if request.images:
-            orders = [img.display_order for img in request.images]
-            if len(orders) != len(set(orders)):
-                raise InvalidDisplayOrderError()
-            if any(o < 1 or o > 3 for o in orders):
-                raise InvalidDisplayOrderError()
+        _validate_create_images(request)
 
+        category_name = None
         if request.category_id:
-            category = self.category_repo.find_by_id(request.category_id)
-            if not category:
-                raise CategoryNotFoundError()
+            category_name = self._find_category(request.category_id).name
 
         # S3操作（トランザクション外）
         temp_keys: List[str] = []
@@ -78,6 +103,11 @@ class DishService:
                     raise S3ObjectNotFoundError()
                 temp_keys.append(img.image_key)
 
+        dish_id = new_id()
+        images = _copy_to_permanent(dish_id, [
+            (img.image_key, img.display_order) for img in request.images or []
+        ])
+
         # DB保存
         try:
             dish = self.dish_repo.create(
@@ -85,50 +115,36 @@ class DishService:
                 name=request.name,
                 cooked_at=request.cooked_at,
                 category_id=request.category_id,
+                images=images,
+                dish_id=dish_id,
             )
-
-            # 画像レコード作成
-            if request.images:
-                for img in request.images:
-                    # 正式パスを生成
-                    ext = img.image_key.split(".")[-1] if "." in img.image_key else "jpg"
-                    permanent_key = s3_service.generate_permanent_key(
-                        dish.id, img.display_order, ext
-                    )
-
-                    # S3コピー（スタブ）
-                    s3_service.copy_to_permanent(img.image_key, permanent_key)
-
-                    # DBレコード作成
-                    self.image_repo.create(
-                        dish_id=dish.id,
-                        image_key=permanent_key,
-                        display_order=img.display_order,
-                    )
+            image_rows = self.image_repo.create_many(dish_id, images)
+            detail = _dish_detail(dish, category_name, image_rows)
 
             self.dish_repo.commit()
-            self.dish_repo.refresh(dish)
 
         except Exception:
             self.dish_repo.rollback()
+            # コピー済みの画像はどの行からも参照されないため削除（ベストエフォート）
+            _delete_objects([key for key, _ in images])
             raise
 
         # 後処理（ベストエフォート）
         for key in temp_keys:
             s3_service.delete_object(key)
 
-        return self._to_dish_response(dish)
+        return _detail_to_response(detail)
 
     def get_dish(self, dish_id: str, user_id: str) -> DishResponse:
         """料理詳細を取得"""
-        dish = self.dish_repo.find_by_id(dish_id)
-        if not dish:
+        detail = self.dish_repo.find_detail(dish_id)
+        if not detail:
             raise DishNotFoundError()
 
-        if dish.user_id != user_id:
+        if detail.user_id != user_id:
             raise PermissionDeniedError()
 
-        return self._to_dish_response(dish)
+        return _detail_to_response(detail)
 
     def list_dishes(
         self,
@@ -149,53 +165,32 @@ class DishService:
             to_date=to_date,
         )
 
-        items = []
-        for dish, thumbnail_key, image_count in results:
-            thumbnail_url = None
-            if thumbnail_key:
-                thumbnail_url = s3_service.generate_image_url(thumbnail_key)
-
-            category = None
-            if dish.category:
-                category = CategoryResponse(
-                    id=dish.category.id,
-                    name=dish.category.name,
-                )
-
-            items.append(
-                DishListItemResponse(
-                    id=dish.id,
-                    name=dish.name,
-                    cooked_at=dish.cooked_at,
-                    category=category,
-                    thumbnail_url=thumbnail_url,
-                    image_count=image_count,
-                    created_at=dish.created_at,
-                )
-            )
-
-        # 次ページカーソル生成
-        next_cursor = None
-        if has_next and items:
-            last_item = results[-1][0]  # 最後のDish
-            next_cursor = self.dish_repo.encode_cursor(last_item.cooked_at, last_item.id)
-
-        return DishListResponse(
-            items=items,
-            next_cursor=next_cursor,
-            has_next=has_next,
-        )
+        return _to_list_response(results, has_next)
 
     def update_dish(
-        self, dish_id: str, user_id: str, request: DishUpdateRequest
+        self,
+        dish_id: str,
+        user_id: str,
+        request: DishUpdateRequest,
+        expected_versions: Optional[Collection[int]] = None,
     ) -> DishResponse:
         """
         料理を更新（差分更新方式）
-        1. 権限チェック
+        1. 権限チェック・バージョン確認（If-Match）
         2. バリデーション
-        3. S3操作
-        4. DB更新
+        3. S3操作（存在確認、正式パスへコピー）
+        4. DB更新（料理の UPDATE・画像の削除・追加をそれぞれ1回のSQLで行う）
         5. 後処理
+
+        楽観的排他制御: 料理の UPDATE は読み込んだ時点の version を条件に行い、
+        他のリクエストが先に更新していれば画像を変更せずに VersionConflictError を送出する。
+        S3コピーはDB更新の前に行うため、コピー中に行ロックは保持しない。
+
+        画像の所有確認・表示順の採番は、料理と一緒に読み込んだ画像一覧で行う。
+        レスポンスは更新後の値から組み立てる（コミット後に再取得しない）。
+
+        Args:
+            expected_versions: If-Match で指定されたバージョン（None の場合は確認しない）
         """
         dish = self.dish_repo.find_by_id(dish_id)
         if not dish:
@@ -204,44 +199,37 @@ class DishService:
         if dish.user_id != user_id:
             raise PermissionDeniedError()
 
+        if expected_versions is not None and dish.version not in expected_versions:
+            raise VersionConflictError(_detail_to_response(_loaded_detail(dish)))
+
         # 画像数バリデーション
-        current_count = len(dish.images)
-        delete_count = len(request.images_to_delete) if request.images_to_delete else 0
-        add_count = len(request.images_to_add) if request.images_to_add else 0
-        final_count = current_count - delete_count + add_count
-
-        if final_count > self.MAX_IMAGES:
-            raise ImageLimitExceededError()
-
-        # 削除対象画像のバリデーション
-        images_to_delete: List[DishImage] = []
-        if request.images_to_delete:
-            current_image_ids = {img.id for img in dish.images}
-            for image_id in request.images_to_delete:
-                image = self.image_repo.find_by_id(image_id)
-                if not image:
-                    raise ImageNotFoundError()
-                if image_id not in current_image_ids:
-                    raise ImageNotOwnedError()
-                images_to_delete.append(image)
-
-        # カテゴリバリデーション
-        if request.category_id:
-            category = self.category_repo.find_by_id(request.category_id)
-            if not category:
-                raise CategoryNotFoundError()
+        plan = _plan_image_changes(dish, request)
+
+        # 削除対象画像のバリデーション（料理の画像でないIDがある場合のみ、存在確認を1回の IN 検索で行う）
+        if plan.unknown_ids:
+            if plan.unknown_ids - self.image_repo.find_existing_ids(list(plan.unknown_ids)):
+                raise ImageNotFoundError()
+            raise ImageNotOwnedError()
 
-        # S3操作（追加画像の存在確認）
+        # カテゴリバリデーション（変更がなければ料理と一緒に読み込んだカテゴリを使う）
+        category_name = _current_category_name(dish, request.category_id)
+        if request.category_id and category_name is None:
+            category_name = self._find_category(request.category_id).name
+
+        # S3操作（追加画像の存在確認、正式パスへコピー）
         temp_keys: List[str] = []
         if request.images_to_add:
             for img in request.images_to_add:
                 if not s3_service.check_object_exists(img.image_key):
                     raise S3ObjectNotFoundError()
                 temp_keys.append(img.image_key)
+        copied = _copy_to_permanent(dish_id, plan.to_add)
 
         # DB更新
         try:
-            # 基本情報更新
+            # 基本情報と一覧表示用の非正規化カラムを1回の UPDATE で更新（version を確認）
+            if plan.deleted or copied:
+                self.dish_repo.set_image_summary(dish, _image_pairs(plan.kept) + copied)
             self.dish_repo.update(
                 dish=dish,
                 name=request.name,
@@ -249,45 +237,27 @@ class DishService:
                 category_id=request.category_id,
             )
 
-            # 画像削除
-            keys_to_delete_from_s3: List[str] = []
-            if images_to_delete:
-                for image in images_to_delete:
-                    keys_to_delete_from_s3.append(image.image_key)
-                self.image_repo.delete_by_ids(request.images_to_delete)
-
-            # 画像追加
-            if request.images_to_add:
-                max_order = self.image_repo.get_max_display_order(dish_id)
-                for i, img in enumerate(request.images_to_add):
-                    new_order = max_order + i + 1
-                    ext = img.image_key.split(".")[-1] if "." in img.image_key else "jpg"
-                    permanent_key = s3_service.generate_permanent_key(
-                        dish_id, new_order, ext
-                    )
-
-                    s3_service.copy_to_permanent(img.image_key, permanent_key)
-
-                    self.image_repo.create(
-                        dish_id=dish_id,
-                        image_key=permanent_key,
-                        display_order=new_order,
-                    )
+            # 画像削除・追加（既存の最大display_orderの後ろに採番）
+            keys_to_delete_from_s3 = [image.image_key for image in plan.deleted]
+            if plan.deleted:
+                self.image_repo.delete_by_ids([image.id for image in plan.deleted])
+            added = self.image_repo.create_many(dish_id, copied)
+            detail = _dish_detail(dish, category_name, plan.kept + added)
 
             self.dish_repo.commit()
-            self.dish_repo.refresh(dish)
 
-        except Exception:
+        except Exception as e:
             self.dish_repo.rollback()
+            # コピー済みの画像はどの行からも参照されないため削除（ベストエフォート）
+            _delete_objects([key for key, _ in copied])
+            if isinstance(e, VersionConflictError):
+                raise VersionConflictError(self._current(dish_id)) from e
             raise
 
         # 後処理（ベストエフォート）
-        for key in temp_keys:
-            s3_service.delete_object(key)
-        for key in keys_to_delete_from_s3:
-            s3_service.delete_object(key)
+        _delete_objects(temp_keys + keys_to_delete_from_s3)
 
-        return self._to_dish_response(dish)
+        return _detail_to_response(detail)
 
     def delete_dish(self, dish_id: str, user_id: str) -> MessageResponse:
         """料理を論理削除"""
@@ -298,36 +268,371 @@ class DishService:
         if dish.user_id != user_id:
             raise PermissionDeniedError()
 
-        self.dish_repo.soft_delete(dish)
-        self.dish_repo.commit()
+        try:
+            self.dish_repo.soft_delete(dish)
+            self.dish_repo.commit()
+        except VersionConflictError as e:
+            self.dish_repo.rollback()
+            raise VersionConflictError(self._current(dish_id)) from e
 
         return MessageResponse(message="料理を削除しました")
 
-    def _to_dish_response(self, dish: Dish) -> DishResponse:
-        """DishモデルをDishResponseに変換"""
-        category = None
-        if dish.category:
-            category = CategoryResponse(
-                id=dish.category.id,
-                name=dish.category.name,
+    def _current(self, dish_id: str) -> DishResponse:
+        """競合時に返す最新の料理（削除されていれば DishNotFoundError）"""
+        detail = self.dish_repo.find_detail(dish_id)
+        if not detail:
+            raise DishNotFoundError()
+        return _detail_to_response(detail)
+
+
+class AsyncDishService:
+    """料理サービス（非同期、ASYNC_ROUTES=true の場合に使用）
+
+    DishService と同じ処理を非同期セッションで行う。
+    S3呼び出し（boto3）はブロッキングのため、スレッドプールで実行する。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.dish_repo = AsyncDishRepository(db)
+        self.image_repo = AsyncDishImageRepository(db)
+        self.category_repo = AsyncDishCategoryRepository(db)
+
+    async def create_dish(self, user_id: str, request: DishCreateRequest) -> DishResponse:
+        """料理を登録（手順は DishService.create_dish と同じ）"""
+        _validate_create_images(request)
+
+        category_name = None
+        if request.category_id:
+            category = await self.category_repo.find_by_id(request.category_id)
+            if not category:
+                raise CategoryNotFoundError()
+            category_name = category.name
+
+        # S3操作（トランザクション外）
+        temp_keys: List[str] = []
+        if request.images:
+            for img in request.images:
+                if not await run_in_threadpool(s3_service.check_object_exists, img.image_key):
+                    raise S3ObjectNotFoundError()
+                temp_keys.append(img.image_key)
+
+        dish_id = new_id()
+        images = await run_in_threadpool(_copy_to_permanent, dish_id, [
+            (img.image_key, img.display_order) for img in request.images or []
+        ])
+
+        # DB保存
+        try:
+            dish = await self.dish_repo.create(
+                user_id=user_id,
+                name=request.name,
+                cooked_at=request.cooked_at,
+                category_id=request.category_id,
+                images=images,
+                dish_id=dish_id,
             )
+            image_rows = await self.image_repo.create_many(dish_id, images)
+            detail = _dish_detail(dish, category_name, image_rows)
+
+            await self.dish_repo.commit()
+
+        except Exception:
+            await self.dish_repo.rollback()
+            # コピー済みの画像はどの行からも参照されないため削除（ベストエフォート）
+            await run_in_threadpool(_delete_objects, [key for key, _ in images])
+            raise
+
+        # 後処理（ベストエフォート）
+        for key in temp_keys:
+            await run_in_threadpool(s3_service.delete_object, key)
+
+        return _detail_to_response(detail)
+
+    async def get_dish(self, dish_id: str, user_id: str) -> DishResponse:
+        """料理詳細を取得"""
+        detail = await self.dish_repo.find_detail(dish_id)
+        if not detail:
+            raise DishNotFoundError()
+
+        if detail.user_id != user_id:
+            raise PermissionDeniedError()
+
+        return _detail_to_response(detail)
+
+    async def list_dishes(
+        self,
+        user_id: str,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        category_id: Optional[str] = None,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+    ) -> DishListResponse:
+        """料理一覧を取得"""
+        results, has_next = await self.dish_repo.find_list_with_pagination(
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor,
+            category_id=category_id,
+            from_date=from_date,
+            to_date=to_date,
+        )
+        return _to_list_response(results, has_next)
+
+    async def update_dish(
+        self,
+        dish_id: str,
+        user_id: str,
+        request: DishUpdateRequest,
+        expected_versions: Optional[Collection[int]] = None,
+    ) -> DishResponse:
+        """料理を更新（手順・楽観的排他制御は DishService.update_dish と同じ）"""
+        dish = await self.dish_repo.find_by_id(dish_id)
+        if not dish:
+            raise DishNotFoundError()
+
+        if dish.user_id != user_id:
+            raise PermissionDeniedError()
+
+        if expected_versions is not None and dish.version not in expected_versions:
+            raise VersionConflictError(_detail_to_response(_loaded_detail(dish)))
+
+        plan = _plan_image_changes(dish, request)
 
-        images = []
-        for img in sorted(dish.images, key=lambda x: x.display_order):
-            images.append(
-                ImageResponse(
-                    id=img.id,
-                    image_url=s3_service.generate_image_url(img.image_key),
-                    display_order=img.display_order,
-                )
+        if plan.unknown_ids:
+            if plan.unknown_ids - await self.image_repo.find_existing_ids(list(plan.unknown_ids)):
+                raise ImageNotFoundError()
+            raise ImageNotOwnedError()
+
+        category_name = _current_category_name(dish, request.category_id)
+        if request.category_id and category_name is None:
+            category = await self.category_repo.find_by_id(request.category_id)
+            if not category:
+                raise CategoryNotFoundError()
+            category_name = category.name
+
+        # S3操作（追加画像の存在確認、正式パスへコピー）
+        temp_keys: List[str] = []
+        if request.images_to_add:
+            for img in request.images_to_add:
+                if not await run_in_threadpool(s3_service.check_object_exists, img.image_key):
+                    raise S3ObjectNotFoundError()
+                temp_keys.append(img.image_key)
+        copied = await run_in_threadpool(_copy_to_permanent, dish_id, plan.to_add)
+
+        # DB更新
+        try:
+            if plan.deleted or copied:
+                self.dish_repo.set_image_summary(dish, _image_pairs(plan.kept) + copied)
+            await self.dish_repo.update(
+                dish=dish,
+                name=request.name,
+                cooked_at=request.cooked_at,
+                category_id=request.category_id,
             )
 
-        return DishResponse(
-            id=dish.id,
-            name=dish.name,
-            cooked_at=dish.cooked_at,
-            category=category,
-            images=images,
-            created_at=dish.created_at,
-            updated_at=dish.updated_at,
+            keys_to_delete_from_s3 = [image.image_key for image in plan.deleted]
+            if plan.deleted:
+                await self.image_repo.delete_by_ids([image.id for image in plan.deleted])
+            added = await self.image_repo.create_many(dish_id, copied)
+            detail = _dish_detail(dish, category_name, plan.kept + added)
+
+            await self.dish_repo.commit()
+
+        except Exception as e:
+            await self.dish_repo.rollback()
+            await run_in_threadpool(_delete_objects, [key for key, _ in copied])
+            if isinstance(e, VersionConflictError):
+                raise VersionConflictError(await self._current(dish_id)) from e
+            raise
+
+        # 後処理（ベストエフォート）
+        await run_in_threadpool(_delete_objects, temp_keys + keys_to_delete_from_s3)
+
+        return _detail_to_response(detail)
+
+    async def delete_dish(self, dish_id: str, user_id: str) -> MessageResponse:
+        """料理を論理削除"""
+        dish = await self.dish_repo.find_by_id(dish_id)
+        if not dish:
+            raise DishNotFoundError()
+
+        if dish.user_id != user_id:
+            raise PermissionDeniedError()
+
+        try:
+            await self.dish_repo.soft_delete(dish)
+            await self.dish_repo.commit()
+        except VersionConflictError as e:
+            await self.dish_repo.rollback()
+            raise VersionConflictError(await self._current(dish_id)) from e
+
+        return MessageResponse(message="料理を削除しました")
+
+    async def _current(self, dish_id: str) -> DishResponse:
+        """競合時に返す最新の料理（削除されていれば DishNotFoundError）"""
+        detail = await self.dish_repo.find_detail(dish_id)
+        if not detail:
+            raise DishNotFoundError()
+        return _detail_to_response(detail)
+
+
+def _validate_create_images(request: DishCreateRequest) -> None:
+    """登録時の画像数・display_orderを検証"""
+    if request.images and len(request.images) > MAX_IMAGES:
+        raise ImageLimitExceededError()
+
+    if request.images:
+        orders = [img.display_order for img in request.images]
+        if len(orders) != len(set(orders)):
+            raise InvalidDisplayOrderError()
+        if any(o < 1 or o > 3 for o in orders):
+            raise InvalidDisplayOrderError()
+
+
+class _ImageChanges(NamedTuple):
+    """更新時の画像の差分（料理と一緒に読み込んだ画像一覧から算出）"""
+    kept: List[DishImageRow]
+    deleted: List[DishImageRow]
+    to_add: List[Tuple[str, int]]  # (一時パスのimage_key, 採番したdisplay_order)
+    unknown_ids: Set[str]  # 料理の画像でない削除対象ID
+
+
+def _plan_image_changes(dish: Dish, request: DishUpdateRequest) -> _ImageChanges:
+    """画像数を検証し、削除・残す・追加する画像を振り分ける"""
+    delete_ids = request.images_to_delete or []
+    images_to_add = request.images_to_add or []
+    if len(dish.images) - len(delete_ids) + len(images_to_add) > MAX_IMAGES:
+        raise ImageLimitExceededError()
+
+    current = [DishImageRow(img.id, img.image_key, img.display_order) for img in dish.images]
+    delete_set = set(delete_ids)
+    kept = [img for img in current if img.id not in delete_set]
+    max_order = max((img.display_order for img in kept), default=0)
+    return _ImageChanges(
+        kept=kept,
+        deleted=[img for img in current if img.id in delete_set],
+        to_add=[(img.image_key, max_order + i + 1) for i, img in enumerate(images_to_add)],
+        unknown_ids=delete_set - {img.id for img in current},
+    )
+
+
+def _copy_to_permanent(dish_id: str, images: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """一時パスの画像を正式パスへコピーし、(正式パスのimage_key, display_order) の一覧を返す
+
+    途中で失敗した場合は、それまでにコピーした画像を削除してから例外を送出する。
+    """
+    copied = []
+    try:
+        for temp_key, display_order in images:
+            ext = temp_key.split(".")[-1] if "." in temp_key else "jpg"
+            permanent_key = s3_service.generate_permanent_key(dish_id, display_order, ext)
+            s3_service.copy_to_permanent(temp_key, permanent_key)
+            copied.append((permanent_key, display_order))
+    except Exception:
+        _delete_objects([key for key, _ in copied])
+        raise
+    return copied
+
+
+def _delete_objects(keys: List[str]) -> None:
+    """S3オブジェクトを削除（ベストエフォート）"""
+    for key in keys:
+        s3_service.delete_object(key)
+
+
+def _image_pairs(images: Sequence[DishImageRow]) -> List[Tuple[str, int]]:
+    return [(img.image_key, img.display_order) for img in images]
+
+
+def _current_category_name(dish: Dish, category_id: Optional[str]) -> Optional[str]:
+    """カテゴリが変更されない場合、料理と一緒に読み込んだカテゴリ名を返す（それ以外はNone）"""
+    category = dish.category
+    if category_id and category is not None and category.id == category_id and category.deleted_at is None:
+        return category.name
+    return None
+
+
+def _loaded_detail(dish: Dish) -> DishDetail:
+    """find_by_id で読み込んだ料理（カテゴリ・画像を含む）から DishDetail を組み立てる"""
+    return _dish_detail(
+        dish,
+        dish.category.name if dish.category is not None else None,
+        [DishImageRow(img.id, img.image_key, img.display_order) for img in dish.images],
+    )
+
+
+def _dish_detail(dish: Dish, category_name: Optional[str], images: Sequence[DishImageRow]) -> DishDetail:
+    """書き込んだ料理・画像の値から DishDetail を組み立てる（コミット前に呼ぶ）"""
+    return DishDetail(
+        id=dish.id,
+        user_id=dish.user_id,
+        name=dish.name,
+        cooked_at=dish.cooked_at,
+        category_id=dish.category_id,
+        category_name=category_name,
+        created_at=dish.created_at,
+        updated_at=dish.updated_at,
+        version=dish.version,
+        images=tuple(sorted(images, key=lambda img: img.display_order)),
+    )
+
+
+def _to_list_response(rows: List[DishListRow], has_next: bool) -> DishListResponse:
+    """一覧の行DTOをDishListResponseに変換
+
+    値はDBから読んだ型のままなので、model_construct で検証を省略して組み立てる
+    （レスポンスの検証・JSON化は FastAPI が1回だけ行う）。
+    """
+    items = [
+        DishListItemResponse.model_construct(
+            id=row.id,
+            name=row.name,
+            cooked_at=row.cooked_at,
+            category=_category_response(row.category_id, row.category_name),
+            thumbnail_url=s3_service.generate_image_url(row.thumbnail_key) if row.thumbnail_key else None,
+            image_count=row.image_count,
+            created_at=row.created_at,
         )
+        for row in rows
+    ]
+
+    # 次ページカーソル生成
+    next_cursor = None
+    if has_next and rows:
+        last_row = rows[-1]
+        next_cursor = DishRepository.encode_cursor(last_row.cooked_at, last_row.id)
+
+    return DishListResponse.model_construct(
+        items=items,
+        next_cursor=next_cursor,
+        has_next=has_next,
+    )
+
+
+def _detail_to_response(detail: DishDetail) -> DishResponse:
+    """料理詳細の行DTOをDishResponseに変換（検証は省略）"""
+    return DishResponse.model_construct(
+        id=detail.id,
+        name=detail.name,
+        cooked_at=detail.cooked_at,
+        category=_category_response(detail.category_id, detail.category_name),
+        images=[
+            ImageResponse.model_construct(
+                id=image.id,
+                image_url=s3_service.generate_image_url(image.image_key),
+                display_order=image.display_order,
+            )
+            for image in detail.images
+        ],
+        created_at=detail.created_at,
+        updated_at=detail.updated_at,
+        version=detail.version,
+    )
+
+
+def _category_response(category_id: Optional[str], category_name: Optional[str]) -> Optional[CategoryResponse]:
+    if category_id is None or category_name is None:
+        return None
+    return CategoryResponse.model_construct(id=category_id, name=category_name)
@@ -0,0 +1,175 @@
+"""退会ユーザーのデータ削除ジョブ
+
+論理削除（deleted_at）から一定日数が経過したユーザーについて、
+dishes / dish_images（アーカイブ済みを含む）/ refresh_tokens の行とS3の画像
+（images/dishes/{dish_id}/ 配下）を主キーの小さなバッチで削除する。
+
+各バッチは「S3削除 → dish_images削除 → dishes削除 → コミット」の順に処理するため、
+途中で中断しても再実行すれば残りのデータから再開できる。
+全データの削除が完了したユーザーには users.purged_at を記録する。
+
+CLIから実行する場合:
+    python -m app.features.users.account_purge --batch-size 100 --sleep 0.2
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from app.core.batch import BatchReport, run_in_batches
+from app.core.config import settings
+from app.core.database import SessionLocal, shard_router
+from app.features.dishes.repository import DishArchiveRepository, DishRepository, DishImageRepository
+from app.features.dishes.s3_service import s3_service
+from app.features.users.models import User
+from app.features.users.repository import UserRepository, RefreshTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AccountPurgeResult:
+    """ユーザー1人分の削除結果"""
+    user_id: str
+    s3_objects: int = 0
+    reports: List[BatchReport] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "s3_objects": self.s3_objects,
+            "tables": [report.as_dict() for report in self.reports],
+        }
+
+
+def purge_user_data(
+    db,
+    user: User,
+    batch_size: int = settings.account_purge_batch_size,
+    sleep_seconds: float = settings.account_purge_sleep_seconds,
+) -> AccountPurgeResult:
+    """ユーザー1人分の関連データをバッチ単位で削除
+
+    料理・画像はユーザーのシャード、トークン・ユーザーは db（プライマリ）から削除する。
+    """
+    dish_db = shard_router.session_for_user(user.id)
+    try:
+        return _purge_user_data(db, dish_db, user, batch_size, sleep_seconds)
+    finally:
+        dish_db.close()
+
+
+def _purge_user_data(db, dish_db, user: User, batch_size: int, sleep_seconds: float) -> AccountPurgeResult:
+    dish_repo = DishRepository(dish_db)
+    image_repo = DishImageRepository(dish_db)
+    archive_repo = DishArchiveRepository(dish_db)
+    token_repo = RefreshTokenRepository(db)
+    result = AccountPurgeResult(user_id=user.id)
+
+    def delete_dishes(dish_ids: Sequence[str]) -> int:
+        # S3を先に削除（DB削除前に失敗しても再実行で同じ料理が対象になる）
+        for dish_id in dish_ids:
+            result.s3_objects += s3_service.delete_prefix(f"images/dishes/{dish_id}/")
+        try:
+            image_repo.delete_by_dish_ids(dish_ids)
+            deleted = dish_repo.delete_by_ids(dish_ids)
+            dish_repo.commit()
+        except Exception:
+            dish_repo.rollback()
+            raise
+        return deleted
+
+    result.reports.append(run_in_batches(
+        label=f"account_purge.dishes[{user.id}]",
+        fetch_ids=lambda limit: dish_repo.find_ids_by_user(user.id, limit),
+        process_ids=delete_dishes,
+        batch_size=batch_size,
+        sleep_seconds=sleep_seconds,
+    ))
+
+    def delete_archived_dishes(dish_ids: Sequence[str]) -> int:
+        for dish_id in dish_ids:
+            result.s3_objects += s3_service.delete_prefix(f"images/dishes/{dish_id}/")
+        try:
+            deleted = archive_repo.delete_by_ids(dish_ids)
+            archive_repo.commit()
+        except Exception:
+            archive_repo.rollback()
+            raise
+        return deleted
+
+    result.reports.append(run_in_batches(
+        label=f"account_purge.dishes_archive[{user.id}]",
+        fetch_ids=lambda limit: archive_repo.find_ids_by_user(user.id, limit),
+        process_ids=delete_archived_dishes,
+        batch_size=batch_size,
+        sleep_seconds=sleep_seconds,
+    ))
+    result.reports.append(run_in_batches(
+        label=f"account_purge.refresh_tokens[{user.id}]",
+        fetch_ids=lambda limit: token_repo.find_ids_by_user(user.id, limit),
+        process_ids=token_repo.delete_by_ids,
+        batch_size=batch_size,
+        sleep_seconds=sleep_seconds,
+    ))
+
+    UserRepository(db).mark_purged(user)
+    logger.info(f"Account purge finished: {result.as_dict()}")
+    return result
+
+
+def purge_deleted_users(
+    batch_size: int = settings.account_purge_batch_size,
+    sleep_seconds: float = settings.account_purge_sleep_seconds,
+    min_age_days: int = settings.account_purge_min_age_days,
+    max_users: Optional[int] = None,
+) -> List[AccountPurgeResult]:
+    """
+    論理削除から min_age_days 日以上経過したユーザーのデータを削除
+
+    Args:
+        batch_size: 1バッチで削除する行数
+        sleep_seconds: バッチ間の待機時間（秒）
+        min_age_days: 論理削除からの猶予日数
+        max_users: 1回の実行で処理するユーザー数の上限（Noneの場合は全員）
+    """
+    deleted_before = datetime.now(timezone.utc) - timedelta(days=min_age_days)
+    results: List[AccountPurgeResult] = []
+
+    db = SessionLocal()
+    try:
+        user_repo = UserRepository(db)
+        while max_users is None or len(results) < max_users:
+            users = user_repo.find_purge_targets(deleted_before, limit=1)
+            if not users:
+                break
+            results.append(purge_user_data(db, users[0], batch_size, sleep_seconds))
+            logger.info(f"Account purge progress: users={len(results)}")
+    finally:
+        db.close()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="退会ユーザーの料理・画像・トークンを削除")
+    parser.add_argument("--batch-size", type=int, default=settings.account_purge_batch_size)
+    parser.add_argument("--sleep", type=float, default=settings.account_purge_sleep_seconds)
+    parser.add_argument("--min-age-days", type=int, default=settings.account_purge_min_age_days)
+    parser.add_argument("--max-users", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = purge_deleted_users(
+        batch_size=args.batch_size,
+        sleep_seconds=args.sleep,
+        min_age_days=args.min_age_days,
+        max_users=args.max_users,
+    )
+    for result in results:
+        print(result.as_dict())
+
+
+if __name__ == "__main__":
+    main()
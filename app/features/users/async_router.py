@@ -0,0 +1,80 @@
+"""認証エンドポイント（非同期、ASYNC_ROUTES=true の場合に使用）
+
+router.py と同じパス・レスポンスを、非同期セッション（aiomysql）で処理する。
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.security import get_current_user_async
+from app.features.users.models import User
+from app.features.users.router import auth_rate_limit
+from app.features.users.schemas import (
+    RegisterRequest,
+    LoginRequest,
+    RefreshRequest,
+    TokenResponse,
+    UserResponse,
+    MessageResponse,
+)
+from app.features.users.errors import http_errors
+from app.features.users.service import AsyncAuthService
+
+
+router = APIRouter()
+
+
+@router.post("/register", response_model=TokenResponse, dependencies=[auth_rate_limit])
+async def register(
+    body: RegisterRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """ユーザー登録"""
+    with http_errors():
+        service = AsyncAuthService(db)
+        return await service.register(body.username, body.email, body.password)
+
+
+@router.post("/login", response_model=TokenResponse, dependencies=[auth_rate_limit])
+async def login(
+    body: LoginRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """ログイン"""
+    with http_errors():
+        service = AsyncAuthService(db)
+        return await service.login(body.email, body.password)
+
+
+@router.post("/refresh", response_model=TokenResponse, dependencies=[auth_rate_limit])
+async def refresh(
+    body: RefreshRequest,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """トークン更新"""
+    with http_errors():
+        service = AsyncAuthService(db)
+        return await service.refresh(body.refresh_token)
+
+
+@router.post("/logout", response_model=MessageResponse)
+async def logout(
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """ログアウト"""
+    service = AsyncAuthService(db)
+    await service.logout(current_user)
+    return MessageResponse(message="ログアウトしました")
+
+
+@router.get("/me", response_model=UserResponse)
+async def get_me(current_user: User = Depends(get_current_user_async)):
+    """現在のユーザー情報"""
+    return UserResponse(
+        id=current_user.id,
+        username=current_user.username,
+        email=current_user.email,
+        status=current_user.status.value,
+    )
@@ -0,0 +1,103 @@
+"""認証エンドポイントのエラーレスポンス
+
+同期（router.py）・非同期（async_router.py）のエンドポイントで共通の、
+サービス層の例外から HTTPException への変換。
+エラーコード・メッセージを変更する場合は本モジュールのみを変更する。
+"""
+
+import math
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+
+from app.core.exceptions import PasswordHasherBusyError
+from app.features.users.exceptions import (
+    InvalidCredentialsError,
+    InvalidTokenError,
+    LoginBackoffError,
+    UserAlreadyExistsError,
+    UserNotActiveError,
+)
+
+
+# 例外 → (ステータスコード, エラーコード, メッセージ)
+ERROR_RESPONSES: Dict[Type[Exception], Tuple[int, str, str]] = {
+    UserAlreadyExistsError: (
+        status.HTTP_400_BAD_REQUEST,
+        "USER_ALREADY_EXISTS",
+        "このメールアドレスは既に登録されています",
+    ),
+    InvalidCredentialsError: (
+        status.HTTP_401_UNAUTHORIZED,
+        "INVALID_CREDENTIALS",
+        "メールアドレスまたはパスワードが正しくありません",
+    ),
+    InvalidTokenError: (
+        status.HTTP_401_UNAUTHORIZED,
+        "INVALID_TOKEN",
+        "トークンが無効または期限切れです",
+    ),
+    UserNotActiveError: (
+        status.HTTP_401_UNAUTHORIZED,
+        "USER_NOT_ACTIVE",
+        "アカウントが無効です",
+    ),
+}
+
+
+def password_hasher_busy() -> HTTPException:
+    """パスワードハッシュの待ち行列超過時のエラー"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={
+            "error_code": "SERVICE_BUSY",
+            "message": "ただいま混み合っています。しばらくしてから再度お試しください",
+            "details": None,
+        },
+        headers={"Retry-After": "1"},
+    )
+
+
+def login_backoff(e: LoginBackoffError) -> HTTPException:
+    """429 TOO_MANY_LOGIN_ATTEMPTS（再試行できるまでの秒数を Retry-After で返す）"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "error_code": "TOO_MANY_LOGIN_ATTEMPTS",
+            "message": "ログインの失敗が続いたため、しばらくしてから再度お試しください",
+            "details": None,
+        },
+        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+    )
+
+
+def to_http_exception(e: Exception) -> Optional[HTTPException]:
+    """サービス層の例外を HTTPException に変換（対応しない例外は None）"""
+    if isinstance(e, PasswordHasherBusyError):
+        return password_hasher_busy()
+    if isinstance(e, LoginBackoffError):
+        return login_backoff(e)
+    if type(e) not in ERROR_RESPONSES:
+        return None
+    code, error_code, message = ERROR_RESPONSES[type(e)]
+    return HTTPException(
+        status_code=code,
+        detail={"error_code": error_code, "message": message, "details": None},
+    )
+
+
+@contextmanager
+def http_errors() -> Iterator[None]:
+    """ブロック内で送出されたサービス層の例外を HTTPException に変換して送出する
+
+    同期・非同期どちらのエンドポイントでも `with http_errors():` の形で使う。
+    対応しない例外はそのまま送出する（500）。
+    """
+    try:
+        yield
+    except Exception as e:
+        http_exception = to_http_exception(e)
+        if http_exception is None:
+            raise
+        raise http_exception
@@ -19,3 +19,11 @@ class UserAlreadyExistsError(Exception):
 class UserNotActiveError(Exception):
     """ユーザーがアクティブでない"""
     pass
+
+
+class LoginBackoffError(Exception):
+    """ログイン失敗が続いたためアカウント単位で試行を制限中"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
@@ -0,0 +1,85 @@
+"""最終ログイン日時の書き込みバッファ
+
+ログインごとに users.last_login_at をUPDATE・コミットする代わりに、
+ワーカー内のメモリに集約し、一定間隔で1回のUPDATEにまとめて書き込む。
+last_login_at は最大 LAST_LOGIN_FLUSH_INTERVAL_SECONDS 秒遅れて反映される。
+
+ログイン処理（イベントループ上）からはDBに書き込まない。上限件数に達した場合は
+full イベントをセットし、バックグラウンドの定期実行タスク（app/main.py）に書き込みを任せる。
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.features.users.repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class LastLoginBuffer:
+    """最終ログイン日時の書き込みバッファ（スレッドセーフ）"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # 上限件数に達したことを定期実行タスクに知らせるイベント
+        self.full = threading.Event()
+        self._pending: Dict[str, datetime] = {}
+        self._flushed_rows = 0
+        self._flushes = 0
+
+    def record(self, user_id: str, logged_in_at: Optional[datetime] = None) -> None:
+        """ログイン日時を記録（上限に達した場合は定期実行タスクに書き込みを依頼する）"""
+        logged_in_at = logged_in_at or datetime.now(timezone.utc)
+        with self._lock:
+            self._pending[user_id] = logged_in_at
+            is_full = len(self._pending) >= self.max_size
+        if is_full:
+            self.full.set()
+
+    def flush(self) -> int:
+        """溜まったログイン日時をDBに書き込む"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            db = SessionLocal()
+            try:
+                rows = UserRepository(db).bulk_update_last_login(pending)
+            except Exception:
+                # 書き込めなかった分は戻す（新しい値を優先）
+                with self._lock:
+                    for user_id, logged_in_at in pending.items():
+                        current = self._pending.get(user_id)
+                        if current is None or current < logged_in_at:
+                            self._pending[user_id] = logged_in_at
+                raise
+            finally:
+                db.close()
+
+            with self._lock:
+                self._flushes += 1
+                self._flushed_rows += rows
+            return rows
+
+    def stats(self) -> dict:
+        """未書き込み件数等を返す"""
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "flushes": self._flushes,
+                "flushed_rows": self._flushed_rows,
+            }
+
+
+# シングルトンインスタンス
+last_login_buffer = LastLoginBuffer(max_size=settings.last_login_buffer_max_size)
+metrics.register("last_login_buffer", last_login_buffer.stats)
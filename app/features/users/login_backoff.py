@@ -0,0 +1,88 @@
+"""アカウント単位のログイン試行バックオフ
+
+IP単位のレート制限では分散したパスワードリスト攻撃を防げず、
+試行のたびにbcryptの検証コストが発生する。
+メールアドレスごとの失敗回数を全ワーカー共有のスロットテーブルに記録し、
+一定回数を超えたら指数的に延びる待機時間の間、検証前に拒否する。
+"""
+
+import time
+from typing import Optional
+
+from app.core.config import settings
+from app.core.shared_state import SlotValue, create_slot_store
+
+
+class LoginBackoff:
+    """メールアドレス単位のログイン失敗バックオフ"""
+
+    def __init__(
+        self,
+        store,
+        threshold: int,
+        base_seconds: float,
+        max_seconds: float,
+        window_seconds: float,
+    ):
+        self.store = store
+        self.threshold = threshold
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.window_seconds = window_seconds
+
+    def retry_after(self, email: str) -> Optional[float]:
+        """
+        バックオフ中かどうかを判定
+
+        Returns:
+            None: 試行可能
+            float: バックオフ中（再試行までの秒数）
+        """
+        now = time.time()
+
+        def read(current: Optional[SlotValue]):
+            if current is None:
+                return (0.0, 0.0), None
+            failures, last_failed_at = current
+            blocked_until = last_failed_at + self._delay(int(failures))
+            if now - last_failed_at > self.window_seconds or now >= blocked_until:
+                return current, None
+            return current, blocked_until - now
+
+        return self.store.update(self._key(email), read)
+
+    def record_failure(self, email: str) -> None:
+        """ログイン失敗を記録（前回失敗から window_seconds 経過していればリセット）"""
+        now = time.time()
+
+        def increment(current: Optional[SlotValue]):
+            failures, last_failed_at = current if current is not None else (0.0, 0.0)
+            if now - last_failed_at > self.window_seconds:
+                failures = 0.0
+            return (failures + 1, now), None
+
+        self.store.update(self._key(email), increment)
+
+    def reset(self, email: str) -> None:
+        """ログイン成功時に失敗回数をリセット"""
+        self.store.update(self._key(email), lambda current: ((0.0, 0.0), None))
+
+    def _delay(self, failures: int) -> float:
+        """失敗回数に応じた待機時間（threshold回目以降は指数的に延長）"""
+        if failures < self.threshold:
+            return 0.0
+        return min(self.max_seconds, self.base_seconds * 2 ** (failures - self.threshold))
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return f"login:{email.strip().lower()}"
+
+
+# シングルトンインスタンス
+login_backoff = LoginBackoff(
+    store=create_slot_store("login_backoff", settings.login_backoff_slots),
+    threshold=settings.login_backoff_threshold,
+    base_seconds=settings.login_backoff_base_seconds,
+    max_seconds=settings.login_backoff_max_seconds,
+    window_seconds=settings.login_backoff_window_seconds,
+)
@@ -1,12 +1,13 @@
-import uuid
 from enum import Enum as PyEnum
 
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey
-from sqlalchemy.dialects.mysql import CHAR
+from sqlalchemy import Boolean, Column, String, DateTime, Enum, ForeignKey, Integer, event, inspect
+from sqlalchemy.dialects.mysql import BINARY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.types import BinaryUUID, new_id
+from app.core.user_cache import user_cache
 
 
 class UserStatus(PyEnum):
@@ -20,32 +21,66 @@ class User(Base):
     """ユーザーテーブル"""
     __tablename__ = "users"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()), comment="主キー（UUID）")
+    id = Column(BinaryUUID(), primary_key=True, default=new_id, comment="主キー（UUIDv7）")
     username = Column(String(100), nullable=False, comment="表示名（ニックネーム）")
     email = Column(String(255), nullable=False, unique=True, index=True, comment="メールアドレス（ログインID）")
     email_verified_at = Column(DateTime, nullable=True, comment="メール確認完了日時")
     password_hash = Column(String(255), nullable=False, comment="ハッシュ化されたパスワード")
     status = Column(Enum(UserStatus), nullable=False, default=UserStatus.provisional, comment="ステータス")
     last_login_at = Column(DateTime, nullable=True, comment="最終ログイン日時")
+    auth_version = Column(Integer, nullable=False, default=0, server_default="0", comment="認証情報バージョン（キャッシュ無効化用）")
     created_at = Column(DateTime, server_default=func.now(), comment="作成日時")
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment="更新日時")
     deleted_at = Column(DateTime, nullable=True, comment="削除日時（論理削除）")
+    purged_at = Column(DateTime, nullable=True, comment="関連データ削除完了日時")
 
     # リレーション
     refresh_tokens = relationship("RefreshToken", back_populates="user")
     dishes = relationship("Dish", back_populates="user")
 
 
+# ユーザーキャッシュのスナップショットに含まれる属性
+_CACHED_ATTRIBUTES = ("username", "email", "status", "deleted_at")
+
+
+@event.listens_for(User, "before_update")
+def _bump_auth_version(mapper, connection, target: User) -> None:
+    """スナップショット対象の属性が変更されたらauth_versionを更新
+
+    ステータス変更・論理削除を他ワーカーのキャッシュにも伝えるため。
+    NOTE: Query.update() 等の一括更新ではイベントが発火しないため、
+    UserRepository.bump_auth_version を併用すること。
+    """
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _CACHED_ATTRIBUTES):
+        target.auth_version = (target.auth_version or 0) + 1
+        user_cache.invalidate(target.id)
+
+
 class RefreshToken(Base):
     """リフレッシュトークンテーブル"""
     __tablename__ = "refresh_tokens"
 
-    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()), comment="主キー（UUID）")
-    user_id = Column(CHAR(36), ForeignKey("users.id"), nullable=False, index=True, comment="ユーザーID")
-    token_hash = Column(String(255), nullable=False, index=True, comment="トークンハッシュ（SHA-256）")
-    expires_at = Column(DateTime, nullable=False, comment="有効期限")
-    revoked_at = Column(DateTime, nullable=True, comment="無効化日時")
+    id = Column(BinaryUUID(), primary_key=True, default=new_id, comment="主キー（UUIDv7）")
+    user_id = Column(BinaryUUID(), ForeignKey("users.id"), nullable=False, index=True, comment="ユーザーID")
+    family_id = Column(BinaryUUID(), nullable=False, index=True, comment="トークンファミリーID（ローテーション系列）")
+    token_hash = Column(BINARY(32), nullable=False, index=True, comment="トークンハッシュ（SHA-256ダイジェスト）")
+    expires_at = Column(DateTime, nullable=False, index=True, comment="有効期限")
+    revoked_at = Column(DateTime, nullable=True, index=True, comment="無効化日時")
     created_at = Column(DateTime, server_default=func.now(), comment="作成日時")
 
     # リレーション
     user = relationship("User", back_populates="refresh_tokens")
+
+
+class UserShard(Base):
+    """ユーザーと料理データのシャードの対応（プライマリに保持）
+
+    行がないユーザーは user_id のハッシュでシャードを決める。
+    """
+    __tablename__ = "user_shards"
+
+    user_id = Column(BinaryUUID(), ForeignKey("users.id"), primary_key=True, comment="ユーザーID")
+    shard_id = Column(Integer, nullable=False, comment="シャード番号（0はプライマリ）")
+    locked = Column(Boolean, nullable=False, default=False, server_default="0", comment="シャード移動中（書き込み停止）")
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), comment="更新日時")
@@ -1,13 +1,36 @@
 """DB操作リポジトリ"""
 
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
 
+from sqlalchemy import bindparam, case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.features.users.models import User, RefreshToken, UserStatus
 
 
+# === 組み立て済みステートメント ===
+# ホットパスのクエリはモジュール読み込み時に一度だけ組み立て、値はバインドパラメータで渡す。
+# リクエストごとのクエリ組み立てとキャッシュキー生成を省略し、コンパイル済みSQLを再利用する。
+_FIND_USER_BY_EMAIL = (
+    select(User)
+    .where(User.email == bindparam("email"), User.deleted_at.is_(None))
+    .limit(1)
+)
+_FIND_USER_BY_ID = (
+    select(User)
+    .where(User.id == bindparam("user_id"), User.deleted_at.is_(None))
+    .limit(1)
+)
+_FIND_TOKEN_BY_HASH_FOR_UPDATE = (
+    select(RefreshToken)
+    .where(RefreshToken.token_hash == bindparam("token_hash"), RefreshToken.expires_at > bindparam("now"))
+    .limit(1)
+    .with_for_update()
+)
+
+
 class UserRepository:
     """ユーザーリポジトリ"""
 
@@ -16,17 +39,11 @@ class UserRepository:
 
     def find_by_email(self, email: str) -> Optional[User]:
         """メールアドレスでユーザー検索（論理削除除外）"""
-        return self.db.query(User).filter(
-            User.email == email,
-            User.deleted_at.is_(None),
-        ).first()
+        return self.db.execute(_FIND_USER_BY_EMAIL, {"email": email}).scalars().first()
 
     def find_by_id(self, user_id: str) -> Optional[User]:
         """IDでユーザー検索（論理削除除外）"""
-        return self.db.query(User).filter(
-            User.id == user_id,
-            User.deleted_at.is_(None),
-        ).first()
+        return self.db.execute(_FIND_USER_BY_ID, {"user_id": user_id}).scalars().first()
 
     def create(self, username: str, email: str, password_hash: str) -> User:
         """ユーザー作成"""
@@ -41,11 +58,52 @@ class UserRepository:
         self.db.refresh(user)
         return user
 
-    def update_last_login(self, user: User) -> None:
-        """最終ログイン日時を更新"""
-        user.last_login_at = datetime.now(timezone.utc)
+    def bump_auth_version(self, user_id: str) -> None:
+        """認証情報バージョンを更新（全ワーカーのユーザーキャッシュを無効化）"""
+        self.db.query(User).filter(User.id == user_id).update(
+            {"auth_version": User.auth_version + 1},
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def find_purge_targets(self, deleted_before: datetime, limit: int) -> List[User]:
+        """データ削除が未完了の論理削除済みユーザーを取得"""
+        return (
+            self.db.query(User)
+            .filter(
+                User.deleted_at.is_not(None),
+                User.deleted_at < deleted_before,
+                User.purged_at.is_(None),
+            )
+            .order_by(User.deleted_at)
+            .limit(limit)
+            .all()
+        )
+
+    def mark_purged(self, user: User) -> None:
+        """関連データの削除完了を記録"""
+        user.purged_at = datetime.now(timezone.utc)
         self.db.commit()
 
+    def bulk_update_last_login(self, last_login_by_user_id: Dict[str, datetime]) -> int:
+        """
+        複数ユーザーの最終ログイン日時を1回のUPDATEで更新
+
+        UPDATE users SET last_login_at = CASE WHEN id = ? THEN ? ... END WHERE id IN (...)
+        """
+        if not last_login_by_user_id:
+            return 0
+        result = self.db.execute(
+            update(User)
+            .where(User.id.in_(list(last_login_by_user_id)))
+            .values(last_login_at=case(
+                *[(User.id == user_id, at) for user_id, at in last_login_by_user_id.items()]
+            ))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return result.rowcount
+
 
 class RefreshTokenRepository:
     """リフレッシュトークンリポジトリ"""
@@ -53,31 +111,41 @@ class RefreshTokenRepository:
     def __init__(self, db: Session):
         self.db = db
 
-    def create(self, user_id: str, token_hash: str, expires_at: datetime) -> RefreshToken:
-        """リフレッシュトークン保存"""
+    def create(
+        self, user_id: str, family_id: str, token_hash: bytes, expires_at: datetime
+    ) -> RefreshToken:
+        """リフレッシュトークン保存（コミットは呼び出し側）"""
         refresh_token = RefreshToken(
             user_id=user_id,
+            family_id=family_id,
             token_hash=token_hash,
             expires_at=expires_at,
         )
         self.db.add(refresh_token)
-        self.db.commit()
-        self.db.refresh(refresh_token)
         return refresh_token
 
-    def find_by_hash(self, token_hash: str) -> Optional[RefreshToken]:
-        """ハッシュでトークン検索（有効なもののみ）"""
+    def find_by_hash_for_update(self, token_hash: bytes) -> Optional[RefreshToken]:
+        """
+        ハッシュでトークン検索（行ロック付き、有効期限内のもの）
+
+        再利用検知のため、無効化済みのトークンも返す。
+        """
         now = datetime.now(timezone.utc)
-        return self.db.query(RefreshToken).filter(
-            RefreshToken.token_hash == token_hash,
-            RefreshToken.revoked_at.is_(None),
-            RefreshToken.expires_at > now,
-        ).first()
+        return self.db.execute(
+            _FIND_TOKEN_BY_HASH_FOR_UPDATE, {"token_hash": token_hash, "now": now}
+        ).scalars().first()
 
     def revoke(self, refresh_token: RefreshToken) -> None:
-        """トークン無効化"""
+        """トークン無効化（コミットは呼び出し側）"""
         refresh_token.revoked_at = datetime.now(timezone.utc)
-        self.db.commit()
+
+    def revoke_family(self, family_id: str) -> None:
+        """トークンファミリーを一括無効化（コミットは呼び出し側）"""
+        now = datetime.now(timezone.utc)
+        self.db.query(RefreshToken).filter(
+            RefreshToken.family_id == family_id,
+            RefreshToken.revoked_at.is_(None),
+        ).update({"revoked_at": now}, synchronize_session=False)
 
     def revoke_all_for_user(self, user_id: str) -> None:
         """ユーザーの全トークン無効化"""
@@ -87,3 +155,163 @@ class RefreshTokenRepository:
             RefreshToken.revoked_at.is_(None),
         ).update({"revoked_at": now})
         self.db.commit()
+
+    def find_ids_by_user(self, user_id: str, limit: int) -> List[str]:
+        """ユーザーのトークンIDを取得"""
+        rows = (
+            self.db.query(RefreshToken.id)
+            .filter(RefreshToken.user_id == user_id)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    def find_expired_ids(self, now: datetime, limit: int) -> List[str]:
+        """有効期限切れトークンのIDを取得（expires_atインデックスを使用）"""
+        rows = (
+            self.db.query(RefreshToken.id)
+            .filter(RefreshToken.expires_at < now)
+            .order_by(RefreshToken.expires_at)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    def find_revoked_ids(self, revoked_before: datetime, limit: int) -> List[str]:
+        """一定期間より前に無効化されたトークンのIDを取得（revoked_atインデックスを使用）"""
+        rows = (
+            self.db.query(RefreshToken.id)
+            .filter(RefreshToken.revoked_at < revoked_before)
+            .order_by(RefreshToken.revoked_at)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    def delete_by_ids(self, token_ids: Sequence[str]) -> int:
+        """指定IDのトークンを物理削除してコミット"""
+        deleted = self.db.query(RefreshToken).filter(
+            RefreshToken.id.in_(token_ids)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+    def commit(self) -> None:
+        """トランザクションをコミット"""
+        self.db.commit()
+
+    def rollback(self) -> None:
+        """トランザクションをロールバック"""
+        self.db.rollback()
+
+
+# === 非同期リポジトリ（ASYNC_ROUTES=true の場合のエンドポイント用） ===
+# リクエスト処理で使うメソッドのみを持つ。バッチジョブは同期リポジトリを使う。
+# UPDATE の WHERE 句のバインドパラメータは、SET 句のカラム名と衝突しないよう b_ を付ける。
+_BUMP_AUTH_VERSION = (
+    update(User)
+    .where(User.id == bindparam("user_id"))
+    .values(auth_version=User.auth_version + 1)
+    .execution_options(synchronize_session=False)
+)
+_REVOKE_FAMILY = (
+    update(RefreshToken)
+    .where(RefreshToken.family_id == bindparam("b_family_id"), RefreshToken.revoked_at.is_(None))
+    .values(revoked_at=bindparam("now"))
+    .execution_options(synchronize_session=False)
+)
+_REVOKE_ALL_FOR_USER = (
+    update(RefreshToken)
+    .where(RefreshToken.user_id == bindparam("b_user_id"), RefreshToken.revoked_at.is_(None))
+    .values(revoked_at=bindparam("now"))
+    .execution_options(synchronize_session=False)
+)
+
+
+class AsyncUserRepository:
+    """ユーザーリポジトリ（非同期）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def find_by_email(self, email: str) -> Optional[User]:
+        """メールアドレスでユーザー検索（論理削除除外）"""
+        return (await self.db.execute(_FIND_USER_BY_EMAIL, {"email": email})).scalars().first()
+
+    async def find_by_id(self, user_id: str) -> Optional[User]:
+        """IDでユーザー検索（論理削除除外）"""
+        return (await self.db.execute(_FIND_USER_BY_ID, {"user_id": user_id})).scalars().first()
+
+    async def create(self, username: str, email: str, password_hash: str) -> User:
+        """ユーザー作成"""
+        user = User(
+            username=username,
+            email=email,
+            password_hash=password_hash,
+            status=UserStatus.active,  # 登録時はアクティブ
+        )
+        self.db.add(user)
+        await self.db.commit()
+        await self.db.refresh(user)
+        return user
+
+    async def bump_auth_version(self, user_id: str) -> None:
+        """認証情報バージョンを更新（全ワーカーのユーザーキャッシュを無効化）"""
+        await self.db.execute(_BUMP_AUTH_VERSION, {"user_id": user_id})
+        await self.db.commit()
+
+
+class AsyncRefreshTokenRepository:
+    """リフレッシュトークンリポジトリ（非同期）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def create(
+        self, user_id: str, family_id: str, token_hash: bytes, expires_at: datetime
+    ) -> RefreshToken:
+        """リフレッシュトークン保存（コミットは呼び出し側）"""
+        refresh_token = RefreshToken(
+            user_id=user_id,
+            family_id=family_id,
+            token_hash=token_hash,
+            expires_at=expires_at,
+        )
+        self.db.add(refresh_token)
+        return refresh_token
+
+    async def find_by_hash_for_update(self, token_hash: bytes) -> Optional[RefreshToken]:
+        """
+        ハッシュでトークン検索（行ロック付き、有効期限内のもの）
+
+        再利用検知のため、無効化済みのトークンも返す。
+        """
+        now = datetime.now(timezone.utc)
+        return (await self.db.execute(
+            _FIND_TOKEN_BY_HASH_FOR_UPDATE, {"token_hash": token_hash, "now": now}
+        )).scalars().first()
+
+    def revoke(self, refresh_token: RefreshToken) -> None:
+        """トークン無効化（コミットは呼び出し側）"""
+        refresh_token.revoked_at = datetime.now(timezone.utc)
+
+    async def revoke_family(self, family_id: str) -> None:
+        """トークンファミリーを一括無効化（コミットは呼び出し側）"""
+        await self.db.execute(
+            _REVOKE_FAMILY, {"b_family_id": family_id, "now": datetime.now(timezone.utc)}
+        )
+
+    async def revoke_all_for_user(self, user_id: str) -> None:
+        """ユーザーの全トークン無効化"""
+        await self.db.execute(
+            _REVOKE_ALL_FOR_USER, {"b_user_id": user_id, "now": datetime.now(timezone.utc)}
+        )
+        await self.db.commit()
+
+    async def commit(self) -> None:
+        """トランザクションをコミット"""
+        await self.db.commit()
+
+    async def rollback(self) -> None:
+        """トランザクションをロールバック"""
+        await self.db.rollback()
@@ -1,12 +1,11 @@
 """認証エンドポイント"""
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.rate_limit import limit_by_ip
 from app.core.security import get_current_user
 from app.features.users.models import User
 from app.features.users.schemas import (
@@ -17,101 +16,45 @@ from app.features.users.schemas import (
     UserResponse,
     MessageResponse,
 )
+from app.features.users.errors import http_errors
 from app.features.users.service import AuthService
-from app.features.users.exceptions import (
-    InvalidCredentialsError,
-    InvalidTokenError,
-    UserAlreadyExistsError,
-    UserNotActiveError,
-)
 
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
+auth_rate_limit = Depends(limit_by_ip("auth", settings.rate_limit_auth))
 
 
-@router.post("/register", response_model=TokenResponse)
-@limiter.limit(settings.rate_limit_auth)
-def register(
-    request: Request,
+@router.post("/register", response_model=TokenResponse, dependencies=[auth_rate_limit])
+async def register(
     body: RegisterRequest,
     db: Session = Depends(get_db),
 ):
     """ユーザー登録"""
-    try:
+    with http_errors():
         service = AuthService(db)
-        return service.register(body.username, body.email, body.password)
-    except UserAlreadyExistsError:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error_code": "USER_ALREADY_EXISTS",
-                "message": "このメールアドレスは既に登録されています",
-                "details": None,
-            },
-        )
+        return await service.register(body.username, body.email, body.password)
 
 
-@router.post("/login", response_model=TokenResponse)
-@limiter.limit(settings.rate_limit_auth)
-def login(
-    request: Request,
+@router.post("/login", response_model=TokenResponse, dependencies=[auth_rate_limit])
+async def login(
     body: LoginRequest,
     db: Session = Depends(get_db),
 ):
     """ログイン"""
-    try:
+    with http_errors():
         service = AuthService(db)
-        return service.login(body.email, body.password)
-    except InvalidCredentialsError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error_code": "INVALID_CREDENTIALS",
-                "message": "メールアドレスまたはパスワードが正しくありません",
-                "details": None,
-            },
-        )
-    except UserNotActiveError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error_code": "USER_NOT_ACTIVE",
-                "message": "アカウントが無効です",
-                "details": None,
-            },
-        )
+        return await service.login(body.email, body.password)
 
 
-@router.post("/refresh", response_model=TokenResponse)
-@limiter.limit(settings.rate_limit_auth)
+@router.post("/refresh", response_model=TokenResponse, dependencies=[auth_rate_limit])
 def refresh(
-    request: Request,
     body: RefreshRequest,
     db: Session = Depends(get_db),
 ):
     """トークン更新"""
-    try:
+    with http_errors():
         service = AuthService(db)
         return service.refresh(body.refresh_token)
-    except InvalidTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error_code": "INVALID_TOKEN",
-                "message": "トークンが無効または期限切れです",
-                "details": None,
-            },
-        )
-    except UserNotActiveError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error_code": "USER_NOT_ACTIVE",
-                "message": "アカウントが無効です",
-                "details": None,
-            },
-        )
 
 
 @router.post("/logout", response_model=MessageResponse)
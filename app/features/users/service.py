@@ -1,28 +1,47 @@
 """認証ビジネスロジック"""
 
+import asyncio
+import logging
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.password_hasher import password_hasher
+from app.core.types import new_id
+from app.core.user_cache import user_cache
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token,
     hash_token,
+    is_jwt_token,
 )
+from app.features.users.last_login_buffer import last_login_buffer
+from app.features.users.login_backoff import login_backoff
 from app.features.users.models import User, UserStatus
-from app.features.users.repository import UserRepository, RefreshTokenRepository
+from app.features.users.repository import (
+    AsyncRefreshTokenRepository,
+    AsyncUserRepository,
+    RefreshTokenRepository,
+    UserRepository,
+)
 from app.features.users.schemas import TokenResponse
 from app.features.users.exceptions import (
     InvalidCredentialsError,
     InvalidTokenError,
+    LoginBackoffError,
     UserAlreadyExistsError,
     UserNotActiveError,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
     """認証サービス"""
@@ -32,118 +51,268 @@ class AuthService:
         self.user_repo = UserRepository(db)
         self.token_repo = RefreshTokenRepository(db)
 
-    def register(self, username: str, email: str, password: str) -> TokenResponse:
+    async def register(self, username: str, email: str, password: str) -> TokenResponse:
         """
         ユーザー登録
         1. メールアドレス重複チェック
-        2. パスワードハッシュ化
+        2. パスワードハッシュ化（専用プロセスプール）
         3. ユーザー作成
         4. トークン発行
+
+        DB操作はスレッドプール、bcryptは専用プロセスプールで実行する。
         """
         # メールアドレス重複チェック
-        existing_user = self.user_repo.find_by_email(email)
+        existing_user = await run_in_threadpool(self.user_repo.find_by_email, email)
         if existing_user:
             raise UserAlreadyExistsError()
 
         # パスワードハッシュ化してユーザー作成
-        password_hash = hash_password(password)
-        user = self.user_repo.create(username, email, password_hash)
+        password_hash = await hash_password_async(password)
+        user = await run_in_threadpool(self.user_repo.create, username, email, password_hash)
 
         # トークン発行
-        return self._issue_tokens(user)
+        return await run_in_threadpool(self._issue_tokens, user)
 
-    def login(self, email: str, password: str) -> TokenResponse:
+    async def login(self, email: str, password: str) -> TokenResponse:
         """
         ログイン
-        1. ユーザー検索
-        2. パスワード検証
-        3. ステータスチェック
-        4. トークン発行
-        5. 最終ログイン日時更新
+        1. アカウント単位のバックオフ判定（bcrypt検証の前に拒否）
+        2. ユーザー検索
+        3. パスワード検証（専用プロセスプール）
+        4. ステータスチェック
+        5. 最終ログイン日時記録（書き込みバッファ経由で遅延反映）
+        6. トークン発行
+
+        DB操作はスレッドプール、bcryptは専用プロセスプールで実行する。
         """
+        # バックオフ判定
+        retry_after = login_backoff.retry_after(email)
+        if retry_after is not None:
+            raise LoginBackoffError(retry_after)
+
         # ユーザー検索
-        user = self.user_repo.find_by_email(email)
+        user = await run_in_threadpool(self.user_repo.find_by_email, email)
         if not user:
+            # 存在しないメールアドレス: ハッシュ計算はせず、検証と同程度の時間だけ待って応答
+            login_backoff.record_failure(email)
+            await asyncio.sleep(password_hasher.typical_verify_seconds())
             raise InvalidCredentialsError()
 
         # パスワード検証
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
+            login_backoff.record_failure(email)
             raise InvalidCredentialsError()
+        login_backoff.reset(email)
 
         # ステータスチェック
         if user.status != UserStatus.active:
             raise UserNotActiveError()
 
-        # 最終ログイン日時更新
-        self.user_repo.update_last_login(user)
+        # 最終ログイン日時記録（コミットはバッファのフラッシュ時にまとめて行う）
+        last_login_buffer.record(user.id)
 
         # トークン発行
-        return self._issue_tokens(user)
+        return await run_in_threadpool(self._issue_tokens, user)
 
     def refresh(self, refresh_token_str: str) -> TokenResponse:
         """
-        トークン更新
-        1. JWTデコード・検証
-        2. DBからトークン検索
-        3. 古いトークン無効化
-        4. 新しいトークン発行
+        トークン更新（単一トランザクションでローテーション）
+        1. JWT形式の場合のみデコード・検証（不透明トークンはハッシュ照合のみ）
+        2. DBからトークン検索（行ロック）
+        3. 無効化済みトークンの再利用を検知した場合はファミリーごと無効化
+        4. 古いトークン無効化・新しいトークン発行（1回のコミット）
         """
-        # JWTデコード・検証
-        payload = decode_token(refresh_token_str)
-        if payload is None:
-            raise InvalidTokenError()
+        # JWT形式（REFRESH_TOKEN_FORMAT=jwt で発行されたトークン）はデコード・検証
+        expected_user_id: Optional[str] = None
+        if is_jwt_token(refresh_token_str):
+            payload = decode_token(refresh_token_str)
+            if payload is None:
+                raise InvalidTokenError()
 
-        # リフレッシュトークンかどうかチェック
-        if payload.get("type") != "refresh":
-            raise InvalidTokenError()
+            # リフレッシュトークンかどうかチェック
+            if payload.get("type") != "refresh":
+                raise InvalidTokenError()
 
-        user_id = payload.get("sub")
-        if not user_id:
-            raise InvalidTokenError()
+            expected_user_id = payload.get("sub")
+            if not expected_user_id:
+                raise InvalidTokenError()
 
-        # DBからトークン検索
         token_hash = hash_token(refresh_token_str)
-        db_token = self.token_repo.find_by_hash(token_hash)
-        if not db_token:
-            raise InvalidTokenError()
+        try:
+            # DBからトークン検索（同時リクエストは行ロックで直列化）
+            db_token = self.token_repo.find_by_hash_for_update(token_hash)
+            if not db_token:
+                raise InvalidTokenError()
+            if expected_user_id is not None and db_token.user_id != expected_user_id:
+                raise InvalidTokenError()
+            user_id = db_token.user_id
 
-        # ユーザー取得
-        user = self.user_repo.find_by_id(user_id)
-        if not user:
-            raise InvalidTokenError()
+            # 再利用検知: 無効化済みトークンが提示されたらファミリーごと無効化
+            if db_token.revoked_at is not None:
+                logger.warning(
+                    f"Refresh token reuse detected: user_id={user_id}, family_id={db_token.family_id}"
+                )
+                self.token_repo.revoke_family(db_token.family_id)
+                self.token_repo.commit()
+                raise InvalidTokenError()
 
-        # ステータスチェック
-        if user.status != UserStatus.active:
-            raise UserNotActiveError()
+            # ユーザー取得
+            user = self.user_repo.find_by_id(user_id)
+            if not user:
+                raise InvalidTokenError()
+
+            # ステータスチェック
+            if user.status != UserStatus.active:
+                raise UserNotActiveError()
 
-        # 古いトークン無効化
-        self.token_repo.revoke(db_token)
+            # 古いトークン無効化・新しいトークン発行
+            self.token_repo.revoke(db_token)
+            return self._issue_tokens(user, family_id=db_token.family_id)
 
-        # 新しいトークン発行
-        return self._issue_tokens(user)
+        except Exception:
+            self.token_repo.rollback()
+            raise
 
     def logout(self, user: User) -> None:
         """
         ログアウト
         - ユーザーの全リフレッシュトークンを無効化
+        - ユーザーキャッシュを無効化（他ワーカーへはauth_versionで伝播）
         """
         self.token_repo.revoke_all_for_user(user.id)
+        self.user_repo.bump_auth_version(user.id)
+        user_cache.invalidate(user.id)
+
+    def _issue_tokens(self, user: User, family_id: Optional[str] = None) -> TokenResponse:
+        """
+        トークン発行（内部メソッド）
+
+        family_id を省略した場合は新しいトークンファミリーを開始する。
+        保留中の変更（ローテーション時の旧トークン無効化）と合わせて1回でコミットする。
+        """
+        response = _stage_tokens(self.token_repo, user, family_id)
+        self.token_repo.commit()
+        return response
+
+
+def _stage_tokens(token_repo, user: User, family_id: Optional[str]) -> TokenResponse:
+    """アクセストークン・リフレッシュトークンを生成し、リフレッシュトークンをセッションに追加（コミットは呼び出し側）"""
+    # アクセストークン生成
+    access_token = create_access_token(user.id)
+
+    # リフレッシュトークン生成
+    refresh_token = create_refresh_token(user.id)
+
+    # リフレッシュトークンをDBに保存
+    token_hash = hash_token(refresh_token)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
+    token_repo.create(
+        user_id=user.id,
+        family_id=family_id or new_id(),
+        token_hash=token_hash,
+        expires_at=expires_at,
+    )
+
+    return TokenResponse(
+        access_token=access_token,
+        refresh_token=refresh_token,
+        token_type="bearer",
+    )
+
+
+class AsyncAuthService:
+    """認証サービス（非同期、ASYNC_ROUTES=true の場合に使用）
+
+    AuthService と同じ処理を非同期セッションで行う。bcryptは専用プロセスプールで実行する。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.user_repo = AsyncUserRepository(db)
+        self.token_repo = AsyncRefreshTokenRepository(db)
+
+    async def register(self, username: str, email: str, password: str) -> TokenResponse:
+        """ユーザー登録"""
+        if await self.user_repo.find_by_email(email):
+            raise UserAlreadyExistsError()
+
+        password_hash = await hash_password_async(password)
+        user = await self.user_repo.create(username, email, password_hash)
+        return await self._issue_tokens(user)
+
+    async def login(self, email: str, password: str) -> TokenResponse:
+        """ログイン（手順は AuthService.login と同じ）"""
+        retry_after = login_backoff.retry_after(email)
+        if retry_after is not None:
+            raise LoginBackoffError(retry_after)
+
+        user = await self.user_repo.find_by_email(email)
+        if not user:
+            login_backoff.record_failure(email)
+            await asyncio.sleep(password_hasher.typical_verify_seconds())
+            raise InvalidCredentialsError()
+
+        if not await verify_password_async(password, user.password_hash):
+            login_backoff.record_failure(email)
+            raise InvalidCredentialsError()
+        login_backoff.reset(email)
+
+        if user.status != UserStatus.active:
+            raise UserNotActiveError()
+
+        last_login_buffer.record(user.id)
+        return await self._issue_tokens(user)
+
+    async def refresh(self, refresh_token_str: str) -> TokenResponse:
+        """トークン更新（手順は AuthService.refresh と同じ）"""
+        expected_user_id: Optional[str] = None
+        if is_jwt_token(refresh_token_str):
+            payload = decode_token(refresh_token_str)
+            if payload is None or payload.get("type") != "refresh":
+                raise InvalidTokenError()
+            expected_user_id = payload.get("sub")
+            if not expected_user_id:
+                raise InvalidTokenError()
+
+        token_hash = hash_token(refresh_token_str)
+        try:
+            db_token = await self.token_repo.find_by_hash_for_update(token_hash)
+            if not db_token:
+                raise InvalidTokenError()
+            if expected_user_id is not None and db_token.user_id != expected_user_id:
+                raise InvalidTokenError()
+            user_id = db_token.user_id
+
+            # 再利用検知: 無効化済みトークンが提示されたらファミリーごと無効化
+            if db_token.revoked_at is not None:
+                logger.warning(
+                    f"Refresh token reuse detected: user_id={user_id}, family_id={db_token.family_id}"
+                )
+                await self.token_repo.revoke_family(db_token.family_id)
+                await self.token_repo.commit()
+                raise InvalidTokenError()
+
+            user = await self.user_repo.find_by_id(user_id)
+            if not user:
+                raise InvalidTokenError()
+            if user.status != UserStatus.active:
+                raise UserNotActiveError()
 
-    def _issue_tokens(self, user: User) -> TokenResponse:
-        """トークン発行（内部メソッド）"""
-        # アクセストークン生成
-        access_token = create_access_token(user.id)
+            self.token_repo.revoke(db_token)
+            return await self._issue_tokens(user, family_id=db_token.family_id)
 
-        # リフレッシュトークン生成
-        refresh_token = create_refresh_token(user.id)
+        except Exception:
+            await self.token_repo.rollback()
+            raise
 
-        # リフレッシュトークンをDBに保存
-        token_hash = hash_token(refresh_token)
-        expires_at = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
-        self.token_repo.create(user.id, token_hash, expires_at)
+    async def logout(self, user: User) -> None:
+        """ログアウト"""
+        await self.token_repo.revoke_all_for_user(user.id)
+        await self.user_repo.bump_auth_version(user.id)
+        user_cache.invalidate(user.id)
 
-        return TokenResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_type="bearer",
-        )
+    async def _issue_tokens(self, user: User, family_id: Optional[str] = None) -> TokenResponse:
+        """トークン発行（保留中の変更と合わせて1回でコミット）"""
+        response = _stage_tokens(self.token_repo, user, family_id)
+        await self.token_repo.commit()
+        return response
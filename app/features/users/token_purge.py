@@ -0,0 +1,99 @@
+"""期限切れ・無効化済みリフレッシュトークンの削除ジョブ
+
+refresh_tokens はログイン・トークン更新のたびに行が増えるため、
+不要になった行を主キーの小さなバッチで削除する。
+
+アプリ内で定期実行する場合は REFRESH_TOKEN_PURGE_INTERVAL_SECONDS を設定する。
+実行は名前付きロック（refresh_token_purge）を取得して行い、他のワーカー・CLIが実行中の場合は何もしない。
+CLIから実行する場合:
+    python -m app.features.users.token_purge --batch-size 500 --sleep 0.1
+"""
+
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from app.core.batch import BatchReport, job_lock, run_in_batches
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.features.users.repository import RefreshTokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+def purge_refresh_tokens(
+    batch_size: int = settings.refresh_token_purge_batch_size,
+    sleep_seconds: float = settings.refresh_token_purge_sleep_seconds,
+    revoked_retention_days: int = settings.refresh_token_revoked_retention_days,
+    should_continue: Optional[Callable[[], bool]] = None,
+) -> List[BatchReport]:
+    """
+    期限切れ・無効化済みトークンを削除
+
+    無効化済みトークンは再利用検知（トークンファミリーの一括無効化）に使うため、
+    revoked_retention_days 日を過ぎてから削除する。
+    should_continue が False を返した場合はバッチの区切りで打ち切る（アプリ終了時）。
+
+    Returns:
+        List[BatchReport]: 期限切れ・無効化済みそれぞれの削除結果（他で実行中の場合は空）
+    """
+    now = datetime.now(timezone.utc)
+    revoked_before = now - timedelta(days=revoked_retention_days)
+
+    with job_lock(engine, "refresh_token_purge") as acquired:
+        if not acquired:
+            logger.info("Refresh token purge skipped, already running")
+            return []
+        db = SessionLocal()
+        try:
+            repo = RefreshTokenRepository(db)
+            reports = [
+                run_in_batches(
+                    label="refresh_tokens.expired",
+                    fetch_ids=lambda limit: repo.find_expired_ids(now, limit),
+                    process_ids=repo.delete_by_ids,
+                    batch_size=batch_size,
+                    sleep_seconds=sleep_seconds,
+                    should_continue=should_continue,
+                ),
+                run_in_batches(
+                    label="refresh_tokens.revoked",
+                    fetch_ids=lambda limit: repo.find_revoked_ids(revoked_before, limit),
+                    process_ids=repo.delete_by_ids,
+                    batch_size=batch_size,
+                    sleep_seconds=sleep_seconds,
+                    should_continue=should_continue,
+                ),
+            ]
+        finally:
+            db.close()
+
+    for report in reports:
+        logger.info(f"Refresh token purge finished: {report.as_dict()}")
+    return reports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="期限切れ・無効化済みリフレッシュトークンを削除")
+    parser.add_argument("--batch-size", type=int, default=settings.refresh_token_purge_batch_size)
+    parser.add_argument("--sleep", type=float, default=settings.refresh_token_purge_sleep_seconds)
+    parser.add_argument(
+        "--revoked-retention-days",
+        type=int,
+        default=settings.refresh_token_revoked_retention_days,
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    reports = purge_refresh_tokens(
+        batch_size=args.batch_size,
+        sleep_seconds=args.sleep,
+        revoked_retention_days=args.revoked_retention_days,
+    )
+    for report in reports:
+        print(report.as_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,74 @@
-import os
-from fastapi import FastAPI, Request
+import math
+import secrets
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.responses import JSONResponse
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 
 from app.api import api_router
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from app.core import metrics
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.database import engine
+from app.core.exceptions import DeadlineExceededError, RateLimitExceededError
+from app.core.password_hasher import password_hasher
+from app.core.slow_query import RouteContextMiddleware
+from app.features.dishes.archive import archive_deleted_dishes
+from app.features.users.last_login_buffer import last_login_buffer
+from app.features.users.token_purge import purge_refresh_tokens
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動・終了時の処理"""
+    # 起動時: バックグラウンドタスクを開始
+    tasks = [
+        PeriodicTask(
+            "last-login-flush",
+            settings.last_login_flush_interval_seconds,
+            last_login_buffer.flush,
+            wake_event=last_login_buffer.full,
+        ),
+    ]
+    if settings.refresh_token_purge_interval_seconds > 0:
+        tasks.append(PeriodicTask(
+            "refresh-token-purge",
+            settings.refresh_token_purge_interval_seconds,
+            purge_refresh_tokens,
+            stoppable=True,
+        ))
+    if settings.dish_archive_interval_seconds > 0:
+        tasks.append(PeriodicTask(
+            "dish-archive",
+            settings.dish_archive_interval_seconds,
+            archive_deleted_dishes,
+            stoppable=True,
+        ))
+    for task in tasks:
+        task.start()
 
-app = FastAPI()
+    yield
+
+    # 終了時: バックグラウンドタスクを停止し（実行中のジョブはバッチの区切りで打ち切る）、
+    # 未書き込みの最終ログイン日時を反映
+    for task in tasks:
+        task.stop()
+    try:
+        last_login_buffer.flush()
+    finally:
+        password_hasher.shutdown()
 
-# レート制限の設定
-limiter = Limiter(key_func=get_remote_address)
-app.state.limiter = limiter
 
+app = FastAPI(lifespan=lifespan)
 
-@app.exception_handler(RateLimitExceeded)
-def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
+# スロークエリの記録に発行元のルートを含めるため、リクエストのスコープを保持
+app.add_middleware(RouteContextMiddleware)
+
+
+@app.exception_handler(RateLimitExceededError)
+def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceededError):
     """レート制限超過時のカスタムエラーハンドラー"""
     return JSONResponse(
         status_code=429,
@@ -25,12 +77,21 @@ def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
             "message": "リクエスト回数が上限に達しました。しばらくお待ちください",
             "details": None,
         },
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
     )
 
-# 環境変数の取得
-# docker-compose.yml の environment: で設定した "DATABASE_URL" を読み込みます
-# 中身: mysql+pymysql://user:password@db/life_platter_db
-DATABASE_URL = os.getenv("DATABASE_URL")
+
+@app.exception_handler(DeadlineExceededError)
+def deadline_exceeded_handler(request: Request, exc: DeadlineExceededError):
+    """リクエストの処理時間の上限超過時のカスタムエラーハンドラー"""
+    return JSONResponse(
+        status_code=504,
+        content={
+            "error_code": "DEADLINE_EXCEEDED",
+            "message": "処理が時間内に完了しませんでした。しばらくしてから再度お試しください",
+            "details": None,
+        },
+    )
 
 # --- ルーターの統合 ---
 # 全ての機能は /api プレフィックス配下に配置
@@ -46,6 +107,21 @@ def read_root():
     """
     return {"message": "Hello, FastAPI is running!"}
 
+# メトリクス参照用のパス（内部用。METRICS_TOKEN を設定した場合のみ有効）
+@app.get("/metrics", include_in_schema=False)
+def read_metrics(authorization: Optional[str] = Header(default=None)):
+    """
+    各コンポーネントの統計値（待ち行列の深さ、レイテンシ等）を返す
+    SQLの形・接続先の状態等の内部情報を含むため、Authorization: Bearer <METRICS_TOKEN> を要求する。
+    未設定・不一致の場合はパスの存在を明かさないよう 404 を返す
+    """
+    expected = f"Bearer {settings.metrics_token}"
+    if not settings.metrics_token or not secrets.compare_digest(
+        (authorization or "").encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=404)
+    return metrics.collect()
+
 # DB接続テスト用のパス
 @app.get("/db-check")
 def db_check():
@@ -54,10 +130,8 @@ def db_check():
     実際にDBにSQLを投げて接続確認を行う
     """
     try:
-        # DBエンジンの作成（接続設定）
-        # echo=True にすると実行されたSQLがログに出るためデバッグに便利
-        engine = create_engine(DATABASE_URL, echo=True)
-
+        # アプリ共通のエンジン（プライマリ）の接続を使う
+        # 実行されたSQLをログに出す場合は DB_ECHO=true を設定する
         # 実際に接続して "SELECT 1" という単純なクエリを実行
         with engine.connect() as connection:
             result = connection.execute(text("SELECT 1"))
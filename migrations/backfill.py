@@ -0,0 +1,333 @@
+"""Alembic リビジョンから呼び出すオンラインバックフィル
+
+大きなテーブル（dishes 等）へのデータ投入を1つの長いトランザクションで実行すると、
+ロックの保持・undoログの肥大化・レプリケーション遅延を招く。
+Backfill は主キーの範囲ごとのチャンクに分けて UPDATE を実行し、チャンクごとにコミットする。
+
+- スロットリング: チャンク間で sleep_seconds 待機し、1チャンクが max_chunk_seconds を
+  超えた場合はチャンクサイズを半分にする（超えなければ chunk_size まで戻す）
+- チェックポイント: 完了したチャンクの上端の主キーを backfill_checkpoints に
+  同じトランザクションで記録し、中断後の再実行はその続きから再開する
+- ドライラン: 残り行数と、1チャンクを実行してロールバックした所要時間から全体の所要時間を見積もる
+
+SQL には :lo と :hi（両端を含む主キーの範囲）を含め、何度実行しても同じ結果になるように書くこと。
+
+リビジョンでの使用例:
+    from migrations.backfill import Backfill
+
+    FILL_IMAGE_COUNT = Backfill(
+        name="dishes.image_count",
+        table="dishes",
+        sql="UPDATE dishes SET image_count = (...) WHERE id BETWEEN :lo AND :hi",
+    )
+
+    def upgrade() -> None:
+        op.add_column(...)
+        FILL_IMAGE_COUNT.run(op.get_bind())
+
+チャンクはマイグレーションとは別の接続で実行する（MySQL の DDL は暗黙にコミットされるため、
+先行する add_column 等の結果は参照できる）。
+`alembic -x backfill=skip upgrade head` でバックフィルを省略し、後からCLIで実行できる。
+-x backfill に skip 以外を指定した場合は例外を送出し、リビジョンを記録する前にアップグレードを中断する
+（ドライランはCLIの --dry-run のみ）。
+
+CLIから実行する場合:
+    python -m migrations.backfill migrations/versions/xxxx_add_column.py --dry-run
+    python -m migrations.backfill migrations/versions/xxxx_add_column.py
+"""
+
+import argparse
+import importlib.util
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.batch import BatchReport
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TABLE = "backfill_checkpoints"
+
+# アプリのモデル（Base.metadata）には含めない（env.py で autogenerate の対象から除外）
+_metadata = sa.MetaData()
+checkpoints = sa.Table(
+    CHECKPOINT_TABLE,
+    _metadata,
+    sa.Column("name", sa.String(100), primary_key=True, comment="バックフィル名"),
+    sa.Column("last_key", sa.String(600), nullable=True, comment="完了したチャンクの上端の主キー"),
+    sa.Column("rows_done", sa.BigInteger, nullable=False, default=0, comment="更新済み行数"),
+    sa.Column("chunks_done", sa.Integer, nullable=False, default=0, comment="完了したチャンク数"),
+    sa.Column("updated_at", sa.DateTime, server_default=sa.func.now(), onupdate=sa.func.now(), comment="更新日時"),
+    sa.Column("completed_at", sa.DateTime, nullable=True, comment="完了日時"),
+)
+
+
+def encode_key(value: Any) -> str:
+    """主キーをチェックポイントに保存する文字列に変換"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "hex:" + bytes(value).hex()
+    if isinstance(value, int):
+        return f"int:{value}"
+    return f"str:{value}"
+
+
+def decode_key(value: str) -> Any:
+    """encode_key の逆変換"""
+    kind, _, raw = value.partition(":")
+    if kind == "hex":
+        return bytes.fromhex(raw)
+    if kind == "int":
+        return int(raw)
+    return raw
+
+
+@dataclass
+class BackfillEstimate:
+    """ドライランの見積もり"""
+    name: str
+    remaining_rows: int
+    chunks: int
+    sample_rows: int
+    sample_seconds: float
+    estimated_seconds: float
+    resumed_from: Optional[str]
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "remaining_rows": self.remaining_rows,
+            "chunks": self.chunks,
+            "sample_rows": self.sample_rows,
+            "sample_ms": round(self.sample_seconds * 1000, 3),
+            "estimated_seconds": round(self.estimated_seconds, 1),
+            "resumed_from": self.resumed_from,
+        }
+
+
+@dataclass
+class Backfill:
+    """主キー範囲のチャンクで実行するバックフィル定義"""
+    name: str
+    table: str
+    sql: str
+    pk: str = "id"
+    chunk_size: int = 1000
+    min_chunk_size: int = 100
+    sleep_seconds: float = 0.1
+    max_chunk_seconds: float = 1.0
+
+    def run(self, bind, dry_run: bool = False):
+        """
+        バックフィルを実行（中断後はチェックポイントから再開）
+
+        Args:
+            bind: Engine または Connection（op.get_bind()）
+            dry_run: True の場合は更新せず見積もりのみ返す
+
+        Returns:
+            BatchReport（dry_run=True の場合は BackfillEstimate）
+        """
+        mode = _x_argument("backfill")
+        if mode == "skip":
+            logger.warning(f"Backfill skipped by -x backfill=skip: {self.name}")
+            return BatchReport(label=self.name)
+        if mode is not None:
+            # ドライランはCLIのみ（alembic 内では DDL が適用されリビジョンが記録されてしまうため）
+            raise ValueError(
+                f"Unsupported -x backfill={mode} (only 'skip' is supported; "
+                f"use python -m migrations.backfill --dry-run to estimate)"
+            )
+        if dry_run:
+            estimate = self.estimate(bind)
+            logger.info(f"Backfill estimate: {estimate.as_dict()}")
+            return estimate
+
+        report = BatchReport(label=self.name)
+        with _engine(bind).connect() as conn:
+            last_key, completed = self._load_checkpoint(conn)
+            if completed:
+                logger.info(f"Backfill already completed: {self.name}")
+                return report
+
+            size = self.chunk_size
+            while True:
+                bounds = self._next_chunk(conn, last_key, size)
+                if bounds is None:
+                    break
+                lo, hi = bounds
+
+                start = time.perf_counter()
+                with conn.begin():
+                    rows = conn.execute(sa.text(self.sql), {"lo": lo, "hi": hi}).rowcount
+                    self._save_checkpoint(conn, hi, rows)
+                elapsed = time.perf_counter() - start
+
+                report.rows += max(rows, 0)
+                report.batch_seconds.append(elapsed)
+                last_key = hi
+                logger.info(
+                    f"{self.name}: chunk={report.batches}, size={size}, rows={rows}, "
+                    f"elapsed_ms={elapsed * 1000:.1f}"
+                )
+
+                # 1チャンクが長すぎる場合はチャンクを小さくする
+                if elapsed > self.max_chunk_seconds:
+                    size = max(self.min_chunk_size, size // 2)
+                elif size < self.chunk_size:
+                    size = min(self.chunk_size, size * 2)
+                if self.sleep_seconds > 0:
+                    time.sleep(self.sleep_seconds)
+
+            with conn.begin():
+                conn.execute(
+                    checkpoints.update()
+                    .where(checkpoints.c.name == self.name)
+                    .values(completed_at=sa.func.now())
+                )
+
+        logger.info(f"Backfill finished: {report.as_dict()}")
+        return report
+
+    def estimate(self, bind) -> BackfillEstimate:
+        """残り行数と、1チャンクを実行してロールバックした所要時間から全体を見積もる"""
+        with _engine(bind).connect() as conn:
+            last_key, completed = self._load_checkpoint(conn)
+            stmt = f"SELECT COUNT(*) FROM {self.table}"
+            params = {}
+            if last_key is not None:
+                stmt += f" WHERE {self.pk} > :after"
+                params["after"] = last_key
+            remaining = 0 if completed else conn.execute(sa.text(stmt), params).scalar()
+            conn.rollback()
+
+            sample_rows, sample_seconds = 0, 0.0
+            bounds = None if completed else self._next_chunk(conn, last_key, self.chunk_size)
+            if bounds is not None:
+                trans = conn.begin()
+                start = time.perf_counter()
+                try:
+                    sample_rows = conn.execute(
+                        sa.text(self.sql), {"lo": bounds[0], "hi": bounds[1]}
+                    ).rowcount
+                    sample_seconds = time.perf_counter() - start
+                finally:
+                    trans.rollback()
+
+        chunks = -(-remaining // self.chunk_size)
+        return BackfillEstimate(
+            name=self.name,
+            remaining_rows=remaining,
+            chunks=chunks,
+            sample_rows=sample_rows,
+            sample_seconds=sample_seconds,
+            estimated_seconds=chunks * (sample_seconds + self.sleep_seconds),
+            resumed_from=encode_key(last_key) if last_key is not None else None,
+        )
+
+    def _next_chunk(self, conn: Connection, after: Any, size: int):
+        """after より後の主キーから size 件分の範囲 (lo, hi) を返す（残りがなければNone）"""
+        where = f" WHERE {self.pk} > :after" if after is not None else ""
+        params = {"after": after} if after is not None else {}
+        lo = conn.execute(
+            sa.text(f"SELECT {self.pk} FROM {self.table}{where} ORDER BY {self.pk} LIMIT 1"),
+            params,
+        ).scalar()
+        if lo is None:
+            conn.rollback()
+            return None
+        hi = conn.execute(
+            sa.text(
+                f"SELECT {self.pk} FROM {self.table} WHERE {self.pk} >= :lo "
+                f"ORDER BY {self.pk} LIMIT 1 OFFSET :offset"
+            ),
+            {"lo": lo, "offset": size - 1},
+        ).scalar()
+        if hi is None:
+            hi = conn.execute(sa.text(f"SELECT MAX({self.pk}) FROM {self.table}")).scalar()
+        conn.rollback()  # 範囲の取得で開始したトランザクションを閉じる
+        return lo, hi
+
+    def _load_checkpoint(self, conn: Connection):
+        """(last_key, completed) を返す（チェックポイント表がなければ作成）"""
+        _metadata.create_all(conn, checkfirst=True)
+        row = conn.execute(
+            sa.select(checkpoints.c.last_key, checkpoints.c.completed_at)
+            .where(checkpoints.c.name == self.name)
+        ).first()
+        conn.commit()
+        if row is None:
+            return None, False
+        last_key = decode_key(row.last_key) if row.last_key is not None else None
+        return last_key, row.completed_at is not None
+
+    def _save_checkpoint(self, conn: Connection, last_key: Any, rows: int) -> None:
+        """チャンクの完了を記録（呼び出し側のトランザクション内）"""
+        values = {
+            "last_key": encode_key(last_key),
+            "rows_done": checkpoints.c.rows_done + max(rows, 0),
+            "chunks_done": checkpoints.c.chunks_done + 1,
+        }
+        updated = conn.execute(
+            checkpoints.update().where(checkpoints.c.name == self.name).values(**values)
+        ).rowcount
+        if updated == 0:
+            conn.execute(checkpoints.insert().values(
+                name=self.name,
+                last_key=encode_key(last_key),
+                rows_done=max(rows, 0),
+                chunks_done=1,
+            ))
+
+
+def _engine(bind) -> Engine:
+    """マイグレーションの接続とは別に、チャンクごとにコミットするための Engine を返す"""
+    return bind.engine if isinstance(bind, Connection) else bind
+
+
+def _x_argument(key: str) -> Optional[str]:
+    """alembic -x の値（alembic 外から呼ばれた場合は None）"""
+    try:
+        from alembic import context
+
+        return context.get_x_argument(as_dictionary=True).get(key)
+    except Exception:
+        return None
+
+
+def load_backfills(path: str) -> List[Backfill]:
+    """リビジョンファイルに定義された Backfill を取得"""
+    spec = importlib.util.spec_from_file_location("_backfill_revision", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [value for value in vars(module).values() if isinstance(value, Backfill)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="リビジョンに定義されたバックフィルを実行・見積もり")
+    parser.add_argument("revision", help="Backfill を定義したリビジョンファイルのパス")
+    parser.add_argument("--name", default=None, help="実行するバックフィル名（省略時は全て）")
+    parser.add_argument("--dry-run", action="store_true", help="更新せず残り行数と所要時間を見積もる")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--sleep", type=float, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from app.core.database import engine
+
+    backfills = [b for b in load_backfills(args.revision) if args.name in (None, b.name)]
+    if not backfills:
+        raise SystemExit(f"No Backfill found in {args.revision}")
+    for backfill in backfills:
+        if args.chunk_size is not None:
+            backfill.chunk_size = args.chunk_size
+        if args.sleep is not None:
+            backfill.sleep_seconds = args.sleep
+        print(backfill.run(engine, dry_run=args.dry_run).as_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -34,6 +34,16 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+# === 追加: モデルを持たない管理用テーブルを autogenerate の対象から除外 ===
+# backfill_checkpoints は migrations/backfill.py が必要時に作成する
+EXCLUDED_TABLES = {"backfill_checkpoints"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """autogenerate の比較対象に含めるかどうか"""
+    return not (type_ == "table" and name in EXCLUDED_TABLES)
+
+
 def run_migrations_offline() -> None:
     """オフラインモードでマイグレーションを実行"""
     url = config.get_main_option("sqlalchemy.url")
@@ -42,6 +52,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -59,7 +70,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
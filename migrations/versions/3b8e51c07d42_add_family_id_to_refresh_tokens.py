@@ -0,0 +1,33 @@
+"""add family_id to refresh_tokens
+
+Revision ID: 3b8e51c07d42
+Revises: 9024dd239a18
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e51c07d42'
+down_revision: Union[str, Sequence[str], None] = '9024dd239a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('family_id', mysql.CHAR(length=36), nullable=True, comment='トークンファミリーID（ローテーション系列）'))
+    # 既存トークンはそれぞれ単独のファミリーとして扱う
+    op.execute('UPDATE refresh_tokens SET family_id = id')
+    op.alter_column('refresh_tokens', 'family_id', existing_type=mysql.CHAR(length=36), nullable=False, existing_comment='トークンファミリーID（ローテーション系列）')
+    op.create_index(op.f('ix_refresh_tokens_family_id'), 'refresh_tokens', ['family_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_refresh_tokens_family_id'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'family_id')
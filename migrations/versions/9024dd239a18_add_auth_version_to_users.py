@@ -0,0 +1,28 @@
+"""add auth_version to users
+
+Revision ID: 9024dd239a18
+Revises: 068e2411d8ad
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9024dd239a18'
+down_revision: Union[str, Sequence[str], None] = '068e2411d8ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('auth_version', sa.Integer(), server_default='0', nullable=False, comment='認証情報バージョン（キャッシュ無効化用）'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'auth_version')
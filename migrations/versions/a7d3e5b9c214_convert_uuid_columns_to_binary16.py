@@ -0,0 +1,106 @@
+"""convert uuid columns to binary16
+
+Revision ID: a7d3e5b9c214
+Revises: f4b8d2c61a93
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5b9c214'
+down_revision: Union[str, Sequence[str], None] = 'f4b8d2c61a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (テーブル, カラム, NULL許可, コメント)
+UUID_COLUMNS = [
+    ('users', 'id', False, '主キー（UUIDv7）'),
+    ('refresh_tokens', 'id', False, '主キー（UUIDv7）'),
+    ('refresh_tokens', 'user_id', False, 'ユーザーID'),
+    ('refresh_tokens', 'family_id', False, 'トークンファミリーID（ローテーション系列）'),
+    ('dish_categories', 'id', False, '主キー（UUIDv7）'),
+    ('dishes', 'id', False, '主キー（UUIDv7）'),
+    ('dishes', 'user_id', False, 'ユーザーID'),
+    ('dishes', 'category_id', True, 'カテゴリID'),
+    ('dish_images', 'id', False, '主キー（UUIDv7）'),
+    ('dish_images', 'dish_id', False, '料理ID'),
+]
+
+# (テーブル, カラム, 参照先テーブル, ON DELETE)
+FOREIGN_KEYS = [
+    ('refresh_tokens', 'user_id', 'users', None),
+    ('dishes', 'user_id', 'users', None),
+    ('dishes', 'category_id', 'dish_categories', None),
+    ('dish_images', 'dish_id', 'dishes', 'CASCADE'),
+]
+
+
+def _drop_foreign_keys() -> None:
+    """UUIDカラムを参照する外部キーを削除（名前はMySQLの自動命名のため実DBから取得）"""
+    inspector = sa.inspect(op.get_bind())
+    for table, column, referred_table, _ in FOREIGN_KEYS:
+        for fk in inspector.get_foreign_keys(table):
+            if fk['constrained_columns'] == [column] and fk['referred_table'] == referred_table:
+                op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+
+def _create_foreign_keys() -> None:
+    for table, column, referred_table, ondelete in FOREIGN_KEYS:
+        op.create_foreign_key(None, table, referred_table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _drop_foreign_keys()
+    for table, column, nullable, comment in UUID_COLUMNS:
+        # CHAR(36) → VARBINARY(36)（バイト列のまま）→ 16バイトに変換 → BINARY(16)
+        op.alter_column(
+            table, column,
+            existing_type=mysql.CHAR(length=36),
+            type_=mysql.VARBINARY(length=36),
+            existing_nullable=nullable,
+        )
+        op.execute(
+            f"UPDATE {table} SET {column} = UNHEX(REPLACE({column}, '-', '')) WHERE {column} IS NOT NULL"
+        )
+        op.alter_column(
+            table, column,
+            existing_type=mysql.VARBINARY(length=36),
+            type_=mysql.BINARY(length=16),
+            existing_nullable=nullable,
+            comment=comment,
+        )
+    _create_foreign_keys()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_foreign_keys()
+    for table, column, nullable, comment in UUID_COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=mysql.BINARY(length=16),
+            type_=mysql.VARBINARY(length=36),
+            existing_nullable=nullable,
+        )
+        op.execute(
+            f"UPDATE {table} SET {column} = LOWER(CONCAT_WS('-', "
+            f"SUBSTR(HEX({column}), 1, 8), SUBSTR(HEX({column}), 9, 4), SUBSTR(HEX({column}), 13, 4), "
+            f"SUBSTR(HEX({column}), 17, 4), SUBSTR(HEX({column}), 21, 12))) "
+            f"WHERE {column} IS NOT NULL"
+        )
+        op.alter_column(
+            table, column,
+            existing_type=mysql.VARBINARY(length=36),
+            type_=mysql.CHAR(length=36),
+            existing_nullable=nullable,
+            comment=comment.replace('UUIDv7', 'UUID'),
+        )
+    _create_foreign_keys()
@@ -0,0 +1,43 @@
+"""drop dishes.user_id foreign key on shard databases
+
+Revision ID: b6d9e1f4a782
+Revises: f1c7a3d9b258
+Create Date: 2026-10-18 10:00:00.000000
+
+シャードDB（DISH_SHARD_URLS）には users の行がないため、dishes.user_id の外部キーを削除する。
+-x shard=true を指定した場合のみ実行し、プライマリでは何もしない（リビジョンのみ進める）。
+
+    DATABASE_URL=<シャードのURL> alembic -x shard=true upgrade head
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d9e1f4a782'
+down_revision: Union[str, Sequence[str], None] = 'f1c7a3d9b258'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_shard() -> bool:
+    return context.get_x_argument(as_dictionary=True).get('shard') == 'true'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not _is_shard():
+        return
+    inspector = sa.inspect(op.get_bind())
+    for fk in inspector.get_foreign_keys('dishes'):
+        if fk['constrained_columns'] == ['user_id'] and fk['referred_table'] == 'users':
+            op.drop_constraint(fk['name'], 'dishes', type_='foreignkey')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_shard():
+        return
+    op.create_foreign_key(None, 'dishes', 'users', ['user_id'], ['id'])
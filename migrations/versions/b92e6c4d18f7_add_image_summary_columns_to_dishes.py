@@ -0,0 +1,41 @@
+"""add image summary columns to dishes
+
+Revision ID: b92e6c4d18f7
+Revises: a7d3e5b9c214
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b92e6c4d18f7'
+down_revision: Union[str, Sequence[str], None] = 'a7d3e5b9c214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('dishes', sa.Column('thumbnail_key', sa.String(length=200), nullable=True, comment='サムネイル画像のS3キー（display_order=1の画像、非正規化）'))
+    op.add_column('dishes', sa.Column('image_count', mysql.TINYINT(), server_default='0', nullable=False, comment='画像枚数（非正規化）'))
+    # 既存行のバックフィル（大量データの場合は python -m app.features.dishes.image_summary backfill でも実行可能）
+    op.execute(
+        "UPDATE dishes d "
+        "LEFT JOIN ("
+        "  SELECT dish_id, COUNT(*) AS image_count, "
+        "         MAX(CASE WHEN display_order = 1 THEN image_key END) AS thumbnail_key "
+        "  FROM dish_images GROUP BY dish_id"
+        ") s ON s.dish_id = d.id "
+        "SET d.image_count = COALESCE(s.image_count, 0), d.thumbnail_key = s.thumbnail_key"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('dishes', 'image_count')
+    op.drop_column('dishes', 'thumbnail_key')
@@ -0,0 +1,37 @@
+"""add keyset indexes to dishes
+
+Revision ID: c3f9a1e7d6b5
+Revises: b92e6c4d18f7
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f9a1e7d6b5'
+down_revision: Union[str, Sequence[str], None] = 'b92e6c4d18f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 新しいインデックスを先に作成する（user_id の外部キーが使うインデックスを常に残すため）
+    op.create_index('idx_dishes_user_list', 'dishes', ['user_id', 'deleted_at', 'cooked_at', 'id'], unique=False)
+    op.create_index('idx_dishes_user_category_list', 'dishes', ['user_id', 'category_id', 'deleted_at', 'cooked_at', 'id'], unique=False)
+    op.drop_index('idx_dishes_user_cooked', table_name='dishes')
+    op.drop_index('idx_dishes_user_deleted', table_name='dishes')
+    op.drop_index(op.f('ix_dishes_user_id'), table_name='dishes')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_dishes_user_id'), 'dishes', ['user_id'], unique=False)
+    op.create_index('idx_dishes_user_deleted', 'dishes', ['user_id', 'deleted_at'], unique=False)
+    op.create_index('idx_dishes_user_cooked', 'dishes', ['user_id', 'cooked_at'], unique=False)
+    op.drop_index('idx_dishes_user_category_list', table_name='dishes')
+    op.drop_index('idx_dishes_user_list', table_name='dishes')
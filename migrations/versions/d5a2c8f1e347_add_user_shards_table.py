@@ -0,0 +1,36 @@
+"""add user_shards table
+
+Revision ID: d5a2c8f1e347
+Revises: c3f9a1e7d6b5
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a2c8f1e347'
+down_revision: Union[str, Sequence[str], None] = 'c3f9a1e7d6b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_shards',
+    sa.Column('user_id', mysql.BINARY(length=16), nullable=False, comment='ユーザーID'),
+    sa.Column('shard_id', sa.Integer(), nullable=False, comment='シャード番号（0はプライマリ）'),
+    sa.Column('locked', sa.Boolean(), server_default='0', nullable=False, comment='シャード移動中（書き込み停止）'),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='更新日時'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_shards')
@@ -0,0 +1,28 @@
+"""add purged_at to users
+
+Revision ID: e3a71c9b4f20
+Revises: c5f2a9e0b617
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a71c9b4f20'
+down_revision: Union[str, Sequence[str], None] = 'c5f2a9e0b617'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('purged_at', sa.DateTime(), nullable=True, comment='関連データ削除完了日時'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'purged_at')
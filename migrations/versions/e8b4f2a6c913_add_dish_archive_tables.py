@@ -0,0 +1,59 @@
+"""add dish archive tables
+
+Revision ID: e8b4f2a6c913
+Revises: d5a2c8f1e347
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4f2a6c913'
+down_revision: Union[str, Sequence[str], None] = 'd5a2c8f1e347'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('dishes_archive',
+    sa.Column('id', mysql.BINARY(length=16), nullable=False, comment='主キー（dishes.id）'),
+    sa.Column('user_id', mysql.BINARY(length=16), nullable=False, comment='ユーザーID'),
+    sa.Column('category_id', mysql.BINARY(length=16), nullable=True, comment='カテゴリID'),
+    sa.Column('name', sa.String(length=200), nullable=False, comment='料理名'),
+    sa.Column('cooked_at', sa.Date(), nullable=False, comment='作った日'),
+    sa.Column('thumbnail_key', sa.String(length=200), nullable=True, comment='サムネイル画像のS3キー'),
+    sa.Column('image_count', mysql.TINYINT(), server_default='0', nullable=False, comment='画像枚数'),
+    sa.Column('created_at', sa.DateTime(), nullable=True, comment='作成日時'),
+    sa.Column('updated_at', sa.DateTime(), nullable=True, comment='更新日時'),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False, comment='削除日時（論理削除）'),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='アーカイブ日時'),
+    sa.Column('images_purged_at', sa.DateTime(), nullable=True, comment='S3画像の削除日時'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dishes_archive_user_id'), 'dishes_archive', ['user_id'], unique=False)
+    op.create_table('dish_images_archive',
+    sa.Column('id', mysql.BINARY(length=16), nullable=False, comment='主キー（dish_images.id）'),
+    sa.Column('dish_id', mysql.BINARY(length=16), nullable=False, comment='料理ID'),
+    sa.Column('image_key', sa.String(length=200), nullable=False, comment='S3オブジェクトキー'),
+    sa.Column('display_order', mysql.TINYINT(), nullable=False, comment='表示順序（1-3）'),
+    sa.Column('created_at', sa.DateTime(), nullable=True, comment='作成日時'),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True, comment='アーカイブ日時'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_dish_images_archive_dish_id'), 'dish_images_archive', ['dish_id'], unique=False)
+    op.create_index('idx_dishes_deleted_at', 'dishes', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_dishes_deleted_at', table_name='dishes')
+    op.drop_index(op.f('ix_dish_images_archive_dish_id'), table_name='dish_images_archive')
+    op.drop_table('dish_images_archive')
+    op.drop_index(op.f('ix_dishes_archive_user_id'), table_name='dishes_archive')
+    op.drop_table('dishes_archive')
@@ -0,0 +1,28 @@
+"""add version to dishes
+
+Revision ID: f1c7a3d9b258
+Revises: e8b4f2a6c913
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a3d9b258'
+down_revision: Union[str, Sequence[str], None] = 'e8b4f2a6c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('dishes', sa.Column('version', sa.Integer(), server_default='1', nullable=False, comment='楽観的排他制御のバージョン（更新ごとに+1）'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('dishes', 'version')
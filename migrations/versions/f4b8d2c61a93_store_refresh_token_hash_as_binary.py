@@ -0,0 +1,52 @@
+"""store refresh token hash as binary
+
+Revision ID: f4b8d2c61a93
+Revises: e3a71c9b4f20
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d2c61a93'
+down_revision: Union[str, Sequence[str], None] = 'e3a71c9b4f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 16進文字列（64文字）→ SHA-256ダイジェスト（32バイト）に変換
+    op.add_column('refresh_tokens', sa.Column('token_hash_bin', mysql.BINARY(length=32), nullable=True))
+    op.execute("UPDATE refresh_tokens SET token_hash_bin = UNHEX(token_hash)")
+    op.drop_index(op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token_hash')
+    op.alter_column(
+        'refresh_tokens', 'token_hash_bin',
+        new_column_name='token_hash',
+        existing_type=mysql.BINARY(length=32),
+        nullable=False,
+        comment='トークンハッシュ（SHA-256ダイジェスト）',
+    )
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('refresh_tokens', sa.Column('token_hash_hex', sa.String(length=255), nullable=True))
+    op.execute("UPDATE refresh_tokens SET token_hash_hex = LOWER(HEX(token_hash))")
+    op.drop_index(op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token_hash')
+    op.alter_column(
+        'refresh_tokens', 'token_hash_hex',
+        new_column_name='token_hash',
+        existing_type=sa.String(length=255),
+        nullable=False,
+        comment='トークンハッシュ（SHA-256）',
+    )
+    op.create_index(op.f('ix_refresh_tokens_token_hash'), 'refresh_tokens', ['token_hash'], unique=False)